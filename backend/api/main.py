@@ -1,11 +1,11 @@
 # app/main.py
 from __future__ import annotations
 from fastapi import FastAPI, HTTPException, Header, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 import os
 import json
 import re
@@ -33,9 +33,9 @@ except Exception as e:
     os.environ.setdefault("VERSION", "0.1.0")
 
 # Import your modules
-from backend.core.hashing import sha256_json, merkle_root
-from backend.core.storage import today_files, read_json, write_json, load_day, build_ledger_obj, DATA_DIR, get_node_metadata
-from backend.core.hash_helpers import build_day_root
+from backend.core.hashing import sha256_json, merkle_root, CanonicalRecord, DayDigest, day_root_obj
+from backend.core.storage import today_files, read_json, write_json, write_json_group, DATA_DIR, get_node_metadata, iter_records, ledger_obj, day_files, echo_target, shard_files, sweep_page
+from backend.core import frontier, catalog, dedupe, group_commit, day_writer, sealed_cache, audit, auth_log, checkpoints, replication, jsonl
 from backend.core.models import BonusRun
 
 # Create FastAPI app
@@ -155,31 +155,21 @@ else:
 FEATURE_INTENT = "publish_feature"
 FEATURE_QUEUE_FILENAME = "{}.featured_queue.jsonl"
 
-# in-memory dedupe: (user_id, date) -> {content_hash, ...}
-_gic_seen: Dict[Tuple[str, str], Set[str]] = {}
-
 def _gic_file(date_str: str) -> str:
     """daily GIC transactions file"""
     return f"{date_str}/{date_str}.gic.jsonl"
 
-def _mark_seen(user_id: str, date_str: str, h: str) -> None:
-    key = (user_id, date_str)
-    s = _gic_seen.setdefault(key, set())
-    s.add(h)
-
-def _already_seen(user_id: str, date_str: str, h: str) -> bool:
-    key = (user_id, date_str)
-    return h in _gic_seen.get(key, set())
+def _enqueue_jsonl(full_path: Path, record: dict | CanonicalRecord):
+    """Hand a record to the group-commit writer; returns a future that resolves once it is on disk."""
+    if not isinstance(record, CanonicalRecord):
+        record = CanonicalRecord(record)
+    return group_commit.writer().append(full_path, record.line)
 
 def append_jsonl(file_path: str, record: dict) -> str:
-    """Append a record to a JSONL file and return the hash"""
-    full_path = DATA_DIR / file_path
-    full_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(full_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-    
-    return sha256_json(record)
+    """Append a record to a JSONL file and return the hash (of the bytes written)"""
+    rec = CanonicalRecord(record)
+    _enqueue_jsonl(DATA_DIR / file_path, rec).result()
+    return rec.leaf
 
 def _sse(data: dict, event: str = "message") -> bytes:
     lines = []
@@ -211,21 +201,6 @@ def _read_json_file(p: Path) -> dict | None:
     with p.open("r", encoding="utf-8") as f:
         return json.load(f)
 
-def _read_jsonl_file(p: Path) -> list[dict]:
-    if not p.exists():
-        return []
-    rows = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                pass
-    return rows
-
 # BONUS HELPERS
 _BONUS_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 _TOP_N = 10
@@ -238,25 +213,8 @@ def _day_path(dstr: str) -> Path:
     base = Path(os.environ.get("LEDGER_PATH", "data"))
     return base / dstr
 
-def _read_jsonl(p: Path) -> list[dict]:
-    if not p.exists():
-        return []
-    rows = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                pass
-    return rows
-
 def _append_jsonl(p: Path, obj: dict):
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    _enqueue_jsonl(p, obj).result()
 
 from datetime import date as _date, datetime as _dt, timedelta as _td
 
@@ -282,7 +240,7 @@ def _bonus_rank(cands: list[dict]) -> list[dict]:
 def _already_paid_keys(payout_day: str) -> set[tuple[str, str, str]]:
     gic_p = _day_path(payout_day) / f"{payout_day}.gic.jsonl"
     seen = set()
-    for tx in _read_jsonl(gic_p):
+    for tx in jsonl.iter_records(gic_p):
         if tx.get("type") == "gic_tx" and tx.get("reason") == _BONUS_REASON:
             seen.add((str(tx.get("user")), str(tx.get("hash")), _BONUS_REASON))
     return seen
@@ -291,15 +249,19 @@ def _already_paid_keys(payout_day: str) -> set[tuple[str, str, str]]:
 _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
 def _list_date_dirs() -> list[str]:
+    """Every date with data on disk: LEDGER_PATH/{date}/ dirs plus DATA_DIR day files and dirs."""
+    dates = set()
     base = Path(os.environ.get("LEDGER_PATH", "data"))
-    if not base.exists():
-        return []
-    dates = []
-    for p in base.iterdir():
-        if p.is_dir() and _DATE_RE.match(p.name):
-            dates.append(p.name)
-    dates.sort()
-    return dates
+    if base.exists():
+        for p in base.iterdir():
+            if p.is_dir() and _DATE_RE.match(p.name):
+                dates.add(p.name)
+    if DATA_DIR.exists():
+        for p in DATA_DIR.iterdir():
+            name = p.name.split(".", 1)[0]
+            if _DATE_RE.match(name):
+                dates.add(name)
+    return sorted(dates)
 
 def _safe_counts_for(date_str: str) -> dict:
     day = _day_dir(date_str)
@@ -311,34 +273,36 @@ def _safe_counts_for(date_str: str) -> dict:
     seal_p   = root / f"{date_str}.seal.json" if (root / f"{date_str}.seal.json").exists() else day / f"{date_str}.seal.json"
     ledger_p = root / f"{date_str}.ledger.json" if (root / f"{date_str}.ledger.json").exists() else day / f"{date_str}.ledger.json"
     gic_p    = root / f"{date_str}.gic.jsonl" if (root / f"{date_str}.gic.jsonl").exists() else day / f"{date_str}.gic.jsonl"
+    if not gic_p.exists() and (root / _gic_file(date_str)).exists():
+        gic_p = root / _gic_file(date_str)  # where /sweep writes it
 
     seed   = _read_json_file(seed_p)
     seal   = _read_json_file(seal_p)
     ledger = _read_json_file(ledger_p)
 
-    if echo_p_l.exists():
-        sweeps = _read_jsonl_file(echo_p_l)
-    elif echo_p_j.exists():
+    # legacy array days and append-only log days both count; logs are counted from their offset index
+    sweeps = 0
+    if echo_p_j.exists():
         arr = _read_json_file(echo_p_j) or []
-        sweeps = arr if isinstance(arr, list) else []
-    else:
-        sweeps = []
+        sweeps = len(arr) if isinstance(arr, list) else 1
+    shards = [root / rel for rel in shard_files(date_str)]
+    sweeps += sum(jsonl.count(log_p) for log_p in [echo_p_l, *shards])
 
-    gic_txs = _read_jsonl_file(gic_p)
+    gic_txs = jsonl.read_all(gic_p)
     gic_sum = sum(int(tx.get("amount", 0) or 0) for tx in gic_txs)
 
     return {
         "date": date_str,
         "present": {
             "seed": seed is not None,
-            "echo": echo_p_l.exists() or echo_p_j.exists(),
+            "echo": echo_p_l.exists() or echo_p_j.exists() or bool(shards),
             "seal": seal is not None,
             "ledger": ledger is not None,
             "gic": gic_p.exists(),
         },
         "counts": {
             "seeds": 1 if seed else 0,
-            "sweeps": len(sweeps),
+            "sweeps": sweeps,
             "seals": 1 if seal else 0,
             "gic_txs": len(gic_txs),
         },
@@ -349,12 +313,51 @@ def _safe_counts_for(date_str: str) -> dict:
         "day_root": (ledger or {}).get("day_root"),
         "links": {
             "seed":   str(seed_p)   if seed   else None,
-            "echo":   str(echo_p_l) if echo_p_l.exists() else (str(echo_p_j) if echo_p_j.exists() else None),
+            "echo":   str(echo_p_l) if echo_p_l.exists() else (str(echo_p_j) if echo_p_j.exists() else (str(shards[0]) if shards else None)),
             "seal":   str(seal_p)   if seal   else None,
             "ledger": str(ledger_p) if ledger else None,
         },
     }
 
+def _scan_day(date_str: str) -> dict:
+    """
+    Disk scan for the catalog: the /verify shape plus the sweep count the ledger
+    sealed, and whether no day file was written after the ledger (frozen).
+    """
+    day = _safe_counts_for(date_str)
+    if day["links"]["ledger"]:
+        ledger_p = Path(day["links"]["ledger"])
+        ledger = _read_json_file(ledger_p) or {}
+        day["sealed_sweeps"] = ledger.get("counts", {}).get("sweeps")
+        mtimes = [(DATA_DIR / rel).stat().st_mtime_ns for rel in day_files(date_str)]
+        gic_p = day["gic"]["file"]
+        if gic_p:
+            mtimes.append(Path(gic_p).stat().st_mtime_ns)
+        day["frozen"] = ledger_p.stat().st_mtime_ns >= max(mtimes, default=0)
+    return day
+
+def _catalog_update(
+    date_str: str,
+    inc: Optional[Dict[str, int]] = None,
+    assign: Optional[Dict[str, Any]] = None,
+    pending: Optional[list] = None,
+    sealed: bool = False,
+) -> None:
+    """
+    Apply a write to the day catalog; days it doesn't know yet are scanned from disk instead.
+    `pending` are the write's group-commit futures: the scan waits for them so it counts them.
+    `sealed` marks the write as the day's seal.
+    """
+    sealed_cache.invalidate(date_str)
+    try:
+        if not catalog.bump(date_str, inc=inc, assign=assign, sealed=sealed):
+            for fut in pending or ():
+                fut.result()
+            catalog.put_day(_scan_day(date_str))
+    except Exception:
+        # the catalog is an index, never fail a ledger write because of it
+        log.exception(f"Catalog update failed for {date_str}")
+
 # MODELS
 from pydantic import BaseModel, Field
 
@@ -377,6 +380,12 @@ class Seal(BaseModel):
     tomorrow_intent: str
     meta: Dict[str, Any] = Field(default_factory=dict)
 
+class ReplicationPull(BaseModel):
+    peer: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    force: bool = False
+
 # Mock agent summaries helper
 async def get_agent_summaries(conn):
     return [
@@ -390,6 +399,16 @@ async def startup_event():
     log.info("🚀 Hive API starting up...")
     log.info(f"Demo mode: {DEMO_MODE}")
     log.info(f"CORS origins: {ALLOWED_ORIGINS}")
+    log.info(f"GIC group commit: fsync={group_commit.writer().fsync}")
+    if catalog.count() == 0:
+        n = catalog.rebuild(_scan_day(d) for d in _list_date_dirs())
+        log.info(f"Day catalog rebuilt from disk: {n} days")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    group_commit.shutdown()
+    audit.shutdown()
+    auth_log.shutdown()
 
 # BASIC ENDPOINTS
 @app.get("/")
@@ -491,8 +510,12 @@ async def admin_agents_stream(token: Optional[str] = None, x_admin_token: Option
 async def reflect(note: dict):
     return {"status": "success", "data": note}
 
+# Every mutation of a day's files runs on that day's single writer (see core/day_writer.py)
 @app.post("/seed")
 def post_seed(payload: Seed):
+    return day_writer.run(payload.date, _apply_seed, payload)
+
+def _apply_seed(payload: Seed) -> dict:
     files = today_files(payload.date)
     node_meta = get_node_metadata()
     record = {
@@ -504,101 +527,207 @@ def post_seed(payload: Seed):
         "ts": datetime.utcnow().isoformat() + "Z",
     }
     write_json(files["seed"], record)
+    _catalog_update(payload.date, assign={"seeds": 1, "seed": str(DATA_DIR / files["seed"])})
     return {"seed_hash": sha256_json(record), "file": files["seed"]}
 
 @app.post("/sweep")
 def post_sweep(payload: Sweep):
-    date_str = payload.date
-    files = today_files(date_str)
+    results, pending = day_writer.run(payload.date, _apply_sweeps, payload.date, [payload])
+    # gic + featured appends share a group commit; return only once they're durable
+    for fut in pending:
+        fut.result()
+    return results[0]
+
+def _base_reward(payload: Sweep) -> Tuple[str, int]:
+    """(tier, GIC) for a sweep before the duplicate guard. meta is free-form, so gic_intent may be any JSON value."""
+    tier = str((payload.meta or {}).get("gic_intent") or "private").lower()
+    # GIC REWARD LOGIC: base reward by tier; publish tiers require minimum length
+    if tier in ("publish", FEATURE_INTENT) and len(payload.note or "") >= REWARD_MIN_LEN:
+        return tier, GIC_PER_PUBLISH
+    return tier, GIC_PER_PRIVATE
+
+def _apply_sweeps(date_str: str, payloads: List[Sweep]) -> Tuple[List[dict], list]:
+    """
+    Write sweeps for one day on the day's writer: one log append, one frontier
+    update, then the GIC reward per record. Returns (responses, pending gic/featured futures).
+    """
     node_meta = get_node_metadata()
     
-    # Load existing sweeps or start with empty list
-    sweeps = read_json(files["echo"]) if (DATA_DIR / files["echo"]).exists() else []
-    if isinstance(sweeps, dict):
-        sweeps = [sweeps]
-    
-    record = {
+    records = [{
         "type": "sweep",
         "date": date_str,
         "chamber": payload.chamber,
         "note": payload.note,
         "meta": {**payload.meta, **node_meta},
         "ts": datetime.utcnow().isoformat() + "Z",
-    }
-    sweeps.append(record)
-    write_json(files["echo"], sweeps)
-    attestation = sha256_json(record)
-
-    # GIC REWARD LOGIC
-    meta = payload.meta or {}
-    tier = meta.get("gic_intent", "private").lower()
-    user_id = meta.get("user", "anon")
-    content_hash = meta.get("content_hash")
-    note_text = payload.note or ""
-
-    # Base reward by tier
-    if tier == "publish":
-        gic = GIC_PER_PUBLISH
-    elif tier == FEATURE_INTENT:
-        gic = GIC_PER_PUBLISH
-        record["meta"]["featured"] = True
-    else:
-        gic = GIC_PER_PRIVATE
+    } for payload in payloads]
+    # tiers and base rewards up front: nothing that can fail on odd meta runs after the append
+    rewards = [_base_reward(payload) for payload in payloads]
+    for record, (tier, _) in zip(records, rewards):
+        # mark before encoding: the record is serialized (and hashed) exactly once
+        if tier == FEATURE_INTENT:
+            record["meta"]["featured"] = True
+    # one line per sweep: O(1) append, leaves folded into the day's Merkle frontier
+    attestations = frontier.append_sweeps(date_str, records)
+    echo_rel = echo_target(date_str)
 
-    # Publish tiers require minimum length
-    if tier in ("publish", FEATURE_INTENT) and len(note_text) < REWARD_MIN_LEN:
-        gic = GIC_PER_PRIVATE
-
-    # Duplicate guard per user/day by content hash
-    if content_hash:
-        if _already_seen(user_id, date_str, content_hash):
-            gic = 0
-        else:
-            _mark_seen(user_id, date_str, content_hash)
-
-    # Append GIC transaction
-    gic_tx = {
-        "type": "gic_tx",
-        "date": date_str,
-        "user": user_id,
-        "amount": gic,
-        "reason": f"reflection:{tier}",
-        "hash": content_hash,
-        "ts": datetime.utcnow().isoformat() + "Z",
-    }
     gic_file = _gic_file(date_str)
-    gic_att = append_jsonl(gic_file, gic_tx)
+    pending = []
+    results = []
+    gic_sum = 0
+    for payload, attestation, (tier, gic) in zip(payloads, attestations, rewards):
+        meta = payload.meta or {}
+        user_id = meta.get("user", "anon")
+        content_hash = meta.get("content_hash")
+        note_text = payload.note or ""
+
+        # Duplicate guard per user/day by content hash (persisted, shared by all workers)
+        if content_hash and dedupe.check_and_mark(user_id, date_str, content_hash):
+            gic = 0
 
-    # If featured, queue for weekly bonus review
-    if tier == FEATURE_INTENT:
-        feature_item = {
-            "type": "feature_candidate",
+        # Append GIC transaction
+        gic_tx = {
+            "type": "gic_tx",
             "date": date_str,
             "user": user_id,
+            "amount": gic,
+            "reason": f"reflection:{tier}",
             "hash": content_hash,
-            "len": len(note_text),
-            "ts": datetime.utcnow().isoformat() + "Z"
+            "ts": datetime.utcnow().isoformat() + "Z",
         }
-        append_jsonl(f"{date_str}/{FEATURE_QUEUE_FILENAME.format(date_str)}", feature_item)
+        gic_rec = CanonicalRecord(gic_tx)
+        pending.append(_enqueue_jsonl(DATA_DIR / gic_file, gic_rec))
+        gic_sum += gic
+
+        # If featured, queue for weekly bonus review
+        if tier == FEATURE_INTENT:
+            feature_item = {
+                "type": "feature_candidate",
+                "date": date_str,
+                "user": user_id,
+                "hash": content_hash,
+                "len": len(note_text),
+                "ts": datetime.utcnow().isoformat() + "Z"
+            }
+            pending.append(_enqueue_jsonl(DATA_DIR / date_str / FEATURE_QUEUE_FILENAME.format(date_str), feature_item))
+
+        results.append({
+            "attestation": attestation,
+            "sweep_file": echo_rel,
+            "gic": gic,
+            "gic_file": gic_file,
+            "gic_attestation": gic_rec.leaf,
+        })
+
+    _catalog_update(
+        date_str,
+        inc={"sweeps": len(records), "gic_txs": len(records), "gic_sum": gic_sum},
+        assign={"echo": str(DATA_DIR / echo_rel), "gic": str(DATA_DIR / gic_file)},
+        pending=pending,
+    )
+    return results, pending
+
+SWEEP_BATCH_MAX = safe_int(os.getenv("SWEEP_BATCH_MAX", "1000"), 1000)
+
+def _parse_sweep_batch(body: bytes) -> List[Any]:
+    """JSON array or NDJSON (one object per line) -> list of raw items."""
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+        return items
+    items = []
+    for n, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(ValueError(f"line {n}: {e}"))
+    return items
+
+@app.post("/sweep/batch")
+async def post_sweep_batch(request: Request):
+    """
+    Bulk sweep ingestion (offline sync). Body: NDJSON or a JSON array of /sweep payloads.
+    Each touched day is written once; results come back per record, in input order.
+    """
+    import asyncio
+    items = _parse_sweep_batch(await request.body())
+    if len(items) > SWEEP_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {SWEEP_BATCH_MAX} records per batch")
+
+    results: List[Optional[dict]] = [None] * len(items)
+    by_day: Dict[str, List[Tuple[int, Sweep]]] = {}
+    for i, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            sweep = Sweep.model_validate(item)
+        except Exception as e:
+            results[i] = {"index": i, "ok": False, "error": str(e)[:300]}
+            continue
+        by_day.setdefault(sweep.date, []).append((i, sweep))
+
+    # one writer job per touched day; days run in parallel
+    jobs = {
+        d: asyncio.wrap_future(day_writer.submit(d, _apply_sweeps, d, [sw for _, sw in rows]))
+        for d, rows in by_day.items()
+    }
+    pending = []
+    for d, job in jobs.items():
+        try:
+            day_results, day_pending = await job
+        except Exception as e:
+            log.exception(f"Sweep batch failed for {d}")
+            for i, _ in by_day[d]:
+                results[i] = {"index": i, "ok": False, "date": d, "error": str(e)[:300]}
+            continue
+        pending += day_pending
+        for (i, _), res in zip(by_day[d], day_results):
+            results[i] = {"index": i, "ok": True, "date": d, **res}
+    await asyncio.gather(*(asyncio.wrap_future(f) for f in pending))
 
+    accepted = [r for r in results if r and r["ok"]]
     return {
-        "attestation": attestation,
-        "sweep_file": files["echo"],
-        "gic": gic,
-        "gic_file": gic_file,
-        "gic_attestation": gic_att,
+        "ok": True,
+        "received": len(items),
+        "accepted": len(accepted),
+        "rejected": len(items) - len(accepted),
+        "days": sorted(by_day),
+        "gic_total": sum(r["gic"] for r in accepted),
+        "results": results,
     }
 
 @app.post("/seal")
-def seal(payload: Dict[str, Any]):
+def seal(payload: Dict[str, Any], x_debug_timing: Optional[str] = Header(None)):
+    t0 = time.perf_counter()
+    result = day_writer.run(payload["date"], _apply_seal, payload)
+    timings = result.pop("timings")
+    if x_debug_timing:
+        timings["total_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        timings["queue_ms"] = round(timings["total_ms"] - sum(timings[k] for k in _SEAL_STAGES), 3)
+        result["timings"] = timings
+    return result
+
+_SEAL_STAGES = ("load_ms", "hash_ms", "write_ms", "index_ms")
+
+def _apply_seal(payload: Dict[str, Any]) -> dict:
+    """
+    Seal a day in one pass: fold the seal leaf into the day's frontier (sweeps
+    and seed are already hashed there), then commit seal, root and ledger
+    together. Nothing written here is read back.
+    """
     date = payload["date"]
     files = today_files(date)
-    node_meta = get_node_metadata()
-    
-    # Load
-    seed, sweeps, seal_obj = load_day(date)
-    
-    # If caller provided the seal body now, use it & persist
+    marks = [time.perf_counter()]
+
+    # Caller-provided seal body wins; otherwise the one already on disk
     if payload.get("wins") or payload.get("blocks") or payload.get("tomorrow_intent"):
         seal_obj = {
             "type": "seal",
@@ -606,87 +735,404 @@ def seal(payload: Dict[str, Any]):
             "wins": payload.get("wins", ""),
             "blocks": payload.get("blocks", ""),
             "tomorrow_intent": payload.get("tomorrow_intent", ""),
-            "meta": {**payload.get("meta", {}), **node_meta},
+            "meta": {**payload.get("meta", {}), **get_node_metadata()},
             "ts": datetime.utcnow().isoformat() + "Z",
         }
-        write_json(files["seal"], seal_obj)
-
-    if not seed or not seal_obj:
+        seal_new = True
+    else:
+        seal_obj = read_json(files["seal"]) if (DATA_DIR / files["seal"]).exists() else None
+        seal_new = False
+    state = frontier.load(date)
+    marks.append(time.perf_counter())
+
+    if not state["seed"] or not seal_obj:
+        if seal_new:
+            write_json_group([(files["seal"], seal_obj)])  # keep the seal for a later /seal
         raise HTTPException(status_code=400, detail="Seed and Seal are required to build ledger")
 
-    ledger = build_ledger_obj(date, seed, sweeps, seal_obj)
-    write_json(files["ledger"], ledger)
-
-    # Build and write day root
+    seal_leaf = sha256_json(seal_obj)
+    day_root, state = frontier.seal_root(date, seal_leaf, state)
+    method = frontier.state_method(state)
+    counts = {"seeds": 1, "sweeps": state["sweeps"], "seals": 1}
+    ledger = ledger_obj(date, day_root, counts, method)
+    digest = DayDigest.from_leaves(frontier.leaf_hashes(date, state) + [seal_leaf], method, day_root)
+    root_rel = f"{date}.root.json"
+    marks.append(time.perf_counter())
+
+    # ledger last: its presence is what marks the day sealed
+    group = [(files["seal"], seal_obj)] if seal_new else []
+    write_json_group(group + [(root_rel, day_root_obj(date, digest)), (files["ledger"], ledger)])
+    marks.append(time.perf_counter())
+
+    _catalog_update(date, assign={
+        "seals": 1,
+        "sweeps": state["sweeps"],
+        "sealed_sweeps": state["sweeps"],
+        "day_root": day_root,
+        "seal": str(DATA_DIR / files["seal"]),
+        "ledger": str(DATA_DIR / files["ledger"]),
+    }, sealed=True)
     try:
-        root_obj = build_day_root(date, DATA_DIR)
-        root_file = f"data/{date}/{date}.root.json"
-        return {
-            "ok": True, 
-            "seal_file": files["seal"], 
-            "ledger_file": files["ledger"], 
-            "root_file": root_file,
-            "day_root": ledger["day_root"], 
-            "counts": ledger["counts"]
-        }
-    except FileNotFoundError as e:
-        return {
-            "ok": True, 
-            "seal_file": files["seal"], 
-            "ledger_file": files["ledger"], 
-            "day_root": ledger["day_root"], 
-            "counts": ledger["counts"],
-            "warning": f"Day root not created: {str(e)}"
-        }
+        cps = {kind: cp["root"] for kind, cp in checkpoints.record(date, day_root).items()}
+    except Exception:
+        # derived from the ledgers; POST /checkpoints/rebuild restores it
+        log.exception(f"Checkpoint update failed for {date}")
+        cps = {}
+    marks.append(time.perf_counter())
+
+    return {
+        "ok": True,
+        "seal_file": files["seal"],
+        "ledger_file": files["ledger"],
+        "root_file": f"data/{date}/{date}.root.json",
+        "day_root": ledger["day_root"],
+        "counts": ledger["counts"],
+        "checkpoints": cps,
+        "timings": {k: round((b - a) * 1000, 3) for k, a, b in zip(_SEAL_STAGES, marks, marks[1:])},
+    }
 
 # READ / VERIFY / INDEX / EXPORT ENDPOINTS
-@app.get("/ledger/{date}")
-def get_ledger(date: str):
+SEALED_MAX_AGE = 31536000
+
+def _sealed_response(request: Request, kind: str, date: str, build) -> Optional[Response]:
+    """
+    Serve a sealed day's representation with a strong ETag, answering
+    If-None-Match with 304 and repeated reads from the in-process cache.
+    Days untouched since their seal are marked immutable; days written to
+    after sealing still revalidate. Returns None for unsealed days.
+    """
+    v = catalog.validator(date)
+    if v is None:
+        return None
+    etag = sealed_cache.etag_for(kind, date, v)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={SEALED_MAX_AGE}, immutable" if v["frozen"] else "no-cache",
+    }
+    if sealed_cache.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = sealed_cache.get(kind, date, etag)
+    if body is None:
+        body = json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        sealed_cache.put(kind, date, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _read_ledger(date: str) -> dict:
     files = today_files(date)
     if not (DATA_DIR / files["ledger"]).exists():
         raise HTTPException(status_code=404, detail="No ledger for this date")
     return read_json(files["ledger"])
 
+@app.get("/ledger/{date}")
+def get_ledger(date: str, request: Request):
+    return _sealed_response(request, "ledger", date, lambda: _read_ledger(date)) or _read_ledger(date)
+
 @app.get("/ledger/latest")
 def ledger_latest():
     dates = [p.name for p in DATA_DIR.iterdir() if p.is_dir()]
     if not dates:
         raise HTTPException(status_code=404, detail="No data directory or no days yet")
     latest = sorted(dates)[-1]
-    return {"date": latest, "ledger": get_ledger(latest)}
+    return {"date": latest, "ledger": _read_ledger(latest)}
 
 @app.get("/verify/{date}")
-def verify_day(date: str):
+def verify_day(date: str, request: Request):
     """Verifies the day's presence of seed/echo/seal files, returns counts, and includes GIC totals."""
-    return _safe_counts_for(date)
+    cached = _sealed_response(request, "verify", date, lambda: catalog.get_day(date))
+    if cached is not None:
+        return cached
+    day = catalog.get_day(date)
+    if day is None:
+        day = _scan_day(date)
+        if any(day["present"].values()):
+            catalog.put_day(day)
+        day.pop("sealed_sweeps", None)
+        day.pop("frozen", None)
+    return day
+
+def _sealed_day(date: str) -> Tuple[dict, str]:
+    """(ledger, seal leaf) for a sealed day, or 404."""
+    files = today_files(date)
+    if not (DATA_DIR / files["ledger"]).exists() or not (DATA_DIR / files["seal"]).exists():
+        raise HTTPException(status_code=404, detail="Day is not sealed")
+    return read_json(files["ledger"]), sha256_json(read_json(files["seal"]))
+
+def _proof_response(date: str, ledger: dict, seal_leaf: str, leaf_index: int) -> dict:
+    sealed_leaves = 1 + int(ledger.get("counts", {}).get("sweeps", 0))
+    try:
+        pr = frontier.proof(date, leaf_index, sealed_leaves, seal_leaf)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if pr["root"] != ledger.get("day_root"):
+        raise HTTPException(status_code=409, detail="Day files no longer match the sealed day_root")
+    return {
+        "date": date,
+        "leaf_index": pr["index"],
+        "leaf": pr["leaf"],
+        "path": pr["path"],
+        "day_root": ledger["day_root"],
+        "leaf_count": pr["leaf_count"],
+        "method": pr["method"],
+    }
+
+@app.get("/proof/{date}/{leaf_index}")
+def proof_by_index(date: str, leaf_index: int):
+    """Merkle inclusion proof for leaf #leaf_index (0 = seed, last = seal) of a sealed day."""
+    ledger, seal_leaf = _sealed_day(date)
+    return _proof_response(date, ledger, seal_leaf, leaf_index)
+
+@app.get("/proof/{date}/by-hash/{attestation}")
+def proof_by_hash(date: str, attestation: str):
+    """Merkle inclusion proof for the record whose attestation hash is given."""
+    ledger, seal_leaf = _sealed_day(date)
+    sealed_leaves = 1 + int(ledger.get("counts", {}).get("sweeps", 0))
+    if attestation.lower() == seal_leaf:
+        leaf_index = sealed_leaves
+    else:
+        leaf_index = frontier.find_leaf(date, attestation, sealed_leaves)
+        if leaf_index is None:
+            raise HTTPException(status_code=404, detail="Attestation not found in sealed day")
+    return _proof_response(date, ledger, seal_leaf, leaf_index)
+
+# STREAMING EXPORT HELPERS
+_EXPORT_CHUNK = 64 * 1024
+
+def _export_ndjson(dates: List[str]):
+    """One line per record: {"date", "file", "record"}. JSONL files are passed through line by line."""
+    for d in dates:
+        for rel in day_files(d):
+            prefix = '{"date":' + json.dumps(d) + ',"file":' + json.dumps(rel) + ',"record":'
+            path = DATA_DIR / rel
+            if rel.endswith(".jsonl"):
+                with path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith("{") and line.endswith("}"):
+                            yield (prefix + line + "}\n").encode("utf-8")
+                continue
+            obj = read_json(rel)
+            for rec in (obj if isinstance(obj, list) else [obj]):
+                yield (prefix + json.dumps(rec, ensure_ascii=False) + "}\n").encode("utf-8")
+
+class _ZipSink:
+    """Write-only sink for zipfile: collects bytes until the generator hands them out."""
+    def __init__(self):
+        self.chunks: List[bytes] = []
+    def write(self, b) -> int:
+        self.chunks.append(bytes(b))
+        return len(b)
+    def flush(self) -> None:
+        pass
+    def drain(self) -> bytes:
+        out = b"".join(self.chunks)
+        self.chunks.clear()
+        return out
+
+def _export_zip(dates: List[str]):
+    """Zip archive streamed entry by entry (data descriptors, no seeking)."""
+    import zipfile
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for d in dates:
+            for rel in day_files(d):
+                with (DATA_DIR / rel).open("rb") as src, zf.open(rel, "w", force_zip64=True) as dst:
+                    while True:
+                        chunk = src.read(_EXPORT_CHUNK)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        out = sink.drain()
+                        if out:
+                            yield out
+                out = sink.drain()
+                if out:
+                    yield out
+    yield sink.drain()
+
+def _gzip_stream(chunks):
+    import zlib
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+@app.get("/export")
+def export_range(request: Request, start: str, end: Optional[str] = None, format: str = "ndjson"):
+    """
+    Stream every file of every day in [start, end] as NDJSON records or as a zip archive.
+    Memory stays flat regardless of range size; NDJSON is gzip-encoded when the client accepts it.
+    """
+    end = end or start
+    if not (_DATE_RE.match(start) and _DATE_RE.match(end)):
+        raise HTTPException(status_code=400, detail="start/end must be YYYY-MM-DD")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    dates = catalog.dates_between(start, end)
+    name = f"export_{start}_{end}"
+
+    if format == "zip":
+        return StreamingResponse(
+            _export_zip(dates),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{name}.zip"'},
+        )
+    if format != "ndjson":
+        raise HTTPException(status_code=400, detail="format must be ndjson or zip")
+
+    headers = {"Content-Disposition": f'attachment; filename="{name}.ndjson"'}
+    body = _export_ndjson(dates)
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        body = _gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
 
 @app.get("/export/{date}")
-def export_day(date: str):
-    files = today_files(date)
+def export_day(date: str, request: Request):
+    return _sealed_response(request, "export", date, lambda: _export_day(date)) or _export_day(date)
+
+def _export_day(date: str) -> dict:
     out = {"date": date, "files": {}}
-    for key, rel in files.items():
-        if not (DATA_DIR / rel).exists():
-            continue
-        out["files"][rel] = read_json(rel)
+    for rel in day_files(date):  # includes node shards and the gic/featured logs
+        out["files"][rel] = list(iter_records(rel)) if rel.endswith(".jsonl") else read_json(rel)
     return out
 
+# SWEEP PAGES
+SWEEPS_PAGE_MAX = safe_int(os.getenv("SWEEPS_PAGE_MAX", "1000"), 1000)
+SWEEPS_SCAN_MAX = safe_int(os.getenv("SWEEPS_SCAN_MAX", "10000"), 10000)
+
+@app.get("/sweeps/{date}")
+def list_sweeps(date: str, offset: int = 0, limit: int = 100, chamber: Optional[str] = None):
+    """
+    One page of a day's sweeps in ledger order. `index` is the sweep's position
+    (its Merkle leaf is index + 1). Pass `next` back as `offset` for the next
+    page; it is null on the last one.
+    """
+    if not _DATE_RE.match(date):
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+    if offset < 0 or not 1 <= limit <= SWEEPS_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"offset must be >= 0 and limit between 1 and {SWEEPS_PAGE_MAX}")
+    total, items, next_offset = sweep_page(date, offset, limit, chamber, SWEEPS_SCAN_MAX)
+    return {
+        "date": date,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "chamber": chamber,
+        "returned": len(items),
+        "items": [{"index": i, "record": rec} for i, rec in items],
+        "next": next_offset,
+    }
+
 @app.get("/index")
-def index_all(order: str = "desc", limit: int = 100):
-    """Lists days in the ledger with counts, gic.sum, and day_root."""
-    dates = _list_date_dirs()
-    if order.lower() == "desc":
-        dates = list(reversed(dates))
-    if limit and limit > 0:
-        dates = dates[:limit]
-
-    rows = [_safe_counts_for(d) for d in dates]
+def index_all(order: str = "desc", limit: int = 100, cursor: Optional[str] = None):
+    """Lists days in the ledger with counts, gic.sum, and day_root (served from the day catalog)."""
+    rows, next_cursor = catalog.page(order, limit, cursor)
     return {
-        "total_days": len(_list_date_dirs()),
+        "total_days": catalog.count(),
         "returned": len(rows),
         "order": order.lower(),
         "items": rows,
+        "next_cursor": next_cursor,
     }
 
+@app.post("/index/rebuild")
+def index_rebuild(x_admin_token: Optional[str] = Header(None)):
+    """Admin: rebuild the day catalog from the files on disk."""
+    _require_admin(x_admin_token)
+    n = catalog.rebuild(_scan_day(d) for d in _list_date_dirs())
+    return {"ok": True, "days": n}
+
+@app.get("/checkpoints/{period}")
+def get_checkpoint(period: str):
+    """Week (YYYY-Www), month (YYYY-MM) or year (YYYY) checkpoint over sealed day_roots."""
+    try:
+        cp = checkpoints.get(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cp is None:
+        raise HTTPException(status_code=404, detail="No sealed days in this period")
+    return cp
+
+@app.get("/checkpoints/{period}/proof/{date}")
+def checkpoint_proof(period: str, date: str):
+    """Inclusion proof of a day's day_root in a checkpoint (verify with hashing.verify_proof)."""
+    try:
+        return checkpoints.proof(period, date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.post("/checkpoints/rebuild")
+def checkpoints_rebuild(x_admin_token: Optional[str] = Header(None)):
+    """Admin: recreate every checkpoint from the sealed ledgers on disk."""
+    _require_admin(x_admin_token)
+    return {"ok": True, "checkpoints": checkpoints.rebuild()}
+
+# REPLICATION (anti-entropy between nodes)
+@app.get("/replication/roots")
+def replication_roots(period: Optional[str] = None):
+    """Year roots, the month roots of a year (period=YYYY) or the day_roots of a month (period=YYYY-MM)."""
+    try:
+        roots = replication.roots(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"node": get_node_metadata(), "period": period, "roots": roots}
+
+@app.get("/replication/day/{date}")
+def replication_day(date: str):
+    """A sealed day's primary files (base64) and their sha256 manifest, for a peer that found its root differs."""
+    try:
+        return {"date": date, **replication.export_day(date)}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+def _after_replicated(date: str) -> None:
+    sealed_cache.invalidate(date)
+    try:
+        catalog.put_day(_scan_day(date))
+    except Exception:
+        log.exception(f"Catalog update failed for {date}")
+
+@app.post("/replication/pull")
+def replication_pull(req: ReplicationPull, x_admin_token: Optional[str] = Header(None)):
+    """Admin: compare roots with `peer` top-down and pull only the days that differ."""
+    _require_admin(x_admin_token)
+    peer = replication.HttpPeer(req.peer)
+    try:
+        report = replication.reconcile(peer, req.start, req.end, req.force, on_installed=_after_replicated)
+    finally:
+        peer.close()
+    return {"ok": True, "peer": req.peer, "requests": peer.requests, **report}
+
+@app.post("/admin/audit")
+def admin_audit(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    no_cache: bool = False,
+    x_admin_token: Optional[str] = Header(None),
+):
+    """Admin: recompute day_root for every day (or [start, end]) and stream an NDJSON report."""
+    _require_admin(x_admin_token)
+    reports = audit.run(audit.dates_on_disk(start, end), use_cache=not no_cache)
+    body = ((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in reports)
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+def _write_bonus_txs(payout_str: str, payout_file: Path, txs: list[dict]) -> None:
+    """Runs on the payout day's writer: append the bonus txs in one group commit."""
+    for fut in [_enqueue_jsonl(payout_file, tx) for tx in txs]:
+        fut.result()
+    _catalog_update(
+        payout_str,
+        inc={"gic_txs": len(txs), "gic_sum": sum(int(tx["amount"]) for tx in txs)},
+        assign={"gic": str(payout_file)},
+    )
+
 @app.post("/bonus/run")
 def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
     """Admin: compute weekly featured bonuses and write GIC txs."""
@@ -728,7 +1174,7 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
     while cur <= end_d:
         dstr = cur.strftime("%Y-%m-%d")
         qpath = _day_path(dstr) / f"{dstr}.featured_queue.jsonl"
-        for r in _read_jsonl(qpath):
+        for r in jsonl.iter_records(qpath):
             L = int(r.get("len", 0) or 0)
             if L < MIN_LEN: 
                 continue
@@ -761,7 +1207,7 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
 
     # write gic txs
     payout_file = _day_path(payout_str) / f"{payout_str}.gic.jsonl"
-    wrote = 0
+    to_write = []
     dry_dumps = []
 
     for i, w in enumerate(winners):
@@ -783,8 +1229,11 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
         if req.dry:
             dry_dumps.append(tx)
         else:
-            _append_jsonl(payout_file, tx)
-            wrote += 1
+            to_write.append(tx)
+
+    if to_write:
+        day_writer.run(payout_str, _write_bonus_txs, payout_str, payout_file, to_write)
+    wrote = len(to_write)
 
     return {
         "ok": True,
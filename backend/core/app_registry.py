@@ -0,0 +1,188 @@
+"""
+Durable app registry for auth.
+
+Registered apps and their secrets live in a backend that survives restarts
+and is shared by every worker: SQLite in WAL mode by default
+(AUTH_REGISTRY=sqlite, file AUTH_REGISTRY_FILE under DATA_DIR), or an
+in-process dict (AUTH_REGISTRY=memory, single worker / tests). Auth reads
+through an in-memory cache, so token checks never touch the backend.
+
+Every write takes the next registry-wide version. At most every
+AUTH_REGISTRY_SYNC_S seconds a worker asks the backend for rows newer than
+the last version it saw, one indexed query. It updates its cache and
+reports each app that changed elsewhere, so a rotation or logout in one
+worker reaches the others within that interval. Logout leaves a tombstone
+(secret NULL), so it propagates like any other change.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.core import storage
+
+REGISTRY_FILE = os.getenv("AUTH_REGISTRY_FILE", "auth_apps.sqlite3")
+SYNC_S = float(os.getenv("AUTH_REGISTRY_SYNC_S", "1"))
+
+Row = Tuple[str, Optional[str], int]  # (app_id, secret or None if removed, version)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS apps (
+        app_id  TEXT PRIMARY KEY,
+        secret  TEXT,
+        version INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS apps_version ON apps(version)",
+)
+
+class MemoryBackend:
+    """Process-local backend: nothing is shared or persisted."""
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[Optional[str], int]] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, app_id: str) -> Optional[Tuple[Optional[str], int]]:
+        return self._rows.get(app_id)
+
+    def put(self, app_id: str, secret: Optional[str]) -> int:
+        with self._lock:
+            self._version += 1
+            self._rows[app_id] = (secret, self._version)
+            return self._version
+
+    def changes(self, since: int) -> List[Row]:
+        return sorted(((a, s, v) for a, (s, v) in self._rows.items() if v > since), key=lambda r: r[2])
+
+class SQLiteBackend:
+    """Shared backend: one SQLite file in WAL mode, a connection per thread."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path  # None: REGISTRY_FILE under the current DATA_DIR
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        path = self.path or str(storage.p(REGISTRY_FILE))
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+            conns[path] = conn
+        return conn
+
+    def get(self, app_id: str) -> Optional[Tuple[Optional[str], int]]:
+        r = self._conn().execute("SELECT secret, version FROM apps WHERE app_id = ?", (app_id,)).fetchone()
+        return (r[0], r[1]) if r else None
+
+    def put(self, app_id: str, secret: Optional[str]) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # versions are assigned one writer at a time
+        try:
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM apps").fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO apps (app_id, secret, version) VALUES (?, ?, ?)", (app_id, secret, version))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def changes(self, since: int) -> List[Row]:
+        rows = self._conn().execute("SELECT app_id, secret, version FROM apps WHERE version > ? ORDER BY version", (since,))
+        return [(r[0], r[1], r[2]) for r in rows]
+
+def default_backend():
+    kind = os.getenv("AUTH_REGISTRY", "sqlite").lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"unknown AUTH_REGISTRY: {kind!r}")
+
+class AppRegistry:
+    """
+    Read-through cache over a registry backend, with the dict-style access
+    auth uses: get(app_id) -> {"secret": ...} or None, set_secret, pop, `in`.
+    `on_change(app_id)` runs for every app whose secret changes, here or in
+    another worker.
+    """
+
+    def __init__(self, backend=None, on_change: Optional[Callable[[str], None]] = None):
+        self.backend = backend if backend is not None else default_backend()
+        self.on_change = on_change
+        self._cache: Dict[str, Tuple[Optional[str], int]] = {}  # app_id -> (secret or None if removed, version)
+        self._seen = 0  # highest backend version folded in by sync()
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, app_id: str) -> Optional[Dict[str, str]]:
+        self.maybe_sync()
+        hit = self._cache.get(app_id)
+        if hit is None:
+            # read under the lock: a write can't land between the read and the insert
+            with self._lock:
+                row = self.backend.get(app_id)
+                if row is None:
+                    return None  # unknown apps aren't cached: forged app_ids can't grow the cache
+                self._apply(app_id, *row)
+                hit = self._cache[app_id]
+        return {"secret": hit[0]} if hit[0] is not None else None
+
+    def __contains__(self, app_id: str) -> bool:
+        return self.get(app_id) is not None
+
+    def set_secret(self, app_id: str, secret: str) -> None:
+        """Register an app or replace its secret."""
+        self._write(app_id, secret)
+
+    def pop(self, app_id: str) -> bool:
+        """Remove an app (a tombstone in the backend). False if it wasn't registered."""
+        if self.get(app_id) is None:
+            return False
+        self._write(app_id, None)
+        return True
+
+    def _write(self, app_id: str, secret: Optional[str]) -> None:
+        version = self.backend.put(app_id, secret)
+        with self._lock:
+            self._apply(app_id, secret, version)
+        self._changed(app_id)
+
+    def _apply(self, app_id: str, secret: Optional[str], version: int) -> bool:
+        """Cache a row unless a newer one is cached already. Caller holds the lock."""
+        cached = self._cache.get(app_id)
+        if cached is not None and cached[1] >= version:
+            return False
+        self._cache[app_id] = (secret, version)
+        return True
+
+    def maybe_sync(self) -> None:
+        """Fold in other workers' writes if the sync interval has passed (a float compare otherwise)."""
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._next_sync = time.monotonic() + SYNC_S
+            changed = []
+            for app_id, secret, version in self.backend.changes(self._seen):
+                self._seen = max(self._seen, version)
+                known = app_id in self._cache  # only apps we served can have tokens to invalidate
+                if self._apply(app_id, secret, version) and known:
+                    changed.append(app_id)
+        for app_id in changed:
+            self._changed(app_id)
+
+    def _changed(self, app_id: str) -> None:
+        if self.on_change is not None:
+            self.on_change(app_id)
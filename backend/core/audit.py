@@ -0,0 +1,240 @@
+"""
+Full-history audit: recompute every sealed day's root from its raw files and
+compare it with {date}.ledger.json and {date}.root.json.
+
+Unlike the frontier, nothing derived is trusted: seed, sweeps and seal are
+re-read and re-hashed with the method the ledger recorded, and the sweep
+logs' offset indexes are rebuilt from the raw lines first. Only the sweeps
+the ledger sealed (counts.sweeps) are included; later ones are reported
+but don't fail the day. Corrupt log lines are skipped and reported as
+corrupt_lines. Days are audited in parallel in a process pool
+(AUDIT_WORKERS, default cpu count). The pool is created once per process,
+with the spawn start method so it is safe to start from a request thread,
+and is shared by concurrent audits.
+
+Results are cached in audit_cache.json by the (size, mtime) of each day's
+files, so a rerun only rehashes days whose files changed. Each run merges
+its results into the file under a lock, so concurrent audits don't lose or
+corrupt each other's entries.
+
+CLI:
+    python -m backend.core.audit [--start DATE] [--end DATE] [--workers N] [--no-cache]
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from backend.core import jsonl, storage
+from backend.core.hashing import MERKLE_HEX, digest_day
+
+try:
+    import fcntl  # cross-worker lock around the cache merge (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+CACHE_FILE = "audit_cache.json"
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_pools: Dict[int, ProcessPoolExecutor] = {}  # size -> shared pool
+_pools_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+def dates_on_disk(start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+    """Dates with any file under DATA_DIR, optionally limited to [start, end]."""
+    if not storage.DATA_DIR.exists():
+        return []
+    dates = {p.name.split(".", 1)[0] for p in storage.DATA_DIR.iterdir()}
+    return sorted(
+        d for d in dates
+        if _DATE_RE.match(d) and (not start or d >= start) and (not end or d <= end)
+    )
+
+def _audited_files(date_str: str) -> List[str]:
+    files = storage.today_files(date_str)
+    return [
+        files["seed"], files["echo_legacy"], files["echo"], *storage.shard_files(date_str),
+        files["seal"], files["ledger"], f"{date_str}.root.json",
+    ]
+
+def signature(date_str: str) -> List[list]:
+    """(file, size, mtime_ns) of every file the audit of a day reads."""
+    sig = []
+    for rel in _audited_files(date_str):
+        path = storage.p(rel)
+        if path.exists():
+            st = path.stat()
+            sig.append([rel, st.st_size, st.st_mtime_ns])
+    return sig
+
+def audit_day(date_str: str) -> dict:
+    """Recompute one day's root and compare it with the stored artifacts."""
+    files = storage.today_files(date_str)
+    out: Dict[str, object] = {"type": "day", "date": date_str}
+    try:
+        if not storage.p(files["ledger"]).exists():
+            out["status"] = "unsealed"
+            return out
+        ledger = storage.read_json(files["ledger"])
+        root_rel = f"{date_str}.root.json"
+        root_obj = storage.read_json(root_rel) if storage.p(root_rel).exists() else None
+        method = ledger.get("method") or (root_obj or {}).get("method") or MERKLE_HEX
+        sealed = int(ledger.get("counts", {}).get("sweeps", 0))
+
+        seed = storage.read_json(files["seed"]) if storage.p(files["seed"]).exists() else None
+        seal = storage.read_json(files["seal"]) if storage.p(files["seal"]).exists() else None
+        corrupt = sum(jsonl.reindex(storage.p(rel)) for rel in [files["echo"], *storage.shard_files(date_str)])
+        sweeps = storage.iter_sweeps(date_str)
+        digest = digest_day(seed, itertools.islice(sweeps, sealed), seal, method)
+        later = sum(1 for _ in sweeps)
+
+        mismatches = []
+        if seed is None:
+            mismatches.append("seed file missing")
+        if seal is None:
+            mismatches.append("seal file missing")
+        if len(digest.echo) < sealed:
+            mismatches.append(f"ledger sealed {sealed} sweeps, only {len(digest.echo)} on disk")
+        if ledger.get("day_root") != digest.root:
+            mismatches.append("ledger day_root differs from recomputed root")
+        if root_obj is not None and root_obj.get("root") != digest.root:
+            mismatches.append("root.json root differs from recomputed root")
+
+        out.update({
+            "status": "mismatch" if mismatches else "ok",
+            "method": method,
+            "computed": digest.root,
+            "ledger_root": ledger.get("day_root"),
+            "root_file_root": (root_obj or {}).get("root"),
+            "sealed_sweeps": sealed,
+            "unsealed_sweeps": later,
+            "corrupt_lines": corrupt,
+            "mismatches": mismatches,
+        })
+    except Exception as e:
+        out.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    return out
+
+def _load_cache() -> dict:
+    path = storage.p(CACHE_FILE)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(updates: dict) -> None:
+    """Merge this run's entries into the cache file (re-read under the lock, written via a private tmp)."""
+    path = storage.p(CACHE_FILE)
+    with _cache_lock, open(path.with_name(path.name + ".lock"), "a") as lock_f:
+        if fcntl:
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+        cache = _load_cache()
+        cache.update(updates)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(f.name, path)
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+def shutdown() -> None:
+    """Stop the shared audit pools (app shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+def _audit_in(data_dir: str, date_str: str) -> dict:
+    """audit_day in a pool worker: the pool is shared, so the data dir travels with each task."""
+    storage.DATA_DIR = Path(data_dir)
+    return audit_day(date_str)
+
+def run(dates: List[str], workers: Optional[int] = None, use_cache: bool = True) -> Iterator[dict]:
+    """
+    Audit `dates`, yielding one report per day in date order, then a summary.
+    Days whose files are unchanged since the last audit come from the cache.
+    """
+    t0 = time.perf_counter()
+    workers = workers or int(os.getenv("AUDIT_WORKERS", "0")) or os.cpu_count() or 1
+    cache = _load_cache() if use_cache else {}
+    sigs = {d: signature(d) for d in dates}
+    todo = [d for d in dates if (cache.get(d) or {}).get("sig") != sigs[d]]
+
+    futures = []
+    if workers > 1 and len(todo) > 1:
+        pool = _pool(workers)
+        futures = [pool.submit(_audit_in, str(storage.DATA_DIR), d) for d in todo]
+        computed = (f.result() for f in futures)
+    else:
+        computed = map(audit_day, todo)
+
+    totals = {"ok": 0, "mismatch": 0, "unsealed": 0, "error": 0}
+    cached = 0
+    updates = {}
+    try:
+        todo_set = set(todo)
+        for d in dates:
+            if d in todo_set:
+                result = next(computed)
+                if result["status"] != "error":
+                    updates[d] = {"sig": sigs[d], "result": result}
+                result = {**result, "cached": False}
+            else:
+                result = {**cache[d]["result"], "cached": True}
+                cached += 1
+            totals[result["status"]] += 1
+            yield result
+    finally:
+        for f in futures:
+            f.cancel()  # a client that went away leaves nothing queued on the shared pool
+        if use_cache and updates:
+            _save_cache(updates)
+
+    yield {
+        "type": "summary",
+        "days": len(dates),
+        **totals,
+        "cached": cached,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Recompute and check every sealed day's root.")
+    ap.add_argument("--start", help="first date (YYYY-MM-DD), default: earliest")
+    ap.add_argument("--end", help="last date (YYYY-MM-DD), default: latest")
+    ap.add_argument("--data-dir", help="ledger data directory (default: backend/data)")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: AUDIT_WORKERS or cpu count)")
+    ap.add_argument("--no-cache", action="store_true", help="rehash every day, ignoring audit_cache.json")
+    args = ap.parse_args(argv)
+
+    if args.data_dir:
+        storage.DATA_DIR = Path(args.data_dir)
+    failed = False
+    try:
+        for report in run(dates_on_disk(args.start, args.end), args.workers, not args.no_cache):
+            print(json.dumps(report, ensure_ascii=False))
+            failed = failed or report.get("status") in ("mismatch", "error")
+    finally:
+        shutdown()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,34 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from pydantic import BaseModel
 import base64
+import heapq
 import hmac
 import hashlib
 import os
+import threading
 import time
-import sys
+
+from backend.core import auth_log
+from backend.core.app_registry import AppRegistry
 
 # Create the main auth router
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# In-memory app registry (swap for DB/Redis in production)
-APPS: dict[str, dict[str, str]] = {}      # app_id -> {"secret": <base64>}
+# Registered apps: durable, shared registry behind an in-memory read-through cache.
+# A secret changed here or in another worker invalidates the app's cached tokens.
+APPS = AppRegistry(on_change=lambda app_id: forget_app(app_id))
+
+# Per-app not-before generation. Bumped whenever every token an app holds stops
+# being valid (secret rotated, app logged out or re-registered): anything cached
+# under an older generation is dead without being visited, so that is O(1).
+_app_gen: dict[str, int] = {}
 
-# Token blacklist for soft logout
-TOKEN_BLACKLIST: set[str] = set()
+# Verified-token cache: sha256(token) -> (app_id, exp, generation). A hit skips
+# decoding and the HMAC. Soft logout drops its entry before it returns.
+VERIFY_CACHE_MAX = int(os.getenv("AUTH_VERIFY_CACHE_MAX", "10000"))
+_verified: dict[bytes, tuple[str, int, int]] = {}
+_forget_seq = 0  # bumped on every soft logout; a verify that raced one isn't cached
+_verified_lock = threading.Lock()
 
 # -------- helpers --------
 def b64(b: bytes) -> str: 
@@ -46,23 +60,140 @@ def parse_token(token: str) -> tuple[str, int, str]:
     app_id, exp_str, sig_b64 = parts
     return app_id, int(exp_str), sig_b64
 
-def verify_token(token: str) -> bool:
-    """Utility verifier (handy for your admin endpoints)."""
-    if token in TOKEN_BLACKLIST:
-        return False
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _cache_verified(key: bytes, app_id: str, exp: int, gen: int, seq: int) -> None:
+    with _verified_lock:
+        if seq != _forget_seq or gen != _app_gen.get(app_id, 0):
+            return
+        if len(_verified) >= VERIFY_CACHE_MAX:
+            now = time.time()
+            for k, (a, e, g) in list(_verified.items()):
+                if e < now or g != _app_gen.get(a, 0):
+                    del _verified[k]
+            if len(_verified) >= VERIFY_CACHE_MAX:
+                del _verified[next(iter(_verified))]  # oldest insertion
+        _verified[key] = (app_id, exp, gen)
+
+def forget_token(token: str) -> None:
+    """Drop one token's cached verification (soft logout)."""
+    global _forget_seq
+    with _verified_lock:
+        _forget_seq += 1
+        _verified.pop(_token_key(token), None)
+
+def forget_app(app_id: str) -> None:
+    """Invalidate every token of an app at once (secret rotated or app logged out)."""
+    with _verified_lock:
+        _app_gen[app_id] = _app_gen.get(app_id, 0) + 1
+    REVOKED.drop_app(app_id)  # its revoked tokens can't verify any more either
+
+def verified(token: str) -> tuple[str, int] | None:
+    """(app_id, exp) if the token is valid, else None. Repeat checks are one dict lookup."""
+    APPS.maybe_sync()  # picks up rotations and logouts from other workers
+    key = _token_key(token)
+    hit = _verified.get(key)
+    if hit is not None:
+        app_id, exp, gen = hit
+        if time.time() <= exp and _app_gen.get(app_id, 0) == gen:
+            return app_id, exp
+        with _verified_lock:
+            _verified.pop(key, None)
+        return None
+    seq = _forget_seq
+    if token in REVOKED:
+        return None
     try:
         app_id, exp, sig_b64 = parse_token(token)
     except Exception:
-        return False
+        return None
     if time.time() > exp:
-        return False
+        return None
+    gen = _app_gen.get(app_id, 0)  # read before the secret: a rotation after this makes the entry stale
     meta = APPS.get(app_id)
     if not meta:
-        return False
+        return None
     secret_b = b64d(meta["secret"])
     payload = f"{app_id}|{exp}".encode()
     expected = b64(hmac_sha256(secret_b, payload))
-    return hmac.compare_digest(sig_b64, expected)
+    if not hmac.compare_digest(sig_b64, expected):
+        return None
+    _cache_verified(key, app_id, exp, gen, seq)
+    return app_id, exp
+
+def verify_token(token: str) -> bool:
+    """Utility verifier (handy for your admin endpoints)."""
+    return verified(token) is not None
+
+# -------- revocation --------
+class RevocationStore:
+    """
+    Soft-logged-out tokens, indexed by app_id. An entry is kept only until
+    its token's exp (after that the token fails as expired anyway), so memory
+    is bounded by the number of live revoked tokens.
+    """
+
+    def __init__(self):
+        self._keys: dict[bytes, int] = {}               # sha256(token) -> exp
+        self._by_app: dict[str, dict[bytes, str]] = {}  # app_id -> {sha256(token): token}
+        self._expiry: list[tuple[int, bytes, str]] = [] # min-heap of (exp, key, app_id)
+        self._lock = threading.Lock()
+
+    def __contains__(self, token: str) -> bool:
+        return _token_key(token) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def revoke(self, token: str) -> bool:
+        """Revoke one token. False if it is malformed or already expired (nothing to keep)."""
+        try:
+            app_id, exp, _sig = parse_token(token)
+        except Exception:
+            return False
+        now = time.time()
+        key = _token_key(token)
+        with self._lock:
+            self._purge(now)
+            if exp < now:
+                return False
+            if key not in self._keys:
+                self._keys[key] = exp
+                self._by_app.setdefault(app_id, {})[key] = token
+                heapq.heappush(self._expiry, (exp, key, app_id))
+        return True
+
+    def for_app(self, app_id: str) -> list[str]:
+        """This app's revoked tokens that haven't expired yet."""
+        with self._lock:
+            self._purge(time.time())
+            return list(self._by_app.get(app_id, {}).values())
+
+    def drop_app(self, app_id: str) -> None:
+        """Stop listing an app's tokens. They stay revoked until they expire."""
+        with self._lock:
+            self._by_app.pop(app_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self._by_app.clear()
+            self._expiry.clear()
+
+    def _purge(self, now: float) -> None:
+        # caller holds self._lock
+        while self._expiry and self._expiry[0][0] < now:
+            _exp, key, app_id = heapq.heappop(self._expiry)
+            self._keys.pop(key, None)
+            tokens = self._by_app.get(app_id)
+            if tokens is not None:
+                tokens.pop(key, None)
+                if not tokens:
+                    del self._by_app[app_id]
+
+# Tokens revoked by soft logout
+REVOKED = RevocationStore()
 
 # -------- models --------
 @dataclass
@@ -90,21 +221,22 @@ def admin_required(
 ) -> AdminContext:
     """
     Dependency to secure admin routes.
-    Logs every attempt and returns (app_id, exp) context.
+    Logs every attempt (see auth_log) and returns (app_id, exp) context.
     Expects: Authorization: Bearer <token>
     """
     if not authorization or not authorization.startswith("Bearer "):
-        print(f"[ADMIN_AUTH][FAIL] Missing token for {request.url}", file=sys.stderr)
+        auth_log.record(False, reason="missing_token", method=request.method, path=request.scope.get("path"))
         raise HTTPException(status_code=401, detail="Missing bearer token")
 
     token = authorization.split(" ", 1)[1].strip()
 
-    if not verify_token(token):
-        print(f"[ADMIN_AUTH][FAIL] Invalid/expired token for {request.url}", file=sys.stderr)
+    ok = verified(token)
+    if ok is None:
+        auth_log.record(False, reason="invalid_or_expired", method=request.method, path=request.scope.get("path"))
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    app_id, exp, _sig = parse_token(token)
-    print(f"[ADMIN_AUTH][OK] app_id={app_id} exp={exp} url={request.url}", file=sys.stderr)
+    app_id, exp = ok
+    auth_log.record(True, app_id=app_id, exp=exp, method=request.method, path=request.scope.get("path"))
     return AdminContext(app_id=app_id, exp=exp)
 
 # -------- auth endpoints --------
@@ -156,7 +288,7 @@ def register_app(req: RegisterApp):
         raise HTTPException(400, detail="app_id required")
     # 32 bytes, base64-encoded
     secret = b64(os.urandom(32))
-    APPS[app_id] = {"secret": secret}
+    APPS.set_secret(app_id, secret)  # re-registering replaces the secret
     return {"app_id": app_id, "secret": secret}
 
 @router.post("/issue_token")
@@ -226,7 +358,9 @@ def soft_logout(authorization: str = Header(None)):
         return {"ok": False, "reason": "missing bearer token"}
 
     token = authorization.split(" ", 1)[1].strip()
-    TOKEN_BLACKLIST.add(token)
+    if verified(token) is not None:  # only live tokens need (and get) an entry
+        REVOKED.revoke(token)
+        forget_token(token)
     return {"ok": True, "message": "This token has been invalidated (soft logout)."}
 
 @router.post("/rotate_secret")
@@ -240,7 +374,7 @@ def rotate_secret(req: RotateSecret):
     if not hmac.compare_digest(expected, req.proof):
         raise HTTPException(401, detail="Invalid proof")
     new_secret = b64(os.urandom(32))
-    APPS[req.app_id]["secret"] = new_secret
+    APPS.set_secret(req.app_id, new_secret)
     return {"app_id": req.app_id, "secret": new_secret}
 
 # (Optional) quick verifier route for debugging; remove if you don't want it public.
@@ -288,15 +422,17 @@ def sessions(ctx: AdminContext = Depends(admin_required)):
     # So instead, show current secret + blacklist info.
     sessions.append({
         "secret_prefix": meta["secret"][:6] + "...",
-        "tokens_blacklisted": [
-            t for t in TOKEN_BLACKLIST
-            if parse_token(t)[0] == app_id
-        ],
+        "tokens_blacklisted": REVOKED.for_app(app_id),
         "tokens_active_note": "All tokens not in blacklist are considered active until expiry."
     })
 
     return {"ok": True, "app_id": app_id, "sessions": sessions}
 
+@admin_router.get("/auth_log")
+def auth_log_stats(ctx: AdminContext = Depends(admin_required)):
+    """Auth log pipeline: queue depth plus queued, written, sampled-out and dropped events."""
+    return {"ok": True, **auth_log.stats()}
+
 @admin_router.post("/refresh")
 def refresh_token(
     request: Request,
@@ -345,8 +481,7 @@ def logout(ctx: AdminContext = Depends(admin_required)):
     Invalidate an app's session by removing its secret.
     All previously issued tokens will stop working.
     """
-    if ctx.app_id in APPS:
-        APPS.pop(ctx.app_id, None)
+    if APPS.pop(ctx.app_id):
         return {
             "ok": True,
             "message": f"App '{ctx.app_id}' logged out, all tokens invalidated."
@@ -0,0 +1,194 @@
+"""
+Structured, non-blocking auth log.
+
+record() samples the event, builds a small dict and puts it on a bounded
+queue. Nothing is formatted or written in the request path. A background
+thread drains the queue in batches and appends them as JSONL to
+AUTH_LOG_DIR/auth.jsonl (default DATA_DIR/logs). Once the file passes
+AUTH_LOG_MAX_BYTES, it is rotated to auth.jsonl.1 … .AUTH_LOG_BACKUPS.
+Workers share the file: each batch is appended and rotated under an flock.
+
+Failures are always kept. Successes are kept with probability
+AUTH_LOG_SAMPLE. When the queue is full an event is dropped and counted
+instead of blocking the request. stats() reports the queue depth and every
+counter. shutdown() writes whatever is still queued and stops the writer, so
+queued failures survive a restart.
+"""
+from __future__ import annotations
+import json
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.core import storage
+
+try:
+    import fcntl  # cross-worker lock around append + rotate (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+LOG_NAME = "auth.jsonl"
+MAX_BATCH = 512
+_STOP = object()  # queued by close(): the writer exits once it reaches it
+
+class AuthLog:
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        sample: float = 0.1,
+        max_queue: int = 10000,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+    ):
+        self.log_dir = log_dir  # None: DATA_DIR/logs at write time
+        self.sample = sample
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counts = {"queued": 0, "written": 0, "sampled_out": 0, "dropped": 0, "batches": 0, "rotations": 0, "write_errors": 0}
+
+    # ---------- producer side ----------
+    def record(
+        self,
+        ok: bool,
+        reason: Optional[str] = None,
+        app_id: Optional[str] = None,
+        exp: Optional[int] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> bool:
+        """Queue one auth event. Returns False if it was sampled out or dropped; never blocks."""
+        if ok and random.random() >= self.sample:
+            self._count("sampled_out")
+            return False
+        event = {"ts": time.time(), "ok": ok, "reason": reason, "app_id": app_id, "exp": exp, "method": method, "path": path}
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("queued")
+        return True
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += n
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "sample": self.sample,
+            **counts,
+            "file": str(self._path()),
+        }
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until everything queued so far is written (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything queued so far, then stop the writer. A later record() starts a new one."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return  # writer is stuck; it's a daemon thread, don't hold up shutdown
+        thread.join(timeout)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="auth-log", daemon=True)
+                self._thread.start()
+
+    # ---------- writer side ----------
+    def _path(self) -> Path:
+        return Path(self.log_dir) / LOG_NAME if self.log_dir else storage.p("logs") / LOG_NAME
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= MAX_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+                self._count("written", len(batch))
+                self._count("batches")
+            except Exception:
+                self._count("write_errors")  # the log must never take the API down
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[dict]) -> None:
+        path = self._path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in batch).encode("utf-8")
+        with open(path.with_name(LOG_NAME + ".lock"), "a") as lock_f:
+            if fcntl:
+                fcntl.flock(lock_f, fcntl.LOCK_EX)
+            # reopened per batch: another worker may have rotated the file since the last one
+            with open(path, "ab") as f:
+                f.write(data)
+                size = f.tell()
+            if size >= self.max_bytes:
+                self._rotate(path)
+
+    def _rotate(self, path: Path) -> None:
+        # caller holds the lock file
+        if self.backups <= 0:
+            path.unlink(missing_ok=True)
+        else:
+            for i in range(self.backups - 1, 0, -1):
+                src = path.with_name(f"{path.name}.{i}")
+                if src.exists():
+                    os.replace(src, path.with_name(f"{path.name}.{i + 1}"))
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        self._count("rotations")
+
+LOG = AuthLog(
+    log_dir=os.getenv("AUTH_LOG_DIR") or None,
+    sample=float(os.getenv("AUTH_LOG_SAMPLE", "0.1")),
+    max_queue=int(os.getenv("AUTH_LOG_QUEUE", "10000")),
+    max_bytes=int(os.getenv("AUTH_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backups=int(os.getenv("AUTH_LOG_BACKUPS", "5")),
+)
+
+def record(ok: bool, **fields) -> bool:
+    return LOG.record(ok, **fields)
+
+def stats() -> Dict[str, object]:
+    return LOG.stats()
+
+def shutdown() -> None:
+    LOG.close()
@@ -0,0 +1,229 @@
+"""
+Persistent day catalog.
+
+One row per day with the counts, gic sum, day_root and file locations that
+/index and /verify/{date} report. Rows are updated incrementally on every
+write, so listing days is an indexed O(limit) query instead of re-reading
+every file of every day. SQLite in WAL mode keeps it shared between workers.
+
+Every write to a day (seed, sweeps, gic, seal, a rescan) also bumps the row's
+`writes` counter, which never goes back. The seal records the value it left
+behind in `sealed_writes`, so "nothing written since the seal" is one compare.
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.core import storage
+
+CATALOG_FILE = "catalog.sqlite3"
+
+_COUNTS = ("seeds", "sweeps", "seals", "gic_txs", "gic_sum")
+_LINKS = ("seed", "echo", "seal", "ledger", "gic")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date     TEXT PRIMARY KEY,
+    seeds    INTEGER NOT NULL DEFAULT 0,
+    sweeps   INTEGER NOT NULL DEFAULT 0,
+    seals    INTEGER NOT NULL DEFAULT 0,
+    gic_txs  INTEGER NOT NULL DEFAULT 0,
+    gic_sum  INTEGER NOT NULL DEFAULT 0,
+    day_root TEXT,
+    seed     TEXT,
+    echo     TEXT,
+    seal     TEXT,
+    ledger   TEXT,
+    gic      TEXT,
+    sealed_sweeps INTEGER,
+    writes   INTEGER NOT NULL DEFAULT 0,
+    sealed_writes INTEGER
+)
+"""
+
+# columns added after the first release: (name, type) added in place on open
+_MIGRATIONS = (
+    ("sealed_sweeps", "INTEGER"),
+    ("writes", "INTEGER NOT NULL DEFAULT 0"),
+    ("sealed_writes", "INTEGER"),
+)
+
+_local = threading.local()
+
+def _conn() -> sqlite3.Connection:
+    path = str(storage.p(CATALOG_FILE))
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        have = {r["name"] for r in conn.execute("PRAGMA table_info(days)")}
+        for name, typ in _MIGRATIONS:
+            if name not in have:
+                conn.execute(f"ALTER TABLE days ADD COLUMN {name} {typ}")
+        conns[path] = conn
+    return conn
+
+def _to_row(day: dict) -> Dict[str, object]:
+    """Flatten a /verify-shaped dict into catalog columns."""
+    counts = day.get("counts", {})
+    links = day.get("links", {})
+    return {
+        "date": day["date"],
+        "seeds": int(counts.get("seeds", 0)),
+        "sweeps": int(counts.get("sweeps", 0)),
+        "seals": int(counts.get("seals", 0)),
+        "gic_txs": int(counts.get("gic_txs", 0)),
+        "gic_sum": int(day.get("gic", {}).get("sum", 0)),
+        "day_root": day.get("day_root"),
+        "seed": links.get("seed"),
+        "echo": links.get("echo"),
+        "seal": links.get("seal"),
+        "ledger": links.get("ledger"),
+        "gic": day.get("gic", {}).get("file"),
+        "sealed_sweeps": day.get("sealed_sweeps"),
+    }
+
+def _from_row(r: sqlite3.Row) -> dict:
+    """Inverse of _to_row: same shape as the disk scan in main._safe_counts_for."""
+    return {
+        "date": r["date"],
+        "present": {
+            "seed": r["seeds"] > 0,
+            "echo": r["echo"] is not None,
+            "seal": r["seals"] > 0,
+            "ledger": r["ledger"] is not None,
+            "gic": r["gic"] is not None,
+        },
+        "counts": {
+            "seeds": r["seeds"],
+            "sweeps": r["sweeps"],
+            "seals": r["seals"],
+            "gic_txs": r["gic_txs"],
+        },
+        "gic": {"sum": r["gic_sum"], "file": r["gic"]},
+        "day_root": r["day_root"],
+        "links": {k: r[k] for k in ("seed", "echo", "seal", "ledger")},
+    }
+
+def _upsert(conn: sqlite3.Connection, day: dict) -> None:
+    """
+    Insert or overwrite a day's row from a /verify-shaped dict, counting it as a write.
+    `day["frozen"]` (from a disk scan) says nothing was written after the ledger.
+    """
+    row = _to_row(day)
+    cols = ", ".join(row)
+    marks = ", ".join("?" for _ in row)
+    updates = ", ".join(f"{k} = excluded.{k}" for k in row if k != "date")
+    conn.execute(
+        f"INSERT INTO days ({cols}, writes, sealed_writes) VALUES ({marks}, 1, CASE WHEN ? THEN 1 END) "
+        f"ON CONFLICT(date) DO UPDATE SET {updates}, "
+        f"writes = days.writes + 1, sealed_writes = CASE WHEN ? THEN days.writes + 1 END",
+        (*row.values(), bool(day.get("frozen")), bool(day.get("frozen"))),
+    )
+
+def put_day(day: dict) -> None:
+    """Insert or replace a day's row from a /verify-shaped dict."""
+    _upsert(_conn(), day)
+
+def bump(
+    date_str: str,
+    inc: Optional[Dict[str, int]] = None,
+    assign: Optional[Dict[str, object]] = None,
+    sealed: bool = False,
+) -> bool:
+    """
+    Apply one write to an existing row: add `inc` to counters, overwrite `assign` columns.
+    `sealed` marks this write as the seal: the day is frozen until its next write.
+    Returns False if the day isn't catalogued yet (caller should put_day a fresh scan).
+    """
+    inc = {k: v for k, v in (inc or {}).items() if k in _COUNTS}
+    assign = {k: v for k, v in (assign or {}).items() if k in _LINKS or k in _COUNTS or k in ("day_root", "sealed_sweeps")}
+    parts = [f"{k} = {k} + ?" for k in inc] + [f"{k} = ?" for k in assign] + ["writes = writes + 1"]
+    if sealed:
+        parts.append("sealed_writes = writes + 1")  # right-hand sides see the row before the update
+    cur = _conn().execute(
+        f"UPDATE days SET {', '.join(parts)} WHERE date = ?",
+        (*inc.values(), *assign.values(), date_str),
+    )
+    return cur.rowcount > 0
+
+def get_day(date_str: str) -> Optional[dict]:
+    r = _conn().execute("SELECT * FROM days WHERE date = ?", (date_str,)).fetchone()
+    return _from_row(r) if r else None
+
+def validator(date_str: str) -> Optional[dict]:
+    """
+    Cheap cache validator for a sealed day: its day_root, a version that changes
+    with any later write (seed, sweep, gic, featured, rescan), and whether
+    nothing was written since the seal. None if the day isn't sealed.
+    """
+    r = _conn().execute(
+        "SELECT day_root, sweeps, gic_txs, gic_sum, writes, sealed_writes FROM days WHERE date = ? AND seals > 0",
+        (date_str,),
+    ).fetchone()
+    if r is None or not r["day_root"]:
+        return None
+    return {
+        "day_root": r["day_root"],
+        "version": f"{r['writes']}.{r['sweeps']}.{r['gic_txs']}.{r['gic_sum']}",
+        "frozen": r["sealed_writes"] is not None and r["sealed_writes"] == r["writes"],
+    }
+
+def count() -> int:
+    return _conn().execute("SELECT COUNT(*) FROM days").fetchone()[0]
+
+def page(order: str = "desc", limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of days ordered by date. `cursor` is the last date of the previous
+    page. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    desc = order.lower() == "desc"
+    sql = "SELECT * FROM days"
+    args: list = []
+    if cursor:
+        sql += " WHERE date < ?" if desc else " WHERE date > ?"
+        args.append(cursor)
+    sql += " ORDER BY date DESC" if desc else " ORDER BY date ASC"
+    if limit and limit > 0:
+        sql += " LIMIT ?"
+        args.append(limit + 1)  # one extra row tells us whether there is a next page
+    rows = [_from_row(r) for r in _conn().execute(sql, args)]
+    if limit and limit > 0 and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["date"]
+    return rows, None
+
+def dates_between(start: str, end: str) -> List[str]:
+    """Catalogued dates in [start, end], ascending."""
+    rows = _conn().execute("SELECT date FROM days WHERE date BETWEEN ? AND ? ORDER BY date", (start, end))
+    return [r["date"] for r in rows]
+
+def rebuild(days: Iterable[dict]) -> int:
+    """
+    Replace the whole catalog with the given /verify-shaped rows (e.g. a disk scan).
+    Rows of days that are still there keep counting writes, so their validators never repeat.
+    """
+    days = list(days)  # scan before taking the write lock
+    conn = _conn()
+    n = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        keep = {day["date"] for day in days}
+        for (date_str,) in conn.execute("SELECT date FROM days").fetchall():
+            if date_str not in keep:
+                conn.execute("DELETE FROM days WHERE date = ?", (date_str,))
+        for day in days:
+            _upsert(conn, day)
+            n += 1
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return n
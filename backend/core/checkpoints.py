@@ -0,0 +1,181 @@
+"""
+Checkpoint roots over sealed days.
+
+Each ISO week ("2025-W41"), month ("2025-10") and year ("2025") gets a
+checkpoints/{period}.json object holding the (date, day_root) of every
+sealed day in it and a Merkle root over them. Each leaf is the hash of
+{"date", "day_root"}, in date order.
+
+A seal updates just the three checkpoints its day falls in. Each checkpoint
+also stores its Merkle frontier, so sealing a day later than every day
+already in the period folds in one leaf (O(log days)) instead of rehashing
+the period. A day sealed out of order, or a re-seal, rebuilds that
+checkpoint's tree. Proving a day against a year then takes one checkpoint
+proof (O(log days)), and a whole year can be audited with one root
+comparison.
+
+The method is chosen when a checkpoint is created and kept after that,
+the same way a day keeps its method.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from datetime import date as _date, datetime
+from typing import Dict, Optional
+
+from backend.core import storage
+from backend.core.hashing import MerkleAccumulator, default_method, merkle_path, sha256_json
+
+try:
+    import fcntl  # cross-worker lock on the checkpoint dir (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+CHECKPOINT_DIR = "checkpoints"
+_PERIOD_RE = re.compile(r"^(\d{4})(?:-(\d{2})|-W(\d{2}))?$")
+_lock = threading.Lock()
+
+def periods_for(date_str: str) -> Dict[str, str]:
+    """{"week": "YYYY-Www", "month": "YYYY-MM", "year": "YYYY"} containing the date."""
+    d = _date.fromisoformat(date_str)
+    iso_year, iso_week, _ = d.isocalendar()
+    return {
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "month": f"{d.year}-{d.month:02d}",
+        "year": f"{d.year}",
+    }
+
+def kind_of(period: str) -> str:
+    m = _PERIOD_RE.match(period)
+    if not m:
+        raise ValueError(f"not a checkpoint period: {period!r} (want YYYY, YYYY-MM or YYYY-Www)")
+    return "month" if m.group(2) else "week" if m.group(3) else "year"
+
+def leaf(date_str: str, day_root: str) -> str:
+    return sha256_json({"date": date_str, "day_root": day_root})
+
+def _rel(period: str) -> str:
+    return f"{CHECKPOINT_DIR}/{period}.json"
+
+def get(period: str) -> Optional[dict]:
+    kind_of(period)
+    path = storage.p(_rel(period))
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _build(period: str, days: Dict[str, str], method: str) -> dict:
+    dates = sorted(days)
+    acc = MerkleAccumulator(method=method)
+    for d in dates:
+        acc.append(leaf(d, days[d]))
+    return {
+        "type": "checkpoint",
+        "period": period,
+        "kind": kind_of(period),
+        "days": [{"date": d, "day_root": days[d]} for d in dates],
+        "root": acc.root(),
+        "method": method,
+        "frontier": acc.to_dict(),
+        "ts": datetime.utcnow().isoformat() + "Z",
+    }
+
+def _append(cp: dict, date_str: str, day_root: str) -> dict:
+    """Fold a day later than every day in `cp` into its frontier: one leaf, no rehash."""
+    acc = MerkleAccumulator.from_dict(cp["frontier"])
+    acc.append(leaf(date_str, day_root))
+    return {
+        **cp,
+        "days": cp["days"] + [{"date": date_str, "day_root": day_root}],
+        "root": acc.root(),
+        "frontier": acc.to_dict(),
+        "ts": datetime.utcnow().isoformat() + "Z",
+    }
+
+def _write(cp: dict) -> None:
+    path = storage.p(_rel(cp["period"]))
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cp, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+class _Locked:
+    """Thread lock plus an flock on checkpoints/.lock, so seals of different days don't race."""
+
+    def __enter__(self):
+        _lock.acquire()
+        storage.p(CHECKPOINT_DIR).mkdir(parents=True, exist_ok=True)
+        self.f = open(storage.p(f"{CHECKPOINT_DIR}/.lock"), "a")
+        if fcntl:
+            fcntl.flock(self.f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+        _lock.release()
+
+def record(date_str: str, day_root: str) -> Dict[str, dict]:
+    """Fold a (re)sealed day into its week, month and year checkpoints. Returns them by kind."""
+    out = {}
+    with _Locked():
+        for kind, period in periods_for(date_str).items():
+            cp = get(period)
+            days = {d["date"]: d["day_root"] for d in (cp or {}).get("days", [])}
+            if cp is not None and days.get(date_str) == day_root:
+                out[kind] = cp
+                continue
+            if cp is not None and cp.get("frontier") and cp["days"] and date_str > cp["days"][-1]["date"]:
+                out[kind] = _append(cp, date_str, day_root)
+            else:
+                # first day, out-of-order seal, re-seal, or a checkpoint written before frontiers
+                days[date_str] = day_root
+                out[kind] = _build(period, days, (cp or {}).get("method") or default_method())
+            _write(out[kind])
+    return out
+
+def rebuild() -> int:
+    """Recreate every checkpoint from the sealed ledgers on disk. Returns the number written."""
+    sealed: Dict[str, str] = {}
+    for path in storage.DATA_DIR.glob("*.ledger.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            ledger = json.load(f)
+        if ledger.get("day_root"):
+            sealed[path.name.split(".", 1)[0]] = ledger["day_root"]
+    periods: Dict[str, Dict[str, str]] = {}
+    for d, r in sealed.items():
+        for period in periods_for(d).values():
+            periods.setdefault(period, {})[d] = r
+    with _Locked():
+        for old in storage.p(CHECKPOINT_DIR).glob("*.json"):
+            if old.stem not in periods:
+                old.unlink()
+        for period, days in periods.items():
+            cp = get(period)
+            _write(_build(period, days, (cp or {}).get("method") or default_method()))
+    return len(periods)
+
+def proof(period: str, date_str: str) -> dict:
+    """Inclusion proof of one day's (date, day_root) leaf in a checkpoint."""
+    cp = get(period)
+    if cp is None:
+        raise KeyError(f"no checkpoint for {period}")
+    dates = [d["date"] for d in cp["days"]]
+    if date_str not in dates:
+        raise KeyError(f"{date_str} is not sealed in {period}")
+    index = dates.index(date_str)
+    leaves = [leaf(d["date"], d["day_root"]) for d in cp["days"]]
+    return {
+        "period": period,
+        "date": date_str,
+        "day_root": cp["days"][index]["day_root"],
+        "leaf": leaves[index],
+        "leaf_index": index,
+        "path": merkle_path(leaves, index, cp["method"]),
+        "root": cp["root"],
+        "method": cp["method"],
+    }
@@ -113,12 +113,12 @@ async def companion_respond(ctx=Depends(admin_required)):
 
     # Try to load memory context if available
     try:
-        from backend.core.memory import MEMORIES
-        bucket = MEMORIES.get(ctx.app_id, {"events": [], "summary": ""})
-        recent = bucket.get("events", [])[-12:]
-        summary = bucket.get("summary", "")
+        from backend.core.memory import get_bucket
+        bucket = get_bucket(ctx.app_id)
+        recent = bucket.events.recent(12)
+        summary = bucket.summary
 
-        recent_lines = "\n".join(f"- ({e['type']}) {e['content']}" for e in recent)
+        recent_lines = "\n".join(f"- ({e.type}) {e.content}" for e in recent)
         summary_line = f"\nSUMMARY: {summary}\n" if summary else ""
 
         prompt = f"""
@@ -134,16 +134,8 @@ Avoid clichés; keep it specific to the themes above.
 
         reply = await llm_generate(prompt)
         
-        # Optionally write the reply back into memory as an event
-        bucket.setdefault("events", []).append({
-            "type": "reply",
-            "content": reply.strip(),
-            "ts": iso_now()
-        })
-        # Cap memory size
-        if len(bucket["events"]) > 200:
-            bucket["events"] = bucket["events"][-200:]
-        MEMORIES[ctx.app_id] = bucket
+        # Optionally write the reply back into memory as an event (the ring caps its size)
+        bucket.events.append("reply", reply.strip(), iso_now())
 
     except ImportError:
         # Fallback if memory module isn't available
@@ -0,0 +1,111 @@
+"""
+Per-date single writer.
+
+All mutations of a day's seed, echo, seal and gic files run on that day's
+own writer thread. They are serialized for the same date, while writes to
+other dates proceed in parallel. A writer drains whatever has queued up,
+runs it under an flock on {date}.lock (so other uvicorn workers wait
+their turn), and fsyncs the day's sweep log once for the whole batch
+(this node's shard when ECHO_SHARDING=node; ECHO_FSYNC=batch, default)
+before it resolves the callers' futures.
+
+Writers exit after DAY_WRITER_IDLE_S seconds without work, so only
+recently active days keep a thread.
+"""
+from __future__ import annotations
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.core import storage
+
+try:
+    import fcntl  # cross-worker day lock (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+IDLE_S = float(os.getenv("DAY_WRITER_IDLE_S", "30"))
+ECHO_FSYNC = os.getenv("ECHO_FSYNC", "batch").lower()  # batch | none
+MAX_BATCH = 256
+
+Job = Tuple[Callable[..., Any], tuple, dict, Future]
+
+class _DayWriter(threading.Thread):
+    def __init__(self, date_str: str):
+        super().__init__(name=f"day-writer-{date_str}", daemon=True)
+        self.date_str = date_str
+        self.jobs: "queue.Queue[Job]" = queue.Queue()
+
+    def run(self) -> None:
+        while True:
+            try:
+                first = self.jobs.get(timeout=IDLE_S)
+            except queue.Empty:
+                with _registry_lock:
+                    if self.jobs.empty():
+                        _writers.pop(self.date_str, None)
+                        return
+                continue
+            batch = [first]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Job]) -> None:
+        results: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        lock_f = open(storage.p(f"{self.date_str}.lock"), "a")
+        try:
+            if fcntl:
+                fcntl.flock(lock_f, fcntl.LOCK_EX)
+            for fn, args, kwargs, fut in batch:
+                try:
+                    results.append((fut, fn(*args, **kwargs), None))
+                except BaseException as e:
+                    results.append((fut, None, e))
+            if ECHO_FSYNC == "batch":
+                _fsync(storage.p(storage.echo_target(self.date_str)))
+        finally:
+            if fcntl:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+            lock_f.close()
+        for fut, result, err in results:
+            if err is not None:
+                fut.set_exception(err)
+            else:
+                fut.set_result(result)
+
+def _fsync(path) -> None:
+    if not path.exists():
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+_writers: Dict[str, _DayWriter] = {}
+_registry_lock = threading.Lock()
+
+def submit(date_str: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """Queue fn(*args, **kwargs) on the day's writer. The future resolves once it is durable."""
+    fut: Future = Future()
+    with _registry_lock:
+        w = _writers.get(date_str)
+        if w is None:
+            w = _writers[date_str] = _DayWriter(date_str)
+            w.start()
+        w.jobs.put((fn, args, kwargs, fut))
+    return fut
+
+def run(date_str: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """submit() and wait for the result (exceptions re-raise in the caller)."""
+    return submit(date_str, fn, *args, **kwargs).result()
+
+def active_days() -> List[str]:
+    with _registry_lock:
+        return sorted(_writers)
@@ -0,0 +1,277 @@
+"""
+Content-hash dedupe for GIC rewards.
+
+Each day keeps a compact on-disk index, {date}/{date}.dedupe.idx, with one
+fixed-width key per (user, content_hash) line. It is shared by every worker
+and survives restarts. When it is missing, it is rebuilt from the day's
+{date}.gic.jsonl history.
+
+The index is a sorted run of keys behind a fixed-width header giving its
+length, followed by an unsorted tail of keys appended since. Once the tail
+reaches DEDUPE_COMPACT_KEYS keys, it is merged into the run and the file is
+replaced.
+
+In memory, each recently used day has a Bloom filter over all of its keys and
+the set of tail keys, which is bounded by the compaction threshold. Both are
+kept current by reading only the index lines appended since the last look
+(by this worker or another). A miss in the filter is a definite "not seen";
+a hit is confirmed in the tail set or by binary search of the sorted run
+through mmap, so a lookup never scans the file and no day's history is held
+in RAM. Only the last DEDUPE_MAX_DAYS days are kept in memory; older days are
+evicted and reload lazily from disk.
+"""
+from __future__ import annotations
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from backend.core import storage
+
+try:
+    import fcntl  # cross-worker lock on the index file (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+KEY_LINE = 33  # 32 hex chars + "\n"
+HEADER = KEY_LINE  # b"#" + 8-hex file tag + " " + 22-digit key count + "\n"
+BLOOM_BITS = int(os.getenv("DEDUPE_BLOOM_BITS", str(1 << 20)))
+BLOOM_HASHES = 7
+MAX_DAYS = int(os.getenv("DEDUPE_MAX_DAYS", "7"))
+COMPACT_KEYS = int(os.getenv("DEDUPE_COMPACT_KEYS", "1024"))
+_READ_CHUNK = KEY_LINE * 8192
+
+def _key(user_id: str, content_hash: str) -> bytes:
+    return hashlib.sha256(f"{user_id}\x1f{content_hash}".encode("utf-8")).hexdigest()[:32].encode("ascii")
+
+class BloomFilter:
+    """Fixed-size Bloom filter over already-uniform hex keys."""
+
+    __slots__ = ("bits", "size")
+
+    def __init__(self, size: int = BLOOM_BITS):
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+
+    def _positions(self, key: bytes):
+        # double hashing from two 64-bit halves of the key
+        h1 = int(key[:16], 16)
+        h2 = int(key[16:32], 16) | 1
+        return ((h1 + i * h2) % self.size for i in range(BLOOM_HASHES))
+
+    def add(self, key: bytes) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class _Day:
+    __slots__ = ("bloom", "tail", "sorted", "offset", "head")
+
+    def __init__(self):
+        self.bloom = BloomFilter()
+        self.tail = set()  # keys after the sorted run
+        self.sorted = 0  # keys in the sorted run
+        self.offset = 0  # bytes of the index file already folded in
+        self.head: Optional[bytes] = None  # the file's first line; changes when it is replaced
+
+    def add(self, key: bytes) -> None:
+        self.bloom.add(key)
+        self.tail.add(key)
+
+    def contains(self, key: bytes, f) -> bool:
+        """Filter first; a hit is confirmed in the tail or the sorted run of `f`."""
+        if key not in self.bloom:
+            return False
+        return key in self.tail or _in_run(f, self.sorted, key)
+
+_days: "OrderedDict[str, _Day]" = OrderedDict()
+_lock = threading.Lock()
+
+def _idx_rel(date_str: str) -> str:
+    return f"{date_str}/{date_str}.dedupe.idx"
+
+def _gic_rel(date_str: str) -> str:
+    return f"{date_str}/{date_str}.gic.jsonl"
+
+def _header(tag: bytes, n: int) -> bytes:
+    return b"#%s %022d\n" % (tag, n)
+
+def _run_length(head: bytes) -> Optional[int]:
+    """Keys in the sorted run, or None for an index without a header (all tail)."""
+    return int(head[10:HEADER - 1]) if head.startswith(b"#") else None
+
+def _write_index(path: Path, keys: Iterable[bytes], replace: bool = True) -> bytes:
+    """
+    Write `keys` (sorted; repeats dropped) as an index with one sorted run; returns
+    its header. A random tag in the header tells readers the file was replaced, which
+    inode numbers can't (they are reused). replace=False only creates it: an index
+    another worker made first is kept.
+    """
+    tag = os.urandom(4).hex().encode("ascii")
+    n, last = 0, None
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+        f.write(_header(tag, 0))
+        for k in keys:
+            if k != last:
+                f.write(k + b"\n")
+                n, last = n + 1, k
+        f.seek(0)
+        f.write(_header(tag, n))
+        f.flush()
+        os.fsync(f.fileno())
+    if replace:
+        os.replace(f.name, path)
+        return _header(tag, n)
+    try:
+        os.link(f.name, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(f.name)
+    return _header(tag, n)
+
+def _rebuild_index(date_str: str) -> None:
+    """Create the day's index from its gic history (reflection rewards only)."""
+    keys = set()
+    for tx in storage.iter_records(_gic_rel(date_str)):
+        if tx.get("type") != "gic_tx" or not str(tx.get("reason", "")).startswith("reflection:"):
+            continue
+        if not tx.get("hash"):
+            continue
+        keys.add(_key(str(tx.get("user", "anon")), str(tx["hash"])))
+    _write_index(storage.p(_idx_rel(date_str)), sorted(keys), replace=False)
+
+def _iter_run(f, n: int) -> Iterator[bytes]:
+    """The sorted run's keys, read in chunks."""
+    f.seek(HEADER)
+    left = n * KEY_LINE
+    while left:
+        chunk = f.read(min(left, _READ_CHUNK))
+        if not chunk:
+            return
+        left -= len(chunk)
+        for i in range(0, len(chunk) - len(chunk) % KEY_LINE, KEY_LINE):
+            yield chunk[i:i + KEY_LINE - 1]
+
+def _in_run(f, n: int, key: bytes) -> bool:
+    """Binary search of the sorted run through mmap."""
+    if n == 0:
+        return False
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = HEADER + mid * KEY_LINE
+            probe = mm[pos:pos + KEY_LINE - 1]
+            if probe == key:
+                return True
+            if probe < key:
+                lo = mid + 1
+            else:
+                hi = mid
+    return False
+
+def _day(date_str: str) -> _Day:
+    day = _days.get(date_str)
+    if day is None:
+        day = _days[date_str] = _Day()
+        while len(_days) > MAX_DAYS:
+            _days.popitem(last=False)
+    else:
+        _days.move_to_end(date_str)
+    return day
+
+def _refresh(day: _Day, f) -> None:
+    """Fold keys appended since our last look (possibly by other workers) into the day."""
+    f.seek(0)
+    head = f.read(HEADER)
+    if head != day.head or os.fstat(f.fileno()).st_size < day.offset:
+        # first look, or the index was compacted or recreated underneath us: start over
+        day.bloom, day.tail, day.sorted, day.offset, day.head = BloomFilter(), set(), 0, 0, head
+        n = _run_length(head)
+        if n is not None:
+            for k in _iter_run(f, n):
+                day.bloom.add(k)
+            day.sorted, day.offset = n, HEADER + n * KEY_LINE
+    f.seek(day.offset)
+    tail = f.read()
+    whole = len(tail) - len(tail) % KEY_LINE
+    for i in range(0, whole, KEY_LINE):
+        day.add(tail[i:i + KEY_LINE - 1])
+    day.offset += whole
+
+def _compact(path: Path, f, day: _Day) -> None:
+    """Merge the tail into the sorted run (index locked, day refreshed)."""
+    day.head = _write_index(path, heapq.merge(_iter_run(f, day.sorted), sorted(day.tail)))
+    day.tail, day.sorted = set(), _run_length(day.head)
+    day.offset = HEADER + day.sorted * KEY_LINE
+
+def _open_locked(date_str: str, path: Path):
+    """Open and lock the index, again if a compaction in another worker replaced it meanwhile."""
+    while True:
+        if not path.exists():
+            _rebuild_index(date_str)
+        f = open(path, "r+b")
+        if not fcntl:
+            return f
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()
+
+def check_and_mark(user_id: str, date_str: str, content_hash: str) -> bool:
+    """
+    Atomically test-and-set (user, date, content_hash).
+    Returns True if it was already seen (duplicate), False if this is the first time.
+    """
+    key = _key(user_id, content_hash)
+    path = storage.p(_idx_rel(date_str))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        f = _open_locked(date_str, path)
+        try:
+            day = _day(date_str)
+            _refresh(day, f)
+            if day.contains(key, f):
+                return True
+            f.seek(0, os.SEEK_END)
+            f.write(key + b"\n")
+            f.flush()
+            day.add(key)
+            day.offset += KEY_LINE
+            if len(day.tail) >= COMPACT_KEYS:
+                _compact(path, f, day)
+            return False
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+def seen(user_id: str, date_str: str, content_hash: str) -> bool:
+    """Read-only membership test."""
+    key = _key(user_id, content_hash)
+    path = storage.p(_idx_rel(date_str))
+    if not path.exists():
+        return False
+    with _lock, open(path, "rb") as f:
+        day = _day(date_str)
+        _refresh(day, f)
+        return day.contains(key, f)
+
+def forget(date_str: Optional[str] = None) -> None:
+    """Drop in-memory days (all, or one). The on-disk index is untouched."""
+    with _lock:
+        if date_str is None:
+            _days.clear()
+        else:
+            _days.pop(date_str, None)
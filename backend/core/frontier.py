@@ -0,0 +1,322 @@
+"""
+Persistent per-day Merkle frontier and tree levels.
+
+Every /sweep folds its leaf into {date}.frontier.json and appends each complete
+node it creates to {date}.merkle/L{level} (one hex digest per line, fixed
+width). /seal then only has to fold in the seal leaf and finish the root in
+O(log n), and an inclusion proof reads O(log n) lines from the level files
+instead of rebuilding the day.
+
+Sweeps are written in canonical form (hashing.CanonicalRecord), so a leaf is
+hashed from the same bytes that go to disk. L0 is the persisted leaf list, so
+seals and proofs never re-encode historic records. The seed leaf is cached in
+the frontier too, keyed by the seed file's size and mtime.
+
+Each day is hashed with one Merkle method (hashing.MERKLE_*), kept in the
+frontier. Days already sealed keep the method their ledger/root recorded;
+new days get hashing.default_method().
+
+Node-sharded days (storage.ECHO_SHARDING) stay incremental while this node's
+shard is the only one and its sweeps arrive in merge order. Once other
+nodes' shards appear, appends only touch the shard, and the frontier is
+rebuilt from the merged shards when it is next needed (at /seal).
+
+The frontier records the byte sizes of the files it was built from. If any of
+them no longer match (crash between writes, seed posted after sweeps, files
+copied in by hand) the frontier is rebuilt from disk, so it can never produce
+a root that differs from a full recompute.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+from backend.core import storage
+from backend.core.hashing import CanonicalRecord, MerkleAccumulator, MERKLE_HEX, default_method, hash_records, node_hash, sha256_json
+
+NODE_LINE = 65  # 64 hex chars + "\n"
+
+def _frontier_rel(date_str: str) -> str:
+    return f"{date_str}.frontier.json"
+
+def _level_rel(date_str: str, level: int) -> str:
+    return f"{date_str}.merkle/L{level}"
+
+def _size(path_rel: str) -> int:
+    path = storage.p(path_rel)
+    return path.stat().st_size if path.exists() else 0
+
+def _seed_stat(date_str: str) -> Optional[List[int]]:
+    path = storage.p(storage.today_files(date_str)["seed"])
+    if not path.exists():
+        return None
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def _seed_leaf(date_str: str) -> Optional[str]:
+    files = storage.today_files(date_str)
+    if not storage.p(files["seed"]).exists():
+        return None
+    return sha256_json(storage.read_json(files["seed"]))
+
+def _recorded_method(date_str: str) -> Optional[str]:
+    """Method an already-sealed day was published with (pre-method files are v1), or None."""
+    for rel in (f"{date_str}.root.json", storage.today_files(date_str)["ledger"]):
+        if storage.p(rel).exists():
+            try:
+                return storage.read_json(rel).get("method", MERKLE_HEX)
+            except (OSError, ValueError, AttributeError):
+                continue
+    return None
+
+def state_method(state: dict) -> str:
+    return state.get("acc", {}).get("method", MERKLE_HEX)
+
+def _is_current(state: dict, date_str: str, seed_leaf: Optional[str]) -> bool:
+    files = storage.today_files(date_str)
+    count = int(state.get("acc", {}).get("count", -1))
+    if (
+        state.get("seed") != seed_leaf
+        or state.get("echo_bytes") != _size(files["echo"])
+        or state.get("legacy_bytes") != _size(files["echo_legacy"])
+        or state.get("shards", {}) != _shard_sizes(date_str)
+    ):
+        return False
+    # level k holds exactly count >> k complete nodes
+    level = 0
+    while count >> level:
+        if _size(_level_rel(date_str, level)) != NODE_LINE * (count >> level):
+            return False
+        level += 1
+    return True
+
+def _shard_sizes(date_str: str) -> Dict[str, int]:
+    return {rel: _size(rel) for rel in storage.shard_files(date_str)}
+
+def _save(date_str: str, state: dict) -> None:
+    path = storage.p(_frontier_rel(date_str))
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def _append_nodes(date_str: str, created: List[List[str]]) -> None:
+    """created[level] = new complete nodes for that level, appended with one write per level."""
+    storage.p(f"{date_str}.merkle").mkdir(exist_ok=True)
+    for level, nodes in enumerate(created):
+        if nodes:
+            with open(storage.p(_level_rel(date_str, level)), "a", encoding="utf-8") as f:
+                f.write("".join(node + "\n" for node in nodes))
+
+def rebuild(date_str: str, method: Optional[str] = None) -> dict:
+    """
+    Recompute the frontier and level files from the day's seed and sweep files.
+    method defaults to the day's recorded method, else the default for new days.
+    """
+    files = storage.today_files(date_str)
+    method = method or _recorded_method(date_str) or default_method()
+    seed_stat = _seed_stat(date_str)
+    seed_leaf = _seed_leaf(date_str)
+    level_dir = storage.p(f"{date_str}.merkle")
+    level_dir.mkdir(parents=True, exist_ok=True)
+    for old in level_dir.glob("L*"):
+        old.unlink()
+
+    acc = MerkleAccumulator(method=method)
+    levels: Dict[int, List[str]] = {}
+    def push(leaf: str) -> None:
+        for level, node in enumerate(acc.append(leaf)):
+            levels.setdefault(level, []).append(node + "\n")
+
+    if seed_leaf:
+        push(seed_leaf)
+    sweeps = 0
+    for leaf in hash_records(storage.iter_unsharded(date_str)):
+        push(leaf)
+        sweeps += 1
+    last_key = None
+    for last_key, _ in storage.iter_sharded(date_str):
+        push(last_key[2])  # the merge key already carries the leaf hash
+        sweeps += 1
+    for level, lines in levels.items():
+        with open(storage.p(_level_rel(date_str, level)), "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    state = {
+        "date": date_str,
+        "seed": seed_leaf,
+        "seed_stat": seed_stat,
+        "sweeps": sweeps,
+        "echo_bytes": _size(files["echo"]),
+        "legacy_bytes": _size(files["echo_legacy"]),
+        "shards": _shard_sizes(date_str),
+        "last_key": list(last_key) if last_key else None,
+        "acc": acc.to_dict(),
+    }
+    _save(date_str, state)
+    return state
+
+def load(date_str: str) -> dict:
+    """Return the day's frontier state, rebuilding it if it is missing or stale."""
+    state, method = _current(date_str)
+    return state if state is not None else rebuild(date_str, method)
+
+def _current(date_str: str) -> Tuple[Optional[dict], Optional[str]]:
+    """(state, None) if the saved frontier is current, else (None, the stale state's method or None)."""
+    path = storage.p(_frontier_rel(date_str))
+    method = None
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            seed_stat = _seed_stat(date_str)
+            # unchanged seed file: trust the cached leaf instead of re-hashing it
+            seed_leaf = state.get("seed") if state.get("seed_stat") == seed_stat else _seed_leaf(date_str)
+            if _is_current(state, date_str, seed_leaf):
+                return state, None
+            method = state_method(state)  # a stale frontier keeps its day's method
+        except (OSError, ValueError):
+            pass
+    return None, method
+
+def append_sweep(date_str: str, record: dict) -> str:
+    """Append a sweep to the day's log and fold its leaf into the frontier. Returns the leaf hash."""
+    return append_sweeps(date_str, [record])[0]
+
+def append_sweeps(date_str: str, records: List[dict]) -> List[str]:
+    """Batch form of append_sweep: one log write, one write per level, one frontier save."""
+    target = storage.echo_target(date_str)
+    if target != storage.today_files(date_str)["echo"]:
+        return _append_shard(date_str, target, records)
+    state = load(date_str)
+    encoded = [CanonicalRecord(r) for r in records]
+    storage.append_bytes(target, b"".join(rec.line for rec in encoded))
+    if state.get("shards"):
+        # shards sort after the unsharded log: leave the frontier to rebuild
+        return [rec.leaf for rec in encoded]
+    _fold(date_str, state, [rec.leaf for rec in encoded])
+    state["echo_bytes"] = _size(target)
+    _save(date_str, state)
+    return [rec.leaf for rec in encoded]
+
+def _append_shard(date_str: str, target: str, records: List[dict]) -> List[str]:
+    """
+    Append to this node's shard. The frontier is only extended while this is
+    the day's one shard and the new sweeps sort after everything folded in.
+    """
+    state, method = _current(date_str)
+    alone = all(rel == target for rel in storage.shard_files(date_str))
+    if state is None and alone:
+        state = rebuild(date_str, method)
+    node = storage.shard_node(date_str, target)
+    encoded = [CanonicalRecord(r) for r in records]
+    keyed = sorted(((str(r.get("ts", "")), node, rec.leaf), rec) for r, rec in zip(records, encoded))
+    storage.append_bytes(target, b"".join(rec.line for rec in encoded))
+
+    last = tuple(state["last_key"]) if state and state.get("last_key") else None
+    if state is not None and alone and (last is None or keyed[0][0] > last):
+        _fold(date_str, state, [key[2] for key, _ in keyed])
+        state["shards"] = _shard_sizes(date_str)
+        state["last_key"] = list(keyed[-1][0])
+        _save(date_str, state)
+    return [rec.leaf for rec in encoded]
+
+def _fold(date_str: str, state: dict, leaves: List[str]) -> None:
+    """Fold leaves into the state's accumulator and append the new nodes to the level files."""
+    acc = MerkleAccumulator.from_dict(state["acc"])
+    created: List[List[str]] = []
+    for leaf in leaves:
+        for level, node in enumerate(acc.append(leaf)):
+            if level == len(created):
+                created.append([])
+            created[level].append(node)
+    _append_nodes(date_str, created)
+    state["acc"] = acc.to_dict()
+    state["sweeps"] += len(leaves)
+
+def seal_root(date_str: str, seal_leaf: str, state: Optional[dict] = None) -> Tuple[str, dict]:
+    """
+    Finish the day root with the seal leaf folded in (O(log n)). Returns (root, state).
+    Pass `state` from a load() in the same writer batch to skip reloading it.
+    """
+    state = state or load(date_str)
+    acc = MerkleAccumulator.from_dict(state["acc"])
+    acc.append(seal_leaf)
+    return acc.root(), state
+
+def leaf_hashes(date_str: str, state: Optional[dict] = None) -> List[str]:
+    """Seed + sweep leaves as persisted (no JSON re-canonicalization)."""
+    if state is None:
+        load(date_str)
+    path = storage.p(_level_rel(date_str, 0))
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+# ---------- Inclusion proofs ----------
+def _read_node(date_str: str, level: int, index: int) -> str:
+    with open(storage.p(_level_rel(date_str, level)), "rb") as f:
+        f.seek(index * NODE_LINE)
+        return f.read(NODE_LINE - 1).decode("ascii")
+
+def _right_edge(date_str: str, n: int, last_leaf: str, method: str) -> List[str]:
+    """
+    Last node of every level for a tree of n leaves whose final leaf is last_leaf
+    (the seal, which is never stored). edges[-1] is the root.
+    """
+    edges = [last_leaf]
+    count, level = n, 0
+    while count > 1:
+        nxt = (count + 1) // 2
+        j = nxt - 1
+        if 2 * j + 1 < count:
+            left = _read_node(date_str, level, 2 * j)
+            edges.append(node_hash(left, edges[level], method))
+        else:
+            edges.append(node_hash(edges[level], edges[level], method))
+        count, level = nxt, level + 1
+    return edges
+
+def proof(date_str: str, index: int, sealed_leaves: int, seal_leaf: str) -> dict:
+    """
+    Inclusion proof for leaf `index` of a sealed day.
+    sealed_leaves: seed + sweeps covered by the seal (sweeps added later are ignored);
+    the seal leaf itself is index `sealed_leaves`.
+    """
+    state = load(date_str)
+    if int(state["acc"]["count"]) < sealed_leaves:
+        raise ValueError("day files are behind the sealed ledger")
+    n = sealed_leaves + 1
+    if not 0 <= index < n:
+        raise IndexError(f"leaf_index must be in [0, {n - 1}]")
+
+    method = state_method(state)
+    edges = _right_edge(date_str, n, seal_leaf, method)
+    leaf = seal_leaf if index == sealed_leaves else _read_node(date_str, 0, index)
+    path = []
+    count, level, j = n, 0, index
+    while count > 1:
+        sib = j ^ 1
+        if sib >= count:
+            sib = j  # odd level: last node is paired with itself
+        sib_hash = edges[level] if sib == count - 1 else _read_node(date_str, level, sib)
+        path.append({"hash": sib_hash, "position": "left" if sib < j else "right"})
+        count, level, j = (count + 1) // 2, level + 1, j // 2
+    return {"index": index, "leaf": leaf, "path": path, "root": edges[-1], "leaf_count": n, "method": method}
+
+def find_leaf(date_str: str, leaf: str, sealed_leaves: int) -> Optional[int]:
+    """Index of a seed/sweep leaf among the first sealed_leaves leaves, or None."""
+    path = storage.p(_level_rel(date_str, 0))
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    needle = leaf.lower().encode("ascii")
+    limit = sealed_leaves * NODE_LINE
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = mm.find(needle, 0, limit)
+        while pos != -1:
+            if pos % NODE_LINE == 0:
+                return pos // NODE_LINE
+            pos = mm.find(needle, pos + 1, limit)
+    return None
@@ -0,0 +1,189 @@
+"""
+Group-commit writer for append-only JSONL files (GIC transactions, featured queue).
+
+Callers enqueue encoded lines and get a Future back. A background thread
+collects appends for each file across concurrent requests. It writes each
+batch with one write() per file once GIC_COMMIT_MAX_BYTES are pending or the
+oldest append is GIC_COMMIT_MAX_MS old, then resolves the futures. Open
+handles are kept in a small LRU, so a busy file isn't reopened for every
+record. A caller about to replace or remove one of those files calls
+release() first, so later appends reopen the new file instead of writing to
+the old inode.
+
+Durability is chosen with GIC_FSYNC:
+  none    - write + flush, leave syncing to the OS (fastest)
+  batch   - one fsync per file per batch (default)
+  record  - fsync after every record
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+FSYNC_POLICIES = ("none", "batch", "record")
+MAX_OPEN_FILES = 64
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        max_batch_bytes: int = 64 * 1024,
+        max_delay_ms: float = 2.0,
+        fsync: str = "batch",
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.max_batch_bytes = max_batch_bytes
+        self.max_delay = max_delay_ms / 1000.0
+        self.fsync = fsync
+
+        self._cond = threading.Condition()
+        self._pending: Dict[Path, List[Tuple[bytes, Future]]] = {}
+        self._pending_bytes = 0
+        self._first_at: Optional[float] = None
+        self._flush_now = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._handles: "OrderedDict[Path, BinaryIO]" = OrderedDict()
+        self._io_lock = threading.Lock()  # guards _handles between commits and release()
+        self.stats = {"batches": 0, "records": 0, "fsyncs": 0}
+
+    # ---------- producer side ----------
+    def append(self, path: Path, data: bytes) -> Future:
+        """Queue `data` for appending to `path`. The future resolves once it is committed."""
+        fut: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+            self._pending.setdefault(Path(path), []).append((data, fut))
+            self._pending_bytes += len(data)
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            self._cond.notify()
+        return fut
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Commit everything queued so far and wait for it."""
+        with self._cond:
+            futs = [fut for items in self._pending.values() for _, fut in items]
+            self._flush_now = True
+            self._cond.notify()
+        for fut in futs:
+            fut.result(timeout)
+
+    def release(self, paths: Iterable[Path]) -> None:
+        """
+        Close the cached handles of `paths`, waiting out a batch being written.
+        Call flush() first if queued appends must reach the current files.
+        """
+        with self._io_lock:
+            for path in paths:
+                f = self._handles.pop(Path(path), None)
+                if f is not None:
+                    f.close()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+
+    # ---------- committer side ----------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                deadline = self._first_at + self.max_delay
+                while (
+                    self._pending_bytes < self.max_batch_bytes
+                    and not self._flush_now
+                    and not self._closed
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending
+                self._pending = {}
+                self._pending_bytes = 0
+                self._first_at = None
+                self._flush_now = False
+            with self._io_lock:
+                self._commit(batch)
+
+    def _handle(self, path: Path) -> BinaryIO:
+        f = self._handles.get(path)
+        if f is not None:
+            self._handles.move_to_end(path)
+            return f
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(path, "ab")
+        self._handles[path] = f
+        while len(self._handles) > MAX_OPEN_FILES:
+            _, old = self._handles.popitem(last=False)
+            old.close()
+        return f
+
+    def _commit(self, batch: Dict[Path, List[Tuple[bytes, Future]]]) -> None:
+        for path, items in batch.items():
+            try:
+                f = self._handle(path)
+                if self.fsync == "record":
+                    for data, _ in items:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self.stats["fsyncs"] += 1
+                else:
+                    f.write(b"".join(data for data, _ in items))
+                    f.flush()
+                    if self.fsync == "batch":
+                        os.fsync(f.fileno())
+                        self.stats["fsyncs"] += 1
+            except Exception as e:
+                stale = self._handles.pop(path, None)
+                if stale is not None:
+                    stale.close()
+                for _, fut in items:
+                    fut.set_exception(e)
+                continue
+            self.stats["records"] += len(items)
+            for _, fut in items:
+                fut.set_result(None)
+        self.stats["batches"] += 1
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+def writer() -> GroupCommitWriter:
+    """Process-wide writer configured from the environment."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter(
+                max_batch_bytes=int(os.getenv("GIC_COMMIT_MAX_BYTES", str(64 * 1024))),
+                max_delay_ms=float(os.getenv("GIC_COMMIT_MAX_MS", "2")),
+                fsync=os.getenv("GIC_FSYNC", "batch").lower(),
+            )
+        return _writer
+
+def shutdown() -> None:
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
@@ -1,20 +1,100 @@
+"""
+Hashing engine: canonical JSON, leaf hashing, Merkle roots (both methods),
+incremental accumulation, inclusion proofs and per-day digests.
+
+Everything here takes iterables and hashes each leaf exactly once.
+hash_helpers keeps its old names as thin wrappers over this module.
+"""
 from __future__ import annotations
 import hashlib
 import json
-from typing import Iterable, Any
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Any, Dict, List, NamedTuple, Optional, Union
+
+# Merkle methods, as recorded in the "method" field of ledgers and root files.
+# v1 hashes the UTF-8 of two concatenated hex digests (128 bytes per node);
+# v2 hashes the two raw 32-byte digests (64 bytes per node). Leaves and roots
+# are hex in both, only interior nodes differ.
+MERKLE_HEX = "pairwise-merkle-sha256(hex-concat)"
+MERKLE_BIN = "pairwise-merkle-sha256(bin-concat)"
+MERKLE_METHODS = {"v1": MERKLE_HEX, "v2": MERKLE_BIN}
+
+def default_method() -> str:
+    """Method for days that don't have one yet (MERKLE_METHOD=v1|v2, default v2)."""
+    name = os.getenv("MERKLE_METHOD", "v2")
+    return MERKLE_METHODS.get(name.lower(), name)
+
+def node_hash(left: str, right: str, method: str = MERKLE_HEX) -> str:
+    """Parent of two hex nodes under the given method."""
+    if method == MERKLE_BIN:
+        return hashlib.sha256(bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+    if method == MERKLE_HEX:
+        return hashlib.sha256((left + right).encode("utf-8")).hexdigest()
+    raise ValueError(f"unknown merkle method: {method!r}")
 
 def sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
+def canonical_bytes(obj: Any) -> bytes:
+    """Canonical JSON: sorted keys, compact separators, UTF-8. What every leaf hash is taken over."""
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 def sha256_json(obj: Any) -> str:
-    blob = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
-    return sha256_bytes(blob)
+    return sha256_bytes(canonical_bytes(obj))
+
+class CanonicalRecord:
+    """
+    A record serialized exactly once. `data` is both the JSONL line written to
+    disk and the bytes hashed, so `leaf` always matches what is stored and the
+    record never has to be re-encoded to be hashed.
+    """
+
+    __slots__ = ("obj", "data", "leaf")
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+        self.data = canonical_bytes(obj)
+        self.leaf = sha256_bytes(self.data)
 
-def merkle_root(leaves: Iterable[str]) -> str:
+    @property
+    def line(self) -> bytes:
+        return self.data + b"\n"
+
+# ---------- Leaf hashing (streaming) ----------
+def hash_records(objs: Iterable[Any]) -> Iterator[str]:
+    """Leaf hash of each record, lazily."""
+    sha = hashlib.sha256
+    for obj in objs:
+        yield sha(canonical_bytes(obj)).hexdigest()
+
+def hash_jsonl_line(line: Union[str, bytes]) -> Optional[str]:
+    """Leaf hash of one JSONL line (re-canonicalized), None for blank or invalid lines."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    return sha256_json(obj)
+
+def hash_jsonl(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Leaf hashes of the valid records among JSONL lines, lazily."""
+    for line in lines:
+        h = hash_jsonl_line(line)
+        if h:
+            yield h
+
+def merkle_root(leaves: Iterable[str], method: str = MERKLE_HEX) -> str:
     """
     Compute a simple pairwise Merkle root over hex digest leaves (strings).
     If no leaves => return sha256 of empty string.
     """
+    if method == MERKLE_BIN:
+        return _merkle_root_bin(leaves)
+    if method != MERKLE_HEX:
+        raise ValueError(f"unknown merkle method: {method!r}")
     layer = [x.lower() for x in leaves]
     if not layer:
         return sha256_bytes(b"")
@@ -27,3 +107,143 @@ def merkle_root(leaves: Iterable[str]) -> str:
         layer = nxt
     return layer[0]
 
+def _merkle_root_bin(leaves: Iterable[str]) -> str:
+    """v2: decode each leaf once, then hash raw digests level by level."""
+    layer = [bytes.fromhex(x) for x in leaves]
+    if not layer:
+        return sha256_bytes(b"")
+    sha = hashlib.sha256
+    while len(layer) > 1:
+        if len(layer) % 2:
+            layer.append(layer[-1])  # duplicate last if odd
+        layer = [sha(layer[i] + layer[i + 1]).digest() for i in range(0, len(layer), 2)]
+    return layer[0].hex()
+
+
+class MerkleAccumulator:
+    """
+    Incremental form of merkle_root(). Keeps one pending complete subtree per
+    level (the "frontier"), so append() costs O(log n) amortized and root()
+    is byte-identical to merkle_root() over the same leaves and method.
+    """
+
+    def __init__(self, count: int = 0, frontier: Optional[List[Optional[str]]] = None, method: str = MERKLE_HEX):
+        self.count = count
+        self.frontier: List[Optional[str]] = list(frontier or [])
+        self.method = method
+
+    def append(self, leaf: str) -> List[str]:
+        """Add a leaf. Returns the complete nodes it created, bottom-up (index = level)."""
+        node = leaf.lower()
+        created = [node]
+        level = 0
+        while level < len(self.frontier) and self.frontier[level] is not None:
+            node = node_hash(self.frontier[level], node, self.method)
+            created.append(node)
+            self.frontier[level] = None
+            level += 1
+        if level == len(self.frontier):
+            self.frontier.append(node)
+        else:
+            self.frontier[level] = node
+        self.count += 1
+        return created
+
+    def copy(self) -> "MerkleAccumulator":
+        return MerkleAccumulator(self.count, self.frontier, self.method)
+
+    def root(self) -> str:
+        if self.count == 0:
+            return sha256_bytes(b"")
+        carry: Optional[str] = None  # right-edge node covering a partial range
+        level = 0
+        while True:
+            node = self.frontier[level] if level < len(self.frontier) else None
+            if (self.count >> level) + (carry is not None) == 1:
+                return carry if carry is not None else node
+            if node is not None and carry is not None:
+                carry = node_hash(node, carry, self.method)
+            elif node is not None:
+                carry = node_hash(node, node, self.method)  # odd level: duplicate last
+            elif carry is not None:
+                carry = node_hash(carry, carry, self.method)
+            level += 1
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "frontier": self.frontier, "method": self.method}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "MerkleAccumulator":
+        # states written before methods existed are v1
+        return cls(int(d.get("count", 0)), d.get("frontier") or [], d.get("method", MERKLE_HEX))
+
+def verify_proof(leaf: str, path: List[dict], root: str, method: str = MERKLE_HEX) -> bool:
+    """
+    Check an inclusion proof from GET /proof/{date}/...
+    path: [{"hash": <sibling hex>, "position": "left"|"right"}, ...] from leaf to root.
+    method: the proof's (and day's) "method" field.
+    """
+    node = leaf.lower()
+    for step in path:
+        sib = step["hash"].lower()
+        node = node_hash(sib, node, method) if step["position"] == "left" else node_hash(node, sib, method)
+    return node == root.lower()
+
+def merkle_path(leaves: List[str], index: int, method: str = MERKLE_HEX) -> List[dict]:
+    """Inclusion path for leaves[index] in merkle_root(leaves, method), in verify_proof() form."""
+    if not 0 <= index < len(leaves):
+        raise IndexError(f"leaf index must be in [0, {len(leaves) - 1}]")
+    layer = [x.lower() for x in leaves]
+    path = []
+    while len(layer) > 1:
+        sib = index ^ 1
+        if sib >= len(layer):
+            sib = index  # odd level: last node is paired with itself
+        path.append({"hash": layer[sib], "position": "left" if sib < index else "right"})
+        it = iter(layer)
+        layer = [node_hash(a, next(it, a), method) for a in it]
+        index //= 2
+    return path
+
+# ---------- Day digest (one pass -> ledger + root artifacts) ----------
+class DayDigest(NamedTuple):
+    seed: str
+    echo: List[str]
+    seal: str
+    root: str
+    method: str
+
+    @property
+    def leaves(self) -> List[str]:
+        return [self.seed, *self.echo, self.seal]
+
+    @classmethod
+    def from_leaves(cls, leaves: List[str], method: str = MERKLE_HEX, root: Optional[str] = None) -> "DayDigest":
+        """Digest of already-hashed leaves ([seed, *sweeps, seal]); root computed if not given."""
+        if root is None:
+            root = merkle_root(leaves, method)
+        return cls(leaves[0], list(leaves[1:-1]), leaves[-1], root, method)
+
+def digest_day(seed: Any, sweeps: Iterable[Any], seal: Any, method: str = MERKLE_HEX) -> DayDigest:
+    """Hash a day's records once each, streaming sweeps into the Merkle accumulator."""
+    acc = MerkleAccumulator(method=method)
+    hseed = sha256_json(seed)
+    acc.append(hseed)
+    echo = []
+    for h in hash_records(sweeps):
+        echo.append(h)
+        acc.append(h)
+    hseal = sha256_json(seal)
+    acc.append(hseal)
+    return DayDigest(hseed, echo, hseal, acc.root(), method)
+
+def day_root_obj(date_str: str, digest: DayDigest) -> Dict[str, Any]:
+    """The {date}.root.json artifact for a digest."""
+    return {
+        "type": "day_root",
+        "date": date_str,
+        "inputs": {"seed": digest.seed, "echo": digest.echo, "seal": digest.seal},
+        "root": digest.root,
+        "method": digest.method,
+        "ts": datetime.utcnow().isoformat() + "Z",
+    }
@@ -0,0 +1,238 @@
+"""
+Indexed, memory-mapped JSONL access.
+
+Every JSONL file read through this module gets a sidecar index,
+{file}.idx, that holds the byte offset of each valid record. Before each
+read, the index is extended with only the lines appended since it was last
+brought up to date. So len(), record i and the last n records cost O(1)
+plus the new lines, not a re-parse of the whole file. The file itself is
+memory-mapped, so a record is parsed straight from the page cache.
+
+Blank lines are skipped. Lines that aren't valid JSON are skipped too and
+counted in `corrupt`. A last line that has no newline yet (an append still
+in flight, or a hand-written file) is never indexed. It is served from
+memory if it parses, and indexed once its newline lands.
+
+Index layout: a 40-byte header (magic, inode of the indexed file, bytes
+covered, record count, corrupt line count), then one little-endian uint64
+offset per record. An index that doesn't match its file is rebuilt from
+scratch: another inode (the file was replaced), coverage past the end (it
+was truncated), or coverage not ending at a line boundary.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl  # cross-worker lock while the index is extended (POSIX)
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+MAGIC = b"JLX1"
+_HEADER = struct.Struct("<4s4xQQQQ")  # magic, inode, covered, count, corrupt
+_OFFSET = struct.Struct("<Q")
+_CHUNK = 4096  # offsets read per batch while iterating
+
+_lock = threading.Lock()
+
+PathLike = Union[str, Path]
+
+def index_path(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".idx")
+
+def _parse(data: bytes) -> Tuple[Optional[bool], Any]:
+    """(ok, record) for one line; ok is None for a blank line."""
+    if not data.strip():
+        return None, None
+    try:
+        return True, json.loads(data)
+    except ValueError:  # includes UnicodeDecodeError
+        return False, None
+
+def _scan(mm: mmap.mmap, start: int, end: int) -> Tuple[List[int], int]:
+    """Offsets of the valid records among the whole lines in mm[start:end], and the corrupt count."""
+    offsets: List[int] = []
+    corrupt = 0
+    pos = start
+    while pos < end:
+        nl = mm.find(b"\n", pos, end)
+        ok, _ = _parse(mm[pos:nl])
+        if ok:
+            offsets.append(pos)
+        elif ok is False:
+            corrupt += 1
+        pos = nl + 1
+    return offsets, corrupt
+
+def _sync_index(path: Path, fd: int, mm: Optional[mmap.mmap], size: int, rebuild: bool = False) -> Tuple[int, int, Any]:
+    """
+    Bring the index up to date with the first `size` bytes (rebuild: from scratch).
+    Returns (count, corrupt, open index file), opened under the lock so it is the index just checked.
+    """
+    ino = os.fstat(fd).st_ino
+    end = mm.rfind(b"\n", 0, size) + 1 if mm is not None else 0
+    idx_p = index_path(path)
+    with _lock:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            covered = count = corrupt = 0
+            try:
+                with open(idx_p, "rb") as f:
+                    head = f.read(_HEADER.size)
+                if len(head) == _HEADER.size and not rebuild:
+                    magic, h_ino, h_covered, h_count, h_corrupt = _HEADER.unpack(head)
+                    if (
+                        magic == MAGIC and h_ino == ino and h_covered <= end
+                        and (h_covered == 0 or mm[h_covered - 1:h_covered] == b"\n")
+                    ):
+                        covered, count, corrupt = h_covered, h_count, h_corrupt
+                        fresh = False
+                    else:
+                        fresh = True
+                else:
+                    fresh = True
+            except FileNotFoundError:
+                fresh = True
+
+            if not fresh and covered == end:
+                return count, corrupt, open(idx_p, "rb")
+
+            offsets, bad = _scan(mm, covered, end) if end > covered else ([], 0)
+            packed = b"".join(_OFFSET.pack(o) for o in offsets)
+            header = _HEADER.pack(MAGIC, ino, end, count + len(offsets), corrupt + bad)
+            if fresh:
+                # never rewrite an index in place: other readers may hold it open
+                tmp = idx_p.with_name(idx_p.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(header)
+                    f.write(packed)
+                os.replace(tmp, idx_p)
+            else:
+                with open(idx_p, "r+b") as f:
+                    f.seek(_HEADER.size + count * _OFFSET.size)
+                    f.write(packed)
+                    f.truncate()
+                    f.seek(0)
+                    f.write(header)  # the header goes last: it is what readers trust
+            return count + len(offsets), corrupt + bad, open(idx_p, "rb")
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+class JsonlFile:
+    """
+    Read-only view of a JSONL file through its offset index.
+
+    Records appended after the view was opened are not seen; open a new one.
+    A view isn't shared between threads. Use it as a context manager, or
+    call close().
+    """
+
+    def __init__(self, path: PathLike, rebuild: bool = False):
+        self.path = Path(path)
+        self.count = 0  # indexed records (a pending last line is extra)
+        self.corrupt = 0
+        self._f = None
+        self._mm: Optional[mmap.mmap] = None
+        self._idx = None
+        self._pending: List[Any] = []
+        try:
+            self._f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        size = os.fstat(self._f.fileno()).st_size
+        if size:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count, self.corrupt, self._idx = _sync_index(self.path, self._f.fileno(), self._mm, size, rebuild)
+        if self._mm is not None:
+            tail_start = self._mm.rfind(b"\n", 0, size) + 1
+            ok, rec = _parse(self._mm[tail_start:size])
+            if ok:
+                self._pending.append(rec)
+
+    def __enter__(self) -> "JsonlFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for handle in (self._idx, self._mm, self._f):
+            if handle is not None:
+                handle.close()
+        self._idx = self._mm = self._f = None
+
+    def __len__(self) -> int:
+        return self.count + len(self._pending)
+
+    def _offsets(self, start: int, stop: int) -> List[int]:
+        self._idx.seek(_HEADER.size + start * _OFFSET.size)
+        data = self._idx.read((stop - start) * _OFFSET.size)
+        return [o for (o,) in _OFFSET.iter_unpack(data)]
+
+    def _record(self, offset: int) -> Any:
+        return json.loads(self._mm[offset:self._mm.find(b"\n", offset)])
+
+    def __getitem__(self, i: int) -> Any:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("record index out of range")
+        if i >= self.count:
+            return self._pending[i - self.count]
+        return self._record(self._offsets(i, i + 1)[0])
+
+    def slice(self, start: int, stop: Optional[int] = None) -> List[Any]:
+        """Records [start, stop) (clamped to the file), reading only their offsets."""
+        n = len(self)
+        stop = n if stop is None else min(max(stop, 0), n)
+        start = min(max(start, 0), stop)
+        out = [self._record(o) for o in self._offsets(start, min(stop, self.count))] if start < self.count else []
+        out.extend(self._pending[max(start - self.count, 0):max(stop - self.count, 0)])
+        return out
+
+    def tail(self, n: int) -> List[Any]:
+        """The last n records."""
+        return self.slice(len(self) - n) if n > 0 else []
+
+    def __iter__(self) -> Iterator[Any]:
+        for start in range(0, self.count, _CHUNK):
+            for o in self._offsets(start, min(start + _CHUNK, self.count)):
+                yield self._record(o)
+        yield from self._pending
+
+def count(path: PathLike) -> int:
+    """Number of valid records in a JSONL file (0 if it doesn't exist)."""
+    with JsonlFile(path) as f:
+        return len(f)
+
+def corrupt(path: PathLike) -> int:
+    """Number of lines of a JSONL file that aren't valid JSON."""
+    with JsonlFile(path) as f:
+        return f.corrupt
+
+def reindex(path: PathLike) -> int:
+    """Rebuild a file's index from its raw lines, trusting nothing. Returns the corrupt line count."""
+    with JsonlFile(path, rebuild=True) as f:
+        return f.corrupt
+
+def iter_records(path: PathLike) -> Iterator[Any]:
+    """Stream the valid records of a JSONL file, in file order."""
+    with JsonlFile(path) as f:
+        yield from f
+
+def read_all(path: PathLike) -> List[Any]:
+    with JsonlFile(path) as f:
+        return list(f)
+
+def tail(path: PathLike, n: int) -> List[Any]:
+    with JsonlFile(path) as f:
+        return f.tail(n)
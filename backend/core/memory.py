@@ -2,20 +2,111 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from datetime import datetime, timezone
-from typing import List, Literal, Dict, Any
+from typing import Any, Iterator, List, Literal, Dict, Optional
 from backend.core.auth import admin_required, AdminContext
-import time
+import threading
 
 router = APIRouter(prefix="/memory", tags=["memory"])
 
 # In-memory store (swap to SQLite/Postgres later)
-# MEMORIES[app_id] = {"events": [ {type, content, ts}, ... ], "summary": str}
-MEMORIES: Dict[str, Dict[str, Any]] = {}
+# MEMORIES[app_id] = Bucket(events=EventRing of {type, content, ts}, summary=str)
 
 # limits
 MAX_EVENTS_PER_APP = 200          # rolling window
 SUMMARIZE_AFTER_N = 10            # auto-summarize cadence
 
+class Event:
+    """One memory event; __slots__ keeps a full window compact."""
+    __slots__ = ("type", "content", "ts")
+
+    def __init__(self, type: str, content: str, ts: str):
+        self.type = type
+        self.content = content
+        self.ts = ts
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"type": self.type, "content": self.content, "ts": self.ts}
+
+class EventRing:
+    """
+    The newest `capacity` events in a fixed-size ring. Appending overwrites the
+    oldest slot instead of copying the window. Per-type counts are updated as
+    events come and go, and the oldest/newest timestamps are one index away.
+    """
+    __slots__ = ("capacity", "counts", "_buf", "_start", "_len", "_lock")
+
+    def __init__(self, capacity: int = MAX_EVENTS_PER_APP):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self._buf: List[Optional[Event]] = [None] * capacity
+        self._start = 0  # slot of the oldest event
+        self._len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, type: str, content: str, ts: str) -> None:
+        with self._lock:
+            if self._len == self.capacity:
+                evicted = self._buf[self._start]
+                left = self.counts[evicted.type] - 1
+                if left:
+                    self.counts[evicted.type] = left
+                else:
+                    del self.counts[evicted.type]
+                self._buf[self._start] = Event(type, content, ts)
+                self._start = (self._start + 1) % self.capacity
+            else:
+                self._buf[(self._start + self._len) % self.capacity] = Event(type, content, ts)
+                self._len += 1
+            self.counts[type] = self.counts.get(type, 0) + 1
+
+    def recent(self, n: int) -> List[Event]:
+        """The newest n events, oldest first."""
+        with self._lock:
+            n = max(0, min(n, self._len))
+            first = self._start + self._len - n
+            return [self._buf[(first + i) % self.capacity] for i in range(n)]
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.recent(self.capacity))
+
+    @property
+    def oldest_ts(self) -> Optional[str]:
+        with self._lock:
+            return self._buf[self._start].ts if self._len else None
+
+    @property
+    def newest_ts(self) -> Optional[str]:
+        with self._lock:
+            return self._buf[(self._start + self._len - 1) % self.capacity].ts if self._len else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Length, per-type counts and oldest/newest timestamps, read together under the lock."""
+        with self._lock:
+            return {
+                "total": self._len,
+                "counts": dict(self.counts),
+                "oldest_ts": self._buf[self._start].ts if self._len else None,
+                "newest_ts": self._buf[(self._start + self._len - 1) % self.capacity].ts if self._len else None,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buf = [None] * self.capacity
+            self._start = self._len = 0
+            self.counts = {}
+
+class Bucket:
+    __slots__ = ("events", "summary")
+
+    def __init__(self):
+        self.events = EventRing()
+        self.summary = ""
+
+MEMORIES: Dict[str, Bucket] = {}
+
 class MemoryEvent(BaseModel):
     type: Literal["reflection", "reply", "note", "system"] = "reflection"
     content: str
@@ -27,69 +118,55 @@ def now_iso():
     """Generate current timestamp in ISO format."""
     return datetime.now(tz=timezone.utc).isoformat().replace("+00:00", "Z")
 
-def get_bucket(app_id: str) -> Dict[str, Any]:
+def get_bucket(app_id: str) -> Bucket:
     """Get or create memory bucket for app_id."""
     b = MEMORIES.get(app_id)
-    if not b:
-        b = {"events": [], "summary": ""}
-        MEMORIES[app_id] = b
+    if b is None:
+        b = MEMORIES.setdefault(app_id, Bucket())
     return b
 
 @router.get("/")
 def get_memory(ctx: AdminContext = Depends(admin_required)):
     """Get all memory data for the authenticated app."""
     b = get_bucket(ctx.app_id)
+    events = [e.to_dict() for e in b.events]
     return {
         "ok": True,
-        "summary": b.get("summary", ""),
-        "events": b.get("events", []),
-        "count": len(b.get("events", [])),
+        "summary": b.summary,
+        "events": events,
+        "count": len(events),
     }
 
 @router.post("/append")
 def append_memory(body: MemoryAppendReq, ctx: AdminContext = Depends(admin_required)):
-    """Append new events to memory."""
+    """Append new events to memory (the oldest fall out of the rolling window)."""
     b = get_bucket(ctx.app_id)
     for ev in body.events:
-        b["events"].append({
-            "type": ev.type, 
-            "content": ev.content, 
-            "ts": now_iso()
-        })
-    
-    # trim rolling window
-    if len(b["events"]) > MAX_EVENTS_PER_APP:
-        b["events"] = b["events"][-MAX_EVENTS_PER_APP:]
-    
-    return {"ok": True, "count": len(b["events"])}
+        b.events.append(ev.type, ev.content, now_iso())
+    return {"ok": True, "count": len(b.events)}
 
 @router.delete("/clear")
 def clear_memory(ctx: AdminContext = Depends(admin_required)):
     """Clear all memory for the authenticated app."""
-    if ctx.app_id in MEMORIES:
-        MEMORIES[ctx.app_id] = {"events": [], "summary": ""}
+    b = MEMORIES.get(ctx.app_id)
+    if b is not None:
+        b.events.clear()
+        b.summary = ""
     return {"ok": True, "message": "Memory cleared"}
 
 @router.get("/stats")
 def memory_stats(ctx: AdminContext = Depends(admin_required)):
-    """Get memory statistics."""
+    """Get memory statistics (kept up to date on append, no rescan)."""
     b = get_bucket(ctx.app_id)
-    events = b.get("events", [])
-    
-    # Count by type
-    type_counts = {}
-    for event in events:
-        event_type = event.get("type", "unknown")
-        type_counts[event_type] = type_counts.get(event_type, 0) + 1
-    
+    snap = b.events.snapshot()
     return {
         "ok": True,
-        "total_events": len(events),
-        "has_summary": bool(b.get("summary", "").strip()),
-        "summary_length": len(b.get("summary", "")),
-        "type_breakdown": type_counts,
-        "oldest_event": events[0].get("ts") if events else None,
-        "newest_event": events[-1].get("ts") if events else None,
+        "total_events": snap["total"],
+        "has_summary": bool(b.summary.strip()),
+        "summary_length": len(b.summary),
+        "type_breakdown": snap["counts"],
+        "oldest_event": snap["oldest_ts"],
+        "newest_event": snap["newest_ts"],
     }
 
 # --- Optional: summarization via your LLM bridge (async) ---
@@ -97,9 +174,7 @@ def memory_stats(ctx: AdminContext = Depends(admin_required)):
 async def summarize(ctx: AdminContext = Depends(admin_required)):
     """Generate a summary of recent memory events using LLM."""
     b = get_bucket(ctx.app_id)
-    events = b.get("events", [])
-    
-    if not events:
+    if not len(b.events):
         raise HTTPException(400, "No events to summarize.")
     
     try:
@@ -107,8 +182,8 @@ async def summarize(ctx: AdminContext = Depends(admin_required)):
         from backend.core.companions import llm_generate
         
         # build a compact prompt with last 40 items
-        tail = events[-40:]
-        lines = [f"- ({e['type']}) {e['content']}" for e in tail]
+        tail = b.events.recent(40)
+        lines = [f"- ({e.type}) {e.content}" for e in tail]
         prompt = (
             "Summarize the user's journey so far in <120 words, "
             "keeping it neutral, supportive, and useful for future coaching.\n"
@@ -117,9 +192,9 @@ async def summarize(ctx: AdminContext = Depends(admin_required)):
         )
         
         summary = await llm_generate(prompt)
-        b["summary"] = summary.strip()
+        b.summary = summary.strip()
         
-        return {"ok": True, "summary": b["summary"]}
+        return {"ok": True, "summary": b.summary}
         
     except ImportError:
         # Fallback if companions module isn't available
@@ -137,9 +212,9 @@ def update_summary(
         raise HTTPException(400, "Summary cannot be empty")
     
     b = get_bucket(ctx.app_id)
-    b["summary"] = summary.strip()
+    b.summary = summary.strip()
     
-    return {"ok": True, "summary": b["summary"]}
+    return {"ok": True, "summary": b.summary}
 
 @router.get("/recent/{limit}")
 def get_recent_events(
@@ -151,12 +226,11 @@ def get_recent_events(
         raise HTTPException(400, "Limit must be between 1 and 100")
     
     b = get_bucket(ctx.app_id)
-    events = b.get("events", [])
-    recent = events[-limit:] if events else []
+    recent = [e.to_dict() for e in b.events.recent(limit)]
     
     return {
         "ok": True,
         "events": recent,
         "count": len(recent),
-        "total_available": len(events)
+        "total_available": len(b.events)
     }
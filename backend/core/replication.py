@@ -0,0 +1,279 @@
+"""
+Anti-entropy replication between ledger nodes.
+
+Nodes compare Merkle roots top-down: year checkpoints, then the month
+checkpoints of differing years, then the day_roots of differing months.
+Only days whose roots differ are transferred, so two nodes with a year of
+shared history exchange a handful of small root maps and then move just
+the diverged days.
+
+Keys in a peer's root maps must be well-formed years, months and real
+dates, or they are skipped; a day key names files, so nothing else is ever
+turned into a path. A pulled day is verified before anything is installed. Every received file
+must match the sha256 in the peer's manifest. The day_root is recomputed
+from the seed, sweeps and seal with the ledger's method, and root.json
+must agree with it. The gic and featured logs, which the day_root doesn't
+cover, must parse line by line as records of that day. Installation runs
+on the day's writer: the new files are staged and fsynced, then renamed
+over the old ones, local files the peer doesn't have are removed, and the
+ledger goes in last. The group-commit writer drops its handles to the
+replaced files first, so later gic/featured appends reach the new ones.
+
+Sealed days never change, so a day sealed differently on both nodes is
+reported as a conflict and left alone. The same goes for a day with local
+unsealed files. `force` overrides both and takes the peer's copy.
+
+Checkpoints for days sealed before checkpoints existed must be created
+once with checkpoints.rebuild(), or those days are never offered.
+"""
+from __future__ import annotations
+import base64
+import itertools
+import json
+import os
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.core import storage, checkpoints, day_writer, dedupe, group_commit, jsonl
+from backend.core.hashing import MERKLE_HEX, digest_day, sha256_bytes
+
+_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+# keys expected one level below a period (None, YYYY, YYYY-MM) in a roots map
+_CHILD_RE = {0: re.compile(r"[0-9]{4}"), 4: re.compile(r"[0-9]{4}-[0-9]{2}"), 7: _DATE_RE}
+
+def _check_date(date_str: str) -> None:
+    """ValueError unless `date_str` is a real YYYY-MM-DD; it names files and checkpoints."""
+    try:
+        if _DATE_RE.fullmatch(date_str):
+            checkpoints.periods_for(date_str)  # rejects e.g. 2025-02-30
+            return
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"not a date: {date_str!r}")
+
+# ---------- serving side ----------
+def roots(period: Optional[str] = None) -> Dict[str, str]:
+    """
+    Roots one level below `period`:
+      None      -> {YYYY: year checkpoint root}
+      "YYYY"    -> {YYYY-MM: month checkpoint root}
+      "YYYY-MM" -> {YYYY-MM-DD: day_root}
+    """
+    if period is not None and checkpoints.kind_of(period) == "month":
+        out = {}
+        for path in sorted(storage.DATA_DIR.glob(f"{period}-??.ledger.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                day_root = json.load(f).get("day_root")
+            if day_root:
+                out[path.name.split(".", 1)[0]] = day_root
+        return out
+    if period is not None and checkpoints.kind_of(period) != "year":
+        raise ValueError("period must be omitted, YYYY or YYYY-MM")
+    pattern = f"{period}-??.json" if period else "????.json"
+    out = {}
+    for path in sorted(storage.p(checkpoints.CHECKPOINT_DIR).glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            out[path.stem] = json.load(f)["root"]
+    return out
+
+def export_day(date_str: str) -> Dict[str, Dict[str, str]]:
+    """
+    A sealed day's primary files, base64 encoded by relative path, and a
+    manifest of their sha256 digests: {"files": ..., "manifest": ...}. KeyError if not sealed.
+    """
+    if not storage.p(storage.today_files(date_str)["ledger"]).exists():
+        raise KeyError(f"{date_str} is not sealed on this node")
+    files, manifest = {}, {}
+    for rel in storage.day_files(date_str):
+        with open(storage.p(rel), "rb") as f:
+            data = f.read()
+        files[rel] = base64.b64encode(data).decode("ascii")
+        manifest[rel] = sha256_bytes(data)
+    return {"files": files, "manifest": manifest}
+
+# ---------- pulling side ----------
+def _sweeps(date_str: str, files: Dict[str, bytes], names: Dict[str, str]) -> Iterator[dict]:
+    if names["echo_legacy"] in files:
+        legacy = json.loads(files[names["echo_legacy"]])
+        yield from (legacy if isinstance(legacy, list) else [legacy])
+    yield from _jsonl(files.get(names["echo"], b""))
+    shards = {storage.shard_node(date_str, rel): _jsonl(data) for rel, data in files.items() if storage.is_shard_rel(date_str, rel)}
+    for _, record in storage.merge_shards(shards):
+        yield record
+
+def _jsonl(data: bytes) -> Iterator[dict]:
+    for line in data.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+def _check_log(date_str: str, rel: str, data: bytes, record_type: str) -> None:
+    """Every line of a received gic/featured log must be a `record_type` record of this day."""
+    for n, line in enumerate(data.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            raise ValueError(f"{rel}: line {n} is not valid JSON")
+        if not isinstance(rec, dict) or rec.get("type") != record_type or rec.get("date") != date_str:
+            raise ValueError(f"{rel}: line {n} is not a {record_type} record for {date_str}")
+
+def verify_day(date_str: str, files: Dict[str, bytes], manifest: Optional[Dict[str, str]] = None) -> str:
+    """
+    Check every received file (against `manifest` when given) and recompute the
+    day's root; returns it, or raises ValueError if anything doesn't match.
+    """
+    _check_date(date_str)
+    names = storage.today_files(date_str)
+    allowed = set(storage.day_files(date_str, existing_only=False))
+    unexpected = {rel for rel in files if rel not in allowed and not storage.is_shard_rel(date_str, rel)}
+    if unexpected:
+        raise ValueError(f"unexpected files for {date_str}: {sorted(unexpected)}")
+    if manifest is not None:
+        if set(manifest) != set(files):
+            raise ValueError(f"{date_str}: received files don't match the manifest")
+        for rel, data in files.items():
+            if sha256_bytes(data) != manifest[rel]:
+                raise ValueError(f"{rel}: content doesn't match the manifest")
+    for key in ("seed", "seal", "ledger"):
+        if names[key] not in files:
+            raise ValueError(f"{date_str}: {key} file missing")
+    ledger = json.loads(files[names["ledger"]])
+    method = ledger.get("method") or MERKLE_HEX
+    sealed = int(ledger.get("counts", {}).get("sweeps", 0))
+    sweeps = itertools.islice(_sweeps(date_str, files, names), sealed)
+    digest = digest_day(json.loads(files[names["seed"]]), sweeps, json.loads(files[names["seal"]]), method)
+    if len(digest.echo) != sealed or digest.root != ledger.get("day_root"):
+        raise ValueError(f"{date_str}: files don't hash to the ledger's day_root")
+    root_rel = f"{date_str}.root.json"
+    if root_rel in files and json.loads(files[root_rel]).get("root") != digest.root:
+        raise ValueError(f"{root_rel}: root differs from the ledger's day_root")
+    for rel, record_type in ((f"{date_str}/{date_str}.gic.jsonl", "gic_tx"),
+                             (f"{date_str}/{date_str}.featured_queue.jsonl", "feature_candidate")):
+        if rel in files:
+            _check_log(date_str, rel, files[rel], record_type)
+    return digest.root
+
+def install_day(date_str: str, files: Dict[str, bytes], manifest: Optional[Dict[str, str]] = None) -> str:
+    """Verify and atomically install a day's files (run on the day's writer). Returns its day_root."""
+    _check_date(date_str)
+    day_root = verify_day(date_str, files, manifest)
+    names = storage.today_files(date_str)
+    order = [rel for rel in files if rel != names["ledger"]]
+    order.append(names["ledger"])  # commit point last
+    staged = []
+    try:
+        for rel in order:
+            path = storage.p(rel)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            staged.append((tmp, path))
+            with open(tmp, "wb") as f:
+                f.write(files[rel])
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        raise
+    stale = [rel for rel in storage.day_files(date_str) if rel not in files]
+    # queued gic/featured appends land first; then the writer drops its handles to the old files
+    gc = group_commit.writer()
+    gc.flush()
+    gc.release([storage.p(rel) for rel in (*files, *stale)])
+    for tmp, path in staged[:-1]:
+        os.replace(tmp, path)
+    for rel in stale:
+        # the peer's copy of the day is authoritative; removed only once its files are in place
+        storage.p(rel).unlink(missing_ok=True)
+        jsonl.index_path(storage.p(rel)).unlink(missing_ok=True)
+    os.replace(*staged[-1])
+
+    # derived state rebuilds lazily from the new files
+    storage.p(f"{date_str}.frontier.json").unlink(missing_ok=True)
+    storage.p(f"{date_str}/{date_str}.dedupe.idx").unlink(missing_ok=True)
+    dedupe.forget(date_str)
+    checkpoints.record(date_str, day_root)
+    return day_root
+
+class HttpPeer:
+    """Another node's /replication endpoints."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        import httpx  # only needed when actually talking to a peer
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.Client(base_url=self.base_url, timeout=timeout)
+        self.requests = 0
+
+    def roots(self, period: Optional[str] = None) -> Dict[str, str]:
+        self.requests += 1
+        resp = self.client.get("/replication/roots", params={"period": period} if period else None)
+        resp.raise_for_status()
+        return resp.json()["roots"]
+
+    def day(self, date_str: str) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+        """(files, manifest) of a sealed day."""
+        self.requests += 1
+        resp = self.client.get(f"/replication/day/{date_str}")
+        resp.raise_for_status()
+        body = resp.json()
+        return {rel: base64.b64decode(b64) for rel, b64 in body["files"].items()}, body["manifest"]
+
+    def close(self) -> None:
+        self.client.close()
+
+def _in_range(key: str, start: Optional[str], end: Optional[str]) -> bool:
+    n = len(key)
+    return (not start or key >= start[:n]) and (not end or key <= end[:n])
+
+def diverged(peer, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """{date: local day_root or None} for every peer-sealed day whose root differs from ours."""
+    out: Dict[str, Optional[str]] = {}
+    def walk(period: Optional[str]) -> None:
+        theirs, ours = peer.roots(period), roots(period)
+        child = _CHILD_RE[len(period or "")]
+        for key, root in theirs.items():
+            if not isinstance(key, str) or not child.fullmatch(key):
+                continue  # not a period or day name; never used as a path
+            if not _in_range(key, start, end) or ours.get(key) == root:
+                continue
+            if len(key) == 10:  # a day
+                try:
+                    _check_date(key)
+                except ValueError:
+                    continue
+                out[key] = ours.get(key)
+            else:
+                walk(key)
+    walk(None)
+    return out
+
+def reconcile(
+    peer,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    force: bool = False,
+    on_installed: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """Pull every diverged day from `peer`. Returns a report of what moved and what didn't."""
+    report: Dict[str, List] = {"pulled": [], "conflicts": [], "rejected": []}
+    for date_str, local_root in sorted(diverged(peer, start, end).items()):
+        if not force and (local_root is not None or storage.day_files(date_str)):
+            reason = "sealed with a different day_root" if local_root else "local unsealed data"
+            report["conflicts"].append({"date": date_str, "reason": reason})
+            continue
+        try:
+            files, manifest = peer.day(date_str)
+            day_writer.run(date_str, install_day, date_str, files, manifest)
+        except ValueError as e:
+            report["rejected"].append({"date": date_str, "reason": str(e)})
+            continue
+        report["pulled"].append(date_str)
+        if on_installed:
+            on_installed(date_str)
+    return report
@@ -0,0 +1,76 @@
+"""
+In-process LRU of serialized responses for sealed days.
+
+Entries are keyed by (kind, date) and carry the ETag they were built for.
+The ETag is derived from the day_root plus the catalog's write counters, so
+a re-seal or a late write yields a new tag and the old bytes are simply
+never served again. Writes in this process also drop the day's entries
+right away.
+
+The cache is bounded both in entries (SEALED_CACHE_ENTRIES) and in bytes
+(SEALED_CACHE_BYTES). A body larger than SEALED_CACHE_MAX_BODY is served
+but not kept, so one big /export can't push every other day out.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+MAX_ENTRIES = int(os.getenv("SEALED_CACHE_ENTRIES", "256"))
+MAX_BYTES = int(os.getenv("SEALED_CACHE_BYTES", str(64 * 1024 * 1024)))
+MAX_BODY = int(os.getenv("SEALED_CACHE_MAX_BODY", str(4 * 1024 * 1024)))
+
+_entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+_size = 0  # bytes held in _entries
+_lock = threading.Lock()
+
+def etag_for(kind: str, date_str: str, validator: dict) -> str:
+    """Strong ETag (quoted) for one representation of a sealed day."""
+    raw = f"{kind}:{date_str}:{validator['day_root']}:{validator['version']}"
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 7232 If-None-Match check (weak comparison, '*' matches anything)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def get(kind: str, date_str: str, etag: str) -> Optional[bytes]:
+    with _lock:
+        entry = _entries.get((kind, date_str))
+        if entry is None or entry[0] != etag:
+            return None
+        _entries.move_to_end((kind, date_str))
+        return entry[1]
+
+def put(kind: str, date_str: str, etag: str, body: bytes) -> None:
+    global _size
+    with _lock:
+        old = _entries.pop((kind, date_str), None)
+        if old is not None:
+            _size -= len(old[1])
+        if len(body) > min(MAX_BODY, MAX_BYTES):
+            return
+        _entries[(kind, date_str)] = (etag, body)
+        _size += len(body)
+        while len(_entries) > MAX_ENTRIES or _size > MAX_BYTES:
+            _, (_, evicted) = _entries.popitem(last=False)
+            _size -= len(evicted)
+
+def invalidate(date_str: str) -> None:
+    global _size
+    with _lock:
+        for key in [k for k in _entries if k[1] == date_str]:
+            _size -= len(_entries.pop(key)[1])
+
+def clear() -> None:
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
@@ -2,7 +2,11 @@ from __future__ import annotations
 from pathlib import Path
 import json
 import os
-from typing import Dict, List, Tuple, Any, Optional
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple, Any, Optional
+
+from . import jsonl
+from .hashing import MERKLE_HEX, canonical_bytes, digest_day, sha256_json
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
@@ -20,11 +24,76 @@ def today_files(date_str: str) -> Dict[str, str]:
     base = f"{date_str}"
     return {
         "seed":   f"{base}.seed.json",
-        "echo":   f"{base}.echo.json",
+        "echo":   f"{base}.echo.jsonl",
+        "echo_legacy": f"{base}.echo.json",
         "seal":   f"{base}.seal.json",
         "ledger": f"{base}.ledger.json",
     }
 
+def day_files(date_str: str, existing_only: bool = True) -> List[str]:
+    """
+    Every primary file of a day that exists on disk (relative to DATA_DIR), in a
+    stable order. Derived state (frontier, Merkle levels, dedupe index) is left out.
+    existing_only=False lists every name a day may have.
+    """
+    files = today_files(date_str)
+    candidates = [
+        files["seed"],
+        files["echo_legacy"],
+        files["echo"],
+        *(shard_files(date_str) if existing_only else []),
+        files["seal"],
+        files["ledger"],
+        f"{date_str}.root.json",
+        f"{date_str}/{date_str}.gic.jsonl",
+        f"{date_str}/{date_str}.featured_queue.jsonl",
+    ]
+    return [rel for rel in candidates if not existing_only or (DATA_DIR / rel).exists()]
+
+# ---------- Node-sharded sweep logs ----------
+# With ECHO_SHARDING=node each node appends its sweeps to its own
+# {date}.echo.{node_id}.jsonl, with no coordination between nodes. A day's
+# shards are merged by (ts, node_id, leaf hash), which every node computes
+# identically, and come after the legacy array and the unsharded log.
+_NODE_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+def sharding_enabled() -> bool:
+    return os.getenv("ECHO_SHARDING", "off").lower() == "node"
+
+def shard_rel(date_str: str, node_id: Optional[str] = None) -> str:
+    node = _NODE_UNSAFE.sub("_", node_id or get_node_metadata()["node_id"])
+    return f"{date_str}.echo.{node}.jsonl"
+
+def shard_node(date_str: str, rel: str) -> str:
+    return rel[len(f"{date_str}.echo."):-len(".jsonl")]
+
+def is_shard_rel(date_str: str, rel: str) -> bool:
+    node = shard_node(date_str, rel)
+    return rel == f"{date_str}.echo.{node}.jsonl" and bool(node) and not _NODE_UNSAFE.search(node)
+
+def shard_files(date_str: str) -> List[str]:
+    """The day's sweep shards, relative to DATA_DIR, sorted by name."""
+    if not DATA_DIR.exists():
+        return []
+    return sorted(path.name for path in DATA_DIR.glob(f"{date_str}.echo.*.jsonl") if is_shard_rel(date_str, path.name))
+
+def echo_target(date_str: str) -> str:
+    """Where this node appends the day's sweeps."""
+    return shard_rel(date_str) if sharding_enabled() else today_files(date_str)["echo"]
+
+def shard_key(node_id: str, record: dict) -> Tuple[str, str, str]:
+    """Merge order of a sharded sweep: (ts, node_id, leaf hash)."""
+    return (str(record.get("ts", "")), node_id, sha256_json(record))
+
+def merge_shards(shards: Dict[str, Iterable[dict]]) -> List[Tuple[Tuple[str, str, str], dict]]:
+    """(key, record) for every record of every shard ({node_id: records}), in merge order."""
+    keyed = [(shard_key(node, r), r) for node, records in shards.items() for r in records]
+    keyed.sort(key=lambda kr: kr[0])
+    return keyed
+
+def iter_sharded(date_str: str) -> List[Tuple[Tuple[str, str, str], dict]]:
+    return merge_shards({shard_node(date_str, rel): iter_records(rel) for rel in shard_files(date_str)})
+
 def p(path_rel: str) -> Path:
     """Absolute path under DATA_DIR."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -39,31 +108,153 @@ def write_json(path_rel: str, obj: Any) -> None:
     with open(p(path_rel), "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
+def write_json_group(items: List[Tuple[str, Any]]) -> None:
+    """
+    Write several JSON files as one unit. Every temp file is written and fsynced
+    before any is renamed into place, in the given order (put the file readers
+    treat as the commit point last). A crash never leaves a half-written file.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    staged = []
+    try:
+        for path_rel, obj in items:
+            tmp = p(path_rel).with_name(p(path_rel).name + ".tmp")
+            staged.append((tmp, p(path_rel)))
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        raise
+    for tmp, final in staged:
+        os.replace(tmp, final)
+
+def append_bytes(path_rel: str, data: bytes) -> None:
+    """Append already-encoded JSONL lines with a single write."""
+    with open(p(path_rel), "ab") as f:
+        f.write(data)
+
+def append_record(path_rel: str, obj: Any) -> None:
+    """Append one JSON record as a single canonical line (O(1), never rewrites the file)."""
+    append_bytes(path_rel, canonical_bytes(obj) + b"\n")
+
+def append_records(path_rel: str, objs: List[Any]) -> None:
+    """Append several records with a single write."""
+    append_bytes(path_rel, b"".join(canonical_bytes(o) + b"\n" for o in objs))
+
+def iter_records(path_rel: str) -> Iterator[dict]:
+    """Stream records from a JSONL file. Blank or corrupt lines are skipped."""
+    return jsonl.iter_records(p(path_rel))
+
+def iter_sweeps(date_str: str) -> Iterator[dict]:
+    """
+    Stream the day's sweeps in ledger order:
+    legacy {date}.echo.json array first (old days), then the {date}.echo.jsonl log,
+    then the merged node shards.
+    """
+    yield from iter_unsharded(date_str)
+    for _, record in iter_sharded(date_str):
+        yield record
+
+def iter_unsharded(date_str: str) -> Iterator[dict]:
+    """Legacy array, then the {date}.echo.jsonl log."""
+    yield from _legacy_sweeps(date_str)
+    yield from iter_records(today_files(date_str)["echo"])
+
+def _legacy_sweeps(date_str: str) -> List[dict]:
+    rel = today_files(date_str)["echo_legacy"]
+    if not p(rel).exists():
+        return []
+    legacy = read_json(rel)
+    # tolerate old format accidentally saved as dict
+    return [legacy] if isinstance(legacy, dict) else legacy
+
+_SCAN_CHUNK = 256  # records read per step while filtering a page
+
+def sweep_page(
+    date_str: str,
+    offset: int = 0,
+    limit: int = 100,
+    chamber: Optional[str] = None,
+    scan_max: int = 10000,
+) -> Tuple[int, List[Tuple[int, dict]], Optional[int]]:
+    """
+    One page of the day's sweeps in ledger order, from position `offset`.
+    Returns (total, [(position, sweep)], next offset or None on the last page).
+
+    The sweep log is read through its offset index, so a page costs the same
+    at any depth. With `chamber`, at most `scan_max` positions are examined;
+    a short page with a next offset just means "keep going". Legacy arrays
+    and sharded days are merged in memory first (old or opt-in layouts).
+    """
+    files = today_files(date_str)
+    with jsonl.JsonlFile(p(files["echo"])) as log:
+        segments = [_legacy_sweeps(date_str), log, [r for _, r in iter_sharded(date_str)]]
+        total = sum(len(seg) for seg in segments)
+        pos = max(offset, 0)
+        end = min(total, pos + scan_max) if chamber is not None else total
+        items: List[Tuple[int, dict]] = []
+        while pos < end and len(items) < limit:
+            base = 0
+            for seg in segments:
+                if pos < base + len(seg):
+                    break
+                base += len(seg)
+            step = limit - len(items) if chamber is None else max(limit - len(items), _SCAN_CHUNK)
+            hi = min(base + len(seg), end, pos + step)
+            chunk = seg.slice(pos - base, hi - base) if isinstance(seg, jsonl.JsonlFile) else seg[pos - base:hi - base]
+            for rec in chunk:
+                pos += 1
+                if chamber is None or (isinstance(rec, dict) and rec.get("chamber") == chamber):
+                    items.append((pos - 1, rec))
+                    if len(items) == limit:
+                        break
+    return total, items, (pos if pos < total else None)
+
+def echo_link(date_str: str) -> Optional[str]:
+    """
+    The sweep file to point at for a day: the log, or the legacy array for old
+    days. None for a day whose sweeps are only in node shards (see links.echo_shards).
+    """
+    files = today_files(date_str)
+    if not p(files["echo"]).exists():
+        if p(files["echo_legacy"]).exists():
+            return files["echo_legacy"]
+        if shard_files(date_str):
+            return None
+    return files["echo"]
+
 def load_day(date_str: str) -> Tuple[Optional[dict], List[dict], Optional[dict]]:
     """Load seed (dict or None), sweeps (list), seal (dict or None). Missing files => None/[]"""
     files = today_files(date_str)
     seed = read_json(files["seed"]) if p(files["seed"]).exists() else None
-    sweeps = read_json(files["echo"]) if p(files["echo"]).exists() else []
-    if isinstance(sweeps, dict):
-        # tolerate old format accidentally saved as dict
-        sweeps = [sweeps]
+    sweeps = list(iter_sweeps(date_str))
     seal = read_json(files["seal"]) if p(files["seal"]).exists() else None
     return seed, sweeps, seal
 
-def build_ledger_obj(date_str: str, seed: dict, sweeps: List[dict], seal: dict) -> dict:
-    from .hashing import sha256_json, merkle_root
-    leaves = [sha256_json(seed)] + [sha256_json(s) for s in sweeps] + [sha256_json(seal)]
-    root = merkle_root(leaves)
+def build_ledger_obj(date_str: str, seed: dict, sweeps: List[dict], seal: dict, method: str = MERKLE_HEX) -> dict:
+    digest = digest_day(seed, sweeps, seal, method)
+    return ledger_obj(date_str, digest.root, {"seeds": 1 if seed else 0, "sweeps": len(digest.echo), "seals": 1 if seal else 0}, method)
+
+def ledger_obj(date_str: str, day_root: str, counts: Dict[str, int], method: str = MERKLE_HEX) -> dict:
+    """Ledger record for a day whose root has already been computed."""
     files = today_files(date_str)
+    links = {
+        "seed": files["seed"],
+        "echo": echo_link(date_str),
+        "seal": files["seal"],
+        "ledger": files["ledger"],
+    }
+    shards = shard_files(date_str)
+    if shards:
+        links["echo_shards"] = shards
     return {
         "date": date_str,
-        "day_root": root,
-        "counts": {"seeds": 1 if seed else 0, "sweeps": len(sweeps), "seals": 1 if seal else 0},
-        "links": {
-            "seed": files["seed"],
-            "echo": files["echo"],
-            "seal": files["seal"],
-            "ledger": files["ledger"],
-        },
+        "day_root": day_root,
+        "method": method,
+        "counts": counts,
+        "links": links,
         "ts": __import__("datetime").datetime.now(__import__("datetime").timezone.utc).isoformat().replace("+00:00", "Z"),
     }
@@ -0,0 +1,9 @@
+# tests/unit/conftest.py
+import pytest
+from backend.core import storage
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Every unit test gets its own empty DATA_DIR."""
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path)
+    return tmp_path
@@ -0,0 +1,141 @@
+# tests/unit/test_api.py
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import main
+from backend.core import dedupe, group_commit, sealed_cache
+from backend.core.hashing import verify_proof
+from backend.core.storage import today_files, write_json
+
+DATE = "2025-10-02"
+LONG = "x" * 250  # long enough for the publish tiers
+
+@pytest.fixture(autouse=True)
+def app_state(data_dir, monkeypatch):
+    monkeypatch.setattr(main, "DATA_DIR", data_dir)
+    monkeypatch.setenv("LEDGER_PATH", str(data_dir))
+    monkeypatch.delenv("ECHO_SHARDING", raising=False)
+    dedupe.forget()
+    sealed_cache.clear()
+    yield
+    sealed_cache.clear()
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+def _seed(client, date=DATE):
+    assert client.post("/seed", json={"date": date, "time": "09:00", "intent": "t"}).status_code == 200
+
+def _sweep(client, date=DATE, note="n", **meta):
+    resp = client.post("/sweep", json={"date": date, "chamber": "LAB", "note": note, "meta": meta})
+    assert resp.status_code == 200
+    return resp.json()
+
+def _seal(client, date=DATE):
+    resp = client.post("/seal", json={"date": date, "wins": "w", "blocks": "b", "tomorrow_intent": "i"})
+    assert resp.status_code == 200
+    return resp.json()
+
+def test_first_sweep_of_an_uncatalogued_day_counts_its_gic(client, monkeypatch):
+    write_json(today_files(DATE)["seed"], {"type": "seed", "date": DATE})  # seeded outside the API
+    real = group_commit.GroupCommitWriter._commit
+    # a slow disk: the gic line lands well after the sweep's catalog update
+    monkeypatch.setattr(group_commit.GroupCommitWriter, "_commit", lambda self, batch: time.sleep(0.2) or real(self, batch))
+    gic = _sweep(client)["gic"]
+    assert gic > 0
+    day = client.get(f"/verify/{DATE}").json()
+    assert day["counts"]["sweeps"] == 1 and day["counts"]["gic_txs"] == 1
+    assert day["gic"]["sum"] == gic
+    row = next(r for r in client.get("/index").json()["items"] if r["date"] == DATE)
+    assert row["counts"]["gic_txs"] == 1 and row["gic"]["sum"] == gic
+
+def test_sweep_batch_reports_per_record_and_updates_the_catalog(client):
+    _seed(client)
+    body = "\n".join([
+        json.dumps({"date": DATE, "chamber": "LAB", "note": "a"}),
+        "{not json",
+        json.dumps({"date": "2025-10-03", "chamber": "LAB", "note": "b"}),
+        json.dumps({"date": DATE, "chamber": "LAB", "note": "c"}),
+    ])
+    out = client.post("/sweep/batch", content=body).json()
+    assert (out["received"], out["accepted"], out["rejected"]) == (4, 3, 1)
+    assert [r["ok"] for r in out["results"]] == [True, False, True, True]
+    assert out["days"] == [DATE, "2025-10-03"]
+    assert client.get(f"/verify/{DATE}").json()["counts"]["gic_txs"] == 2
+    assert client.get("/verify/2025-10-03").json()["counts"]["sweeps"] == 1
+
+def test_sweep_batch_accepts_non_string_gic_intent(client):
+    _seed(client)
+    body = [{"date": DATE, "chamber": "LAB", "note": "a", "meta": {"gic_intent": intent}} for intent in (5, None, True)]
+    out = client.post("/sweep/batch", json=body).json()
+    assert [r["ok"] for r in out["results"]] == [True, True, True]
+    day = client.get(f"/verify/{DATE}").json()
+    assert day["counts"]["sweeps"] == 3 and day["counts"]["gic_txs"] == 3
+
+def test_sweeps_pages_cover_the_day_once(client):
+    _seed(client)
+    for i in range(5):
+        _sweep(client, note=f"n{i}")
+    seen, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/sweeps/{DATE}", params={"offset": offset, "limit": 2}).json()
+        assert page["total"] == 5
+        seen += [item["record"]["note"] for item in page["items"]]
+        offset = page["next"]
+    assert seen == [f"n{i}" for i in range(5)]
+    assert client.get(f"/sweeps/{DATE}", params={"limit": 0}).status_code == 400
+
+def test_proofs_verify_against_the_sealed_root(client):
+    _seed(client)
+    attestations = [_sweep(client, note=f"n{i}")["attestation"] for i in range(3)]
+    day_root = _seal(client)["day_root"]
+    pr = client.get(f"/proof/{DATE}/2").json()
+    assert pr["day_root"] == day_root and pr["leaf"] == attestations[1]
+    assert verify_proof(pr["leaf"], pr["path"], day_root, pr["method"])
+    by_hash = client.get(f"/proof/{DATE}/by-hash/{attestations[2]}").json()
+    assert by_hash["leaf_index"] == 3
+    assert client.get(f"/proof/{DATE}/99").status_code == 404
+    assert client.get("/proof/2025-10-09/1").status_code == 404
+
+def test_sharded_day_export_contains_its_sweeps(client, monkeypatch):
+    monkeypatch.setenv("ECHO_SHARDING", "node")
+    monkeypatch.setenv("NODE_ID", "alpha")
+    _seed(client)
+    _sweep(client, note="a")
+    _sweep(client, note="b")
+    _seal(client)
+    files = client.get(f"/export/{DATE}").json()["files"]
+    assert [s["note"] for s in files[f"{DATE}.echo.alpha.jsonl"]] == ["a", "b"]
+    assert len(files[f"{DATE}/{DATE}.gic.jsonl"]) == 2
+    assert files[today_files(DATE)["ledger"]]["links"]["echo_shards"] == [f"{DATE}.echo.alpha.jsonl"]
+
+def test_etag_revalidates_and_changes_with_writes_after_seal(client, monkeypatch):
+    _seed(client)
+    _sweep(client)
+    _seal(client)
+    first = client.get(f"/verify/{DATE}")
+    etag = first.headers["etag"]
+    assert "immutable" in first.headers["cache-control"]
+    assert client.get(f"/verify/{DATE}", headers={"If-None-Match": etag}).status_code == 304
+
+    # a bonus payout into the sealed day: gic only, no sweeps
+    monkeypatch.setenv("ADMIN_KEY", "k")
+    _sweep(client, date="2025-09-30", note=LONG, gic_intent=main.FEATURE_INTENT, user="u1", content_hash="h1")
+    run = {"start": "2025-09-30", "end": "2025-09-30", "payout_day": DATE}
+    assert client.post("/bonus/run", json=run, headers={"X-Admin-Key": "k"}).json()["written"] == 1
+    after = client.get(f"/verify/{DATE}", headers={"If-None-Match": etag})
+    assert after.status_code == 200 and after.headers["etag"] != etag
+    assert after.headers["cache-control"] == "no-cache"
+    assert after.json()["counts"]["gic_txs"] == 2
+
+def test_seed_repost_after_seal_changes_the_export_etag(client):
+    _seed(client)
+    _seal(client)
+    etag = client.get(f"/export/{DATE}").headers["etag"]
+    assert client.post("/seed", json={"date": DATE, "time": "10:00", "intent": "changed"}).status_code == 200
+    resp = client.get(f"/export/{DATE}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["etag"] != etag
+    assert resp.json()["files"][today_files(DATE)["seed"]]["intent"] == "changed"
@@ -0,0 +1,66 @@
+# tests/unit/test_app_registry.py
+import pytest
+from backend.core import app_registry
+from backend.core.app_registry import AppRegistry, MemoryBackend, SQLiteBackend
+
+def _worker(changes=None):
+    """A registry as a separate worker would hold it: its own cache and connections."""
+    return AppRegistry(SQLiteBackend(), on_change=None if changes is None else changes.append)
+
+def test_apps_survive_a_restart():
+    _worker().set_secret("console", "s1")
+    assert _worker().get("console") == {"secret": "s1"}
+    assert "console" in _worker() and "other" not in _worker()
+
+def test_rotation_and_logout_reach_other_workers_on_sync():
+    a, seen = _worker(), []
+    b = _worker(seen)
+    a.set_secret("console", "s1")
+    assert b.get("console") == {"secret": "s1"}
+    a.set_secret("console", "s2")
+    assert b.get("console") == {"secret": "s1"}  # cached until the next sync
+    b.sync()
+    assert b.get("console") == {"secret": "s2"} and seen == ["console"]
+    assert a.pop("console") and not a.pop("console")
+    b.sync()
+    assert b.get("console") is None and seen == ["console", "console"]
+
+def test_sync_interval_gates_backend_reads(monkeypatch):
+    monkeypatch.setattr(app_registry, "SYNC_S", 3600)
+    a, b = _worker(), _worker()
+    b.get("console")
+    calls = []
+    real = b.backend.changes
+    monkeypatch.setattr(b.backend, "changes", lambda since: calls.append(since) or real(since))
+    a.set_secret("console", "s1")
+    for _ in range(5):
+        b.maybe_sync()
+    assert calls == []
+
+def test_own_writes_and_reads_dont_report_changes():
+    seen = []
+    reg = AppRegistry(MemoryBackend(), on_change=seen.append)
+    reg.set_secret("console", "s1")
+    reg.sync()
+    assert seen == ["console"]
+
+def test_older_rows_never_replace_newer_ones():
+    reg = AppRegistry(MemoryBackend())
+    reg.set_secret("console", "s1")
+    reg.pop("console")
+    with reg._lock:
+        assert not reg._apply("console", "s1", 1)
+    assert reg.get("console") is None
+
+def test_unknown_apps_are_not_cached():
+    reg = _worker()
+    for i in range(50):
+        assert reg.get(f"forged-{i}") is None
+    assert reg._cache == {}
+
+def test_backend_is_chosen_by_env(monkeypatch):
+    monkeypatch.setenv("AUTH_REGISTRY", "memory")
+    assert isinstance(app_registry.default_backend(), MemoryBackend)
+    monkeypatch.setenv("AUTH_REGISTRY", "redis")
+    with pytest.raises(ValueError):
+        app_registry.default_backend()
@@ -0,0 +1,75 @@
+# tests/unit/test_audit.py
+from backend.core import storage, frontier, audit
+from backend.core.hashing import sha256_json
+from backend.core.storage import today_files, write_json, ledger_obj
+
+def _sealed_day(date, n=3):
+    files = today_files(date)
+    write_json(files["seed"], {"type": "seed", "date": date})
+    frontier.append_sweeps(date, [{"type": "sweep", "date": date, "note": f"n{i}"} for i in range(n)])
+    seal = {"type": "seal", "date": date}
+    write_json(files["seal"], seal)
+    root, state = frontier.seal_root(date, sha256_json(seal))
+    counts = {"seeds": 1, "sweeps": state["sweeps"], "seals": 1}
+    write_json(files["ledger"], ledger_obj(date, root, counts, frontier.state_method(state)))
+
+def _days(reports):
+    return {r["date"]: r for r in reports if r["type"] == "day"}
+
+def test_clean_history_passes_and_late_sweeps_dont_fail():
+    _sealed_day("2025-10-01")
+    _sealed_day("2025-10-02")
+    frontier.append_sweep("2025-10-02", {"type": "sweep", "note": "after seal"})
+    write_json(today_files("2025-10-03")["seed"], {"type": "seed"})
+    reports = list(audit.run(audit.dates_on_disk(), workers=1))
+    days = _days(reports)
+    assert days["2025-10-01"]["status"] == "ok"
+    assert days["2025-10-02"]["status"] == "ok" and days["2025-10-02"]["unsealed_sweeps"] == 1
+    assert days["2025-10-03"]["status"] == "unsealed"
+    assert reports[-1] == {**reports[-1], "type": "summary", "days": 3, "ok": 2, "unsealed": 1, "mismatch": 0}
+
+def test_tampered_sweep_is_a_mismatch():
+    _sealed_day("2025-10-01")
+    path = storage.p(today_files("2025-10-01")["echo"])
+    path.write_text(path.read_text().replace("n1", "nX"))
+    day = _days(audit.run(["2025-10-01"], workers=1))["2025-10-01"]
+    assert day["status"] == "mismatch"
+    assert "ledger day_root differs from recomputed root" in day["mismatches"]
+
+def test_rerun_uses_cache_until_files_change():
+    _sealed_day("2025-10-01")
+    _sealed_day("2025-10-02")
+    list(audit.run(audit.dates_on_disk(), workers=1))
+    assert _days(audit.run(audit.dates_on_disk(), workers=1))["2025-10-01"]["cached"]
+    frontier.append_sweep("2025-10-02", {"type": "sweep", "note": "late"})
+    days = _days(audit.run(audit.dates_on_disk(), workers=1))
+    assert days["2025-10-01"]["cached"] and not days["2025-10-02"]["cached"]
+
+def test_process_pool_matches_inline():
+    for d in range(1, 6):
+        _sealed_day(f"2025-10-{d:02d}", n=d)
+    dates = audit.dates_on_disk()
+    pooled = _days(audit.run(dates, workers=2, use_cache=False))
+    inline = _days(audit.run(dates, workers=1, use_cache=False))
+    assert pooled == inline
+    assert all(r["status"] == "ok" for r in pooled.values())
+
+def test_concurrent_runs_merge_their_cache_entries():
+    _sealed_day("2025-10-01")
+    _sealed_day("2025-10-02")
+    first = audit.run(["2025-10-01"], workers=1)
+    next(first)  # started, cache loaded before the other run saves
+    list(audit.run(["2025-10-02"], workers=1))
+    list(first)
+    assert set(audit._load_cache()) == {"2025-10-01", "2025-10-02"}
+    assert not list(storage.DATA_DIR.glob("*.tmp"))
+
+def test_pool_is_shared_between_runs():
+    for d in range(1, 4):
+        _sealed_day(f"2025-10-{d:02d}")
+    list(audit.run(audit.dates_on_disk(), workers=2, use_cache=False))
+    pool = audit._pools[2]
+    list(audit.run(audit.dates_on_disk(), workers=2, use_cache=False))
+    assert audit._pools[2] is pool
+    audit.shutdown()
+    assert not audit._pools
@@ -0,0 +1,120 @@
+# tests/unit/test_auth.py
+import base64
+import pytest
+from backend.core import auth, app_registry as auth_registry
+from backend.core.app_registry import AppRegistry, MemoryBackend
+
+@pytest.fixture(autouse=True)
+def clean_auth(monkeypatch):
+    for state in (auth.REVOKED, auth._verified, auth._app_gen):
+        state.clear()
+    monkeypatch.setattr(auth, "APPS", AppRegistry(MemoryBackend(), on_change=auth.forget_app))
+    yield
+
+def _register(app_id="console"):
+    return base64.b64decode(auth.register_app(auth.RegisterApp(app_id=app_id))["secret"])
+
+def _bearer(token):
+    return f"Bearer {token}"
+
+def test_second_check_is_served_from_cache(monkeypatch):
+    token, exp = auth.make_token("console", _register())
+    assert auth.verified(token) == ("console", exp)
+    monkeypatch.setattr(auth, "hmac_sha256", lambda *a: pytest.fail("recomputed HMAC"))
+    monkeypatch.setattr(auth, "parse_token", lambda *a: pytest.fail("re-parsed token"))
+    assert auth.verified(token) == ("console", exp)
+    assert auth.verify_token(token)
+
+def test_invalid_tokens_are_not_cached():
+    secret = _register()
+    assert auth.verified("bm9wZQ==") is None
+    token, _ = auth.make_token("console", b"wrong" + secret)
+    assert auth.verified(token) is None
+    assert not auth._verified
+
+def test_cached_entry_expires_with_the_token(monkeypatch):
+    token, exp = auth.make_token("console", _register(), ttl=10)
+    assert auth.verified(token)
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    assert auth.verified(token) is None
+    assert not auth._verified
+
+def test_soft_logout_invalidates_only_that_token():
+    secret = _register()
+    t1, _ = auth.make_token("console", secret)
+    t2, _ = auth.make_token("console", secret, ttl=60)
+    assert auth.verified(t1) and auth.verified(t2)
+    auth.soft_logout(authorization=_bearer(t1))
+    assert auth.verified(t1) is None
+    assert auth.verified(t2)
+
+def test_rotate_and_logout_invalidate_the_app_immediately():
+    secret = _register()
+    other, _ = auth.make_token("other", _register("other"))
+    token, exp = auth.make_token("console", secret)
+    assert auth.verified(token) and auth.verified(other)
+    proof = base64.b64encode(auth.hmac_sha256(secret, b"rotate")).decode()
+    new_secret = base64.b64decode(auth.rotate_secret(auth.RotateSecret(app_id="console", proof=proof))["secret"])
+    assert auth.verified(token) is None
+    assert auth.verified(other)
+
+    token, exp = auth.make_token("console", new_secret)
+    assert auth.verified(token)
+    auth.logout(auth.AdminContext(app_id="console", exp=exp))
+    assert auth.verified(token) is None
+
+def test_cache_stays_bounded(monkeypatch):
+    monkeypatch.setattr(auth, "VERIFY_CACHE_MAX", 3)
+    secret = _register()
+    tokens = [auth.make_token("console", secret, ttl=100 + i)[0] for i in range(5)]
+    for t in tokens:
+        assert auth.verified(t)
+    assert len(auth._verified) == 3
+
+def test_revoked_tokens_are_indexed_by_app_and_purged_at_exp(monkeypatch):
+    secret, other = _register(), _register("other")
+    short, exp = auth.make_token("console", secret, ttl=10)
+    long, _ = auth.make_token("console", secret, ttl=1000)
+    foreign, _ = auth.make_token("other", other)
+    for t in (short, long, foreign):
+        auth.soft_logout(authorization=_bearer(t))
+    assert sorted(auth.REVOKED.for_app("console")) == sorted([short, long])
+    assert auth.REVOKED.for_app("other") == [foreign]
+    now = auth.time.time()
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    assert auth.REVOKED.for_app("console") == [long]
+    assert len(auth.REVOKED) == 2
+    monkeypatch.setattr(auth.time, "time", lambda: now + 10_000)
+    assert auth.REVOKED.for_app("other") == [] and len(auth.REVOKED) == 0
+
+def test_only_live_tokens_are_kept():
+    secret = _register()
+    forged, _ = auth.make_token("console", b"not the secret")
+    auth.soft_logout(authorization=_bearer(forged))
+    assert auth.soft_logout(authorization=_bearer("garbage"))["ok"]
+    assert len(auth.REVOKED) == 0
+    assert auth.REVOKED.revoke(auth.make_token("console", secret, ttl=-5)[0]) is False
+
+def test_logout_invalidates_cached_tokens_without_visiting_them(monkeypatch):
+    secret = _register()
+    tokens = [auth.make_token("console", secret, ttl=100 + i)[0] for i in range(3)]
+    assert all(auth.verified(t) for t in tokens)
+    auth.soft_logout(authorization=_bearer(tokens[0]))
+    auth.logout(auth.AdminContext(app_id="console", exp=0))
+    assert len(auth._verified) == 2  # stale, dropped lazily
+    assert auth.REVOKED.for_app("console") == []
+    assert tokens[0] in auth.REVOKED
+    assert not any(auth.verified(t) for t in tokens)
+    assert auth._verified == {}
+    assert not any(auth.verified(t) for t in tokens)
+
+def test_rotation_in_another_worker_invalidates_cached_tokens(monkeypatch):
+    monkeypatch.setattr(auth_registry, "SYNC_S", 3600)
+    secret = _register()
+    token, _ = auth.make_token("console", secret)
+    assert auth.verified(token)
+    other_worker = AppRegistry(auth.APPS.backend)
+    other_worker.set_secret("console", "cm90YXRlZA==")
+    assert auth.verified(token)  # until this worker syncs
+    auth.APPS.sync()
+    assert auth.verified(token) is None
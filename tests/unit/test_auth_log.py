@@ -0,0 +1,75 @@
+# tests/unit/test_auth_log.py
+import json
+import threading
+import time
+from backend.core import auth_log
+from backend.core.auth_log import AuthLog
+
+def _lines(path):
+    return [json.loads(l) for l in path.read_text().splitlines()]
+
+def test_failures_always_kept_successes_sampled(tmp_path):
+    log = AuthLog(str(tmp_path), sample=0.0)
+    for _ in range(20):
+        log.record(True, app_id="console", path="/admin/ping")
+    log.record(False, reason="invalid_or_expired", method="GET", path="/admin/ping")
+    log.flush()
+    events = _lines(tmp_path / auth_log.LOG_NAME)
+    assert [e["reason"] for e in events] == ["invalid_or_expired"]
+    assert events[0]["ok"] is False and events[0]["path"] == "/admin/ping"
+    stats = log.stats()
+    assert stats["sampled_out"] == 20 and stats["written"] == 1 and stats["queue_depth"] == 0
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    log = AuthLog(str(tmp_path), max_queue=3)
+    gate = threading.Event()
+    real = log._write
+    monkeypatch.setattr(log, "_write", lambda batch: gate.wait(5) and real(batch))
+    log.record(False, reason="first")  # taken by the writer, which then blocks
+    while log._queue.qsize():
+        pass
+    kept = [log.record(False, reason=str(i)) for i in range(5)]
+    assert kept == [True, True, True, False, False]
+    assert log.stats()["dropped"] == 2 and log.stats()["queue_depth"] == 3
+    gate.set()
+    log.flush()
+    assert len(_lines(tmp_path / auth_log.LOG_NAME)) == 4
+
+def test_rotation_keeps_a_bounded_number_of_files(tmp_path):
+    log = AuthLog(str(tmp_path), max_bytes=200, backups=2)
+    for i in range(30):
+        log.record(False, reason=f"r{i}")
+        log.flush()
+    names = {p.name for p in tmp_path.iterdir() if not p.name.endswith(".lock")}
+    assert {"auth.jsonl.1", "auth.jsonl.2"} <= names <= {"auth.jsonl", "auth.jsonl.1", "auth.jsonl.2"}
+    assert log.stats()["rotations"] > 2
+    current = tmp_path / "auth.jsonl"
+    newest = _lines(current) if current.exists() else _lines(tmp_path / "auth.jsonl.1")
+    assert newest[-1]["reason"] == "r29"
+
+def test_close_writes_queued_failures_and_stops_the_writer(tmp_path, monkeypatch):
+    log = AuthLog(str(tmp_path))
+    real = log._write
+    monkeypatch.setattr(log, "_write", lambda batch: time.sleep(0.05) or real(batch))
+    for i in range(3):
+        log.record(False, reason=f"r{i}")
+    thread = log._thread
+    log.close()
+    assert not thread.is_alive()
+    assert [e["reason"] for e in _lines(tmp_path / auth_log.LOG_NAME)] == ["r0", "r1", "r2"]
+    log.record(False, reason="after")  # a later event starts a new writer
+    log.flush()
+    assert _lines(tmp_path / auth_log.LOG_NAME)[-1]["reason"] == "after"
+
+def test_app_shutdown_writes_queued_failures(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.api import main
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path)  # startup scans the data dir
+    monkeypatch.setenv("LEDGER_PATH", str(tmp_path))
+    log = AuthLog(str(tmp_path / "logs"))
+    real = log._write
+    monkeypatch.setattr(log, "_write", lambda batch: time.sleep(0.2) or real(batch))
+    monkeypatch.setattr(auth_log, "LOG", log)
+    with TestClient(main.app) as client:
+        assert client.get("/admin/ping").status_code == 401
+    assert [e["reason"] for e in _lines(tmp_path / "logs" / auth_log.LOG_NAME)] == ["missing_token"]
@@ -0,0 +1,65 @@
+# tests/unit/test_catalog.py
+import pytest
+from backend.core import catalog
+
+def _day(date, sweeps=0):
+    return {
+        "date": date,
+        "counts": {"seeds": 1, "sweeps": sweeps, "seals": 0, "gic_txs": 0},
+        "gic": {"sum": 0, "file": None},
+        "day_root": None,
+        "links": {"seed": f"{date}.seed.json", "echo": None, "seal": None, "ledger": None},
+    }
+
+def test_bump_updates_counters():
+    catalog.put_day(_day("2025-10-01"))
+    assert catalog.bump("2025-10-01", inc={"sweeps": 1, "gic_txs": 1, "gic_sum": 25}, assign={"echo": "e"})
+    day = catalog.get_day("2025-10-01")
+    assert day["counts"]["sweeps"] == 1
+    assert day["gic"]["sum"] == 25
+    assert day["present"]["echo"] and not day["present"]["seal"]
+
+def test_bump_unknown_day_returns_false():
+    assert not catalog.bump("2025-10-09", inc={"sweeps": 1})
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pagination_visits_every_day_once(order):
+    dates = [f"2025-10-{d:02d}" for d in range(1, 12)]
+    catalog.rebuild(_day(d) for d in dates)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = catalog.page(order, 4, cursor)
+        seen += [r["date"] for r in rows]
+        if cursor is None:
+            break
+    assert seen == (dates if order == "asc" else dates[::-1])
+    assert catalog.count() == len(dates)
+
+def test_validator_tracks_writes_after_seal():
+    assert catalog.validator("2025-10-01") is None
+    catalog.put_day(_day("2025-10-01", sweeps=2))
+    assert catalog.validator("2025-10-01") is None  # not sealed yet
+    catalog.bump("2025-10-01", assign={"seals": 1, "day_root": "ab" * 32, "sealed_sweeps": 2}, sealed=True)
+    v = catalog.validator("2025-10-01")
+    assert v["frozen"] and v["day_root"] == "ab" * 32
+    catalog.bump("2025-10-01", inc={"sweeps": 1})
+    later = catalog.validator("2025-10-01")
+    assert not later["frozen"] and later["version"] != v["version"]
+
+def test_any_write_after_seal_unfreezes_and_changes_version():
+    catalog.put_day(_day("2025-10-01", sweeps=2))
+    catalog.bump("2025-10-01", assign={"seals": 1, "day_root": "ab" * 32}, sealed=True)
+    v = catalog.validator("2025-10-01")
+    catalog.bump("2025-10-01", assign={"seed": "2025-10-01.seed.json"})  # seed re-posted, no counter moves
+    later = catalog.validator("2025-10-01")
+    assert v["frozen"] and not later["frozen"] and later["version"] != v["version"]
+
+def test_scanned_rows_keep_counting_writes():
+    day = {**_day("2025-10-01", sweeps=2), "day_root": "ab" * 32, "frozen": True}
+    day["counts"] = {**day["counts"], "seals": 1}
+    catalog.put_day(day)
+    v = catalog.validator("2025-10-01")
+    assert v["frozen"]
+    catalog.rebuild([{**day, "frozen": False}])
+    later = catalog.validator("2025-10-01")
+    assert not later["frozen"] and later["version"] != v["version"]
@@ -0,0 +1,69 @@
+# tests/unit/test_checkpoints.py
+import hashlib
+import pytest
+from backend.core import checkpoints
+from backend.core.hashing import MERKLE_BIN, MERKLE_HEX, merkle_path, merkle_root, verify_proof
+from backend.core.storage import write_json, ledger_obj
+
+def _root(date):
+    return hashlib.sha256(date.encode()).hexdigest()
+
+def test_periods_use_iso_weeks():
+    assert checkpoints.periods_for("2025-12-29") == {"week": "2026-W01", "month": "2025-12", "year": "2025"}
+    assert [checkpoints.kind_of(p) for p in ("2025", "2025-10", "2025-W41")] == ["year", "month", "week"]
+    with pytest.raises(ValueError):
+        checkpoints.kind_of("2025-10-01")
+
+@pytest.mark.parametrize("method", [MERKLE_HEX, MERKLE_BIN])
+@pytest.mark.parametrize("n", [1, 2, 5, 8, 13])
+def test_merkle_path_verifies(method, n):
+    leaves = [_root(str(i)) for i in range(n)]
+    root = merkle_root(leaves, method)
+    for i in range(n):
+        assert verify_proof(leaves[i], merkle_path(leaves, i, method), root, method)
+
+def test_record_is_incremental_and_proves_days_against_the_year():
+    dates = ["2025-10-03", "2025-10-01", "2025-11-15", "2025-02-02"]
+    for d in dates:
+        checkpoints.record(d, _root(d))
+    year = checkpoints.get("2025")
+    assert [d["date"] for d in year["days"]] == sorted(dates)
+    assert len(checkpoints.get("2025-10")["days"]) == 2
+    for d in dates:
+        pr = checkpoints.proof("2025", d)
+        assert verify_proof(pr["leaf"], pr["path"], year["root"], pr["method"])
+        assert pr["leaf"] == checkpoints.leaf(d, _root(d))
+
+def test_reseal_replaces_the_day_and_keeps_the_method(monkeypatch):
+    monkeypatch.setenv("MERKLE_METHOD", "v1")
+    checkpoints.record("2025-10-01", _root("a"))
+    monkeypatch.setenv("MERKLE_METHOD", "v2")
+    before = checkpoints.get("2025-10")["root"]
+    checkpoints.record("2025-10-01", _root("b"))
+    cp = checkpoints.get("2025-10")
+    assert cp["method"] == MERKLE_HEX and cp["root"] != before
+    assert cp["days"] == [{"date": "2025-10-01", "day_root": _root("b")}]
+
+def test_rebuild_from_ledgers_matches_incremental():
+    for d in ("2025-10-01", "2025-10-02", "2025-12-31"):
+        write_json(f"{d}.ledger.json", ledger_obj(d, _root(d), {"seeds": 1, "sweeps": 0, "seals": 1}))
+        checkpoints.record(d, _root(d))
+    incremental = {p: checkpoints.get(p)["root"] for p in ("2025", "2025-10", "2025-12", "2026-W01")}
+    checkpoints.record("2024-01-01", _root("stale"))  # no ledger: dropped by rebuild
+    assert checkpoints.rebuild() == 5  # 2025-W40, 2026-W01, 2025-10, 2025-12, 2025
+    assert {p: checkpoints.get(p)["root"] for p in incremental} == incremental
+    assert checkpoints.get("2024") is None
+
+@pytest.mark.parametrize("method", [MERKLE_HEX, MERKLE_BIN])
+def test_in_order_seals_fold_one_leaf(method, monkeypatch):
+    monkeypatch.setenv("MERKLE_METHOD", method)
+    dates = [f"2025-10-{d:02d}" for d in range(1, 12)]
+    checkpoints.record(dates[0], _root(dates[0]))
+    real = checkpoints._build
+    # new weeks start from scratch; the month must only ever grow by one leaf
+    monkeypatch.setattr(checkpoints, "_build", lambda period, *a: pytest.fail("rebuilt the month") if period == "2025-10" else real(period, *a))
+    for d in dates[1:]:
+        checkpoints.record(d, _root(d))
+    cp = checkpoints.get("2025-10")
+    assert cp["root"] == merkle_root([checkpoints.leaf(d, _root(d)) for d in dates], cp["method"])
+    assert cp["method"] == method
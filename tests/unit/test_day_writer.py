@@ -0,0 +1,37 @@
+# tests/unit/test_day_writer.py
+import threading
+import pytest
+from backend.core import frontier, day_writer
+from backend.core.hashing import sha256_json
+from backend.core.storage import today_files, write_json, load_day, build_ledger_obj
+
+DATE = "2025-10-05"
+
+def test_concurrent_sweeps_are_not_lost():
+    write_json(today_files(DATE)["seed"], {"type": "seed", "date": DATE})
+    attestations = []
+
+    def client(n):
+        for i in range(20):
+            rec = {"type": "sweep", "date": DATE, "note": f"{n}-{i}"}
+            attestations.append(day_writer.run(DATE, frontier.append_sweep, DATE, rec))
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    seed, sweeps, _ = load_day(DATE)
+    assert len(sweeps) == 120
+    assert sorted(attestations) == sorted(sha256_json(s) for s in sweeps)
+    seal = {"type": "seal", "date": DATE}
+    root, state = frontier.seal_root(DATE, sha256_json(seal))
+    assert root == build_ledger_obj(DATE, seed, sweeps, seal, frontier.state_method(state))["day_root"]
+
+def test_exceptions_reach_the_caller():
+    def boom():
+        raise ValueError("nope")
+    with pytest.raises(ValueError):
+        day_writer.run(DATE, boom)
+    assert day_writer.run(DATE, lambda: 42) == 42
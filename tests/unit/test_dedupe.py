@@ -0,0 +1,76 @@
+# tests/unit/test_dedupe.py
+import json
+import pytest
+from backend.core import dedupe
+
+DATE = "2025-10-03"
+
+@pytest.fixture(autouse=True)
+def fresh_days():
+    dedupe.forget()
+
+def test_check_and_mark_flags_second_submission():
+    assert dedupe.check_and_mark("u1", DATE, "h1") is False
+    assert dedupe.check_and_mark("u1", DATE, "h1") is True
+    assert dedupe.check_and_mark("u2", DATE, "h1") is False  # per user
+    assert dedupe.check_and_mark("u1", "2025-10-04", "h1") is False  # per day
+
+def test_survives_restart():
+    dedupe.check_and_mark("u1", DATE, "h1")
+    dedupe.forget()  # what a fresh worker sees
+    assert dedupe.seen("u1", DATE, "h1")
+    assert dedupe.check_and_mark("u1", DATE, "h1") is True
+
+def test_rebuilds_from_gic_history(data_dir):
+    (data_dir / DATE).mkdir()
+    txs = [
+        {"type": "gic_tx", "user": "u1", "amount": 10, "reason": "reflection:private", "hash": "h1"},
+        {"type": "gic_tx", "user": "u1", "amount": 60, "reason": "featured_bonus", "hash": "h2"},
+    ]
+    (data_dir / DATE / f"{DATE}.gic.jsonl").write_text("".join(json.dumps(t) + "\n" for t in txs))
+    assert dedupe.check_and_mark("u1", DATE, "h1") is True
+    assert dedupe.check_and_mark("u1", DATE, "h2") is False
+
+def test_eviction_keeps_bounded_filters(monkeypatch):
+    monkeypatch.setattr(dedupe, "MAX_DAYS", 2)
+    for d in ("2025-10-01", "2025-10-02", "2025-10-03"):
+        dedupe.check_and_mark("u1", d, "h")
+    assert len(dedupe._days) == 2
+    assert dedupe.check_and_mark("u1", "2025-10-01", "h") is True  # reloaded from disk
+
+def test_keys_from_other_workers_are_seen_without_rescanning(data_dir, monkeypatch):
+    dedupe.check_and_mark("u1", DATE, "h1")
+    # another worker appends to the shared index
+    with open(data_dir / DATE / f"{DATE}.dedupe.idx", "ab") as f:
+        f.write(dedupe._key("u2", "h2") + b"\n")
+    reads = []
+    real = dedupe._refresh
+    monkeypatch.setattr(dedupe, "_refresh", lambda day, f: reads.append(day.offset) or real(day, f))
+    assert dedupe.check_and_mark("u2", DATE, "h2") is True
+    assert dedupe.check_and_mark("u1", DATE, "h1") is True
+    # each look starts where the last stopped
+    assert reads == [dedupe.HEADER + dedupe.KEY_LINE, dedupe.HEADER + 2 * dedupe.KEY_LINE]
+
+def test_tail_is_compacted_into_a_sorted_run(data_dir, monkeypatch):
+    monkeypatch.setattr(dedupe, "COMPACT_KEYS", 4)
+    hashes = [f"h{i}" for i in range(10)]
+    for h in hashes:
+        assert dedupe.check_and_mark("u1", DATE, h) is False
+    assert len(dedupe._days[DATE].tail) < 4
+    raw = (data_dir / DATE / f"{DATE}.dedupe.idx").read_bytes()
+    run = dedupe._run_length(raw)
+    keys = raw[dedupe.HEADER:].split(b"\n")[:-1]
+    assert run == 8 and keys[:run] == sorted(dedupe._key("u1", h) for h in hashes[:8])
+    dedupe.forget()
+    assert all(dedupe.check_and_mark("u1", DATE, h) for h in hashes)
+
+def test_filter_hits_are_confirmed_on_disk(monkeypatch):
+    monkeypatch.setattr(dedupe, "COMPACT_KEYS", 1)
+    dedupe.check_and_mark("u1", DATE, "h1")
+    dedupe.check_and_mark("u1", DATE, "h2")  # both in the sorted run
+    monkeypatch.setattr(dedupe, "COMPACT_KEYS", 100)
+    dedupe.check_and_mark("u1", DATE, "h3")  # in the tail
+    monkeypatch.setattr(dedupe.BloomFilter, "__contains__", lambda self, key: True)  # every lookup a filter hit
+    assert all(dedupe.seen("u1", DATE, h) for h in ("h1", "h2", "h3"))
+    assert not dedupe.seen("u1", DATE, "h4")
+    assert dedupe.check_and_mark("u1", DATE, "h4") is False
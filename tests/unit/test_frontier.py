@@ -0,0 +1,186 @@
+# tests/unit/test_frontier.py
+import hashlib
+import pytest
+from backend.core import storage, frontier, hash_helpers
+from backend.core.hashing import MERKLE_BIN, MERKLE_HEX, MerkleAccumulator, merkle_root, sha256_json, verify_proof
+from backend.core.storage import today_files, write_json, load_day, build_ledger_obj
+
+DATE = "2025-10-02"
+SEAL = {"type": "seal", "date": DATE, "wins": "w", "blocks": "b", "tomorrow_intent": "i", "meta": {}, "ts": "T"}
+
+@pytest.fixture(autouse=True, params=["v1", "v2"])
+def method(request, monkeypatch):
+    """Every frontier test runs under both Merkle methods (as the default for new days)."""
+    monkeypatch.setenv("MERKLE_METHOD", request.param)
+    return MERKLE_HEX if request.param == "v1" else MERKLE_BIN
+
+def _seed():
+    write_json(today_files(DATE)["seed"], {"type": "seed", "date": DATE, "time": "09:00", "intent": "t", "meta": {}, "ts": "T"})
+
+def _sweep(i):
+    return {"type": "sweep", "date": DATE, "chamber": "LAB", "note": f"n{i}", "meta": {}, "ts": "T"}
+
+def _full_root():
+    seed, sweeps, _ = load_day(DATE)
+    return build_ledger_obj(DATE, seed, sweeps, SEAL, frontier.state_method(frontier.load(DATE)))["day_root"]
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 8, 33])
+def test_accumulator_matches_merkle_root(n, method):
+    leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+    acc = MerkleAccumulator(method=method)
+    for leaf in leaves:
+        acc.append(leaf)
+    assert acc.root() == merkle_root(leaves, method)
+
+@pytest.mark.parametrize("n", [0, 1, 5, 16])
+def test_seal_root_matches_full_recompute(n):
+    _seed()
+    for i in range(n):
+        frontier.append_sweep(DATE, _sweep(i))
+    root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert state["sweeps"] == n
+    assert root == _full_root()
+
+def test_seed_after_sweeps_rebuilds():
+    frontier.append_sweep(DATE, _sweep(0))
+    _seed()
+    frontier.append_sweep(DATE, _sweep(1))
+    root, _ = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert root == _full_root()
+
+def test_stale_frontier_after_external_write_rebuilds():
+    _seed()
+    frontier.append_sweep(DATE, _sweep(0))
+    storage.append_record(today_files(DATE)["echo"], _sweep(1))  # bypasses the frontier
+    root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert state["sweeps"] == 2
+    assert root == _full_root()
+
+@pytest.mark.parametrize("n", [0, 1, 2, 5, 6, 14, 31])
+def test_every_leaf_has_a_valid_proof(n):
+    _seed()
+    for i in range(n):
+        frontier.append_sweep(DATE, _sweep(i))
+    seal_leaf = sha256_json(SEAL)
+    root = _full_root()
+    for i in range(n + 2):
+        pr = frontier.proof(DATE, i, n + 1, seal_leaf)
+        assert pr["root"] == root
+        assert verify_proof(pr["leaf"], pr["path"], root, pr["method"])
+        if i <= n:
+            assert frontier.find_leaf(DATE, pr["leaf"], n + 1) == i
+
+def test_proof_ignores_sweeps_after_seal():
+    _seed()
+    for i in range(3):
+        frontier.append_sweep(DATE, _sweep(i))
+    root = _full_root()
+    frontier.append_sweep(DATE, _sweep(99))
+    pr = frontier.proof(DATE, 2, 4, sha256_json(SEAL))
+    assert pr["root"] == root
+    assert frontier.find_leaf(DATE, sha256_json(_sweep(99)), 4) is None
+
+def test_tampered_proof_fails():
+    _seed()
+    for i in range(4):
+        frontier.append_sweep(DATE, _sweep(i))
+    pr = frontier.proof(DATE, 1, 5, sha256_json(SEAL))
+    assert not verify_proof(sha256_json(_sweep(42)), pr["path"], pr["root"], pr["method"])
+
+def test_batch_append_matches_single_appends():
+    _seed()
+    frontier.append_sweep(DATE, _sweep(0))
+    leaves = frontier.append_sweeps(DATE, [_sweep(i) for i in range(1, 12)])
+    assert leaves == [sha256_json(_sweep(i)) for i in range(1, 12)]
+    root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert state["sweeps"] == 12
+    assert root == _full_root()
+    pr = frontier.proof(DATE, 7, 13, sha256_json(SEAL))
+    assert verify_proof(pr["leaf"], pr["path"], root, pr["method"])
+
+def test_log_lines_are_the_hashed_bytes():
+    _seed()
+    leaves = frontier.append_sweeps(DATE, [_sweep(i) for i in range(3)])
+    raw = storage.p(today_files(DATE)["echo"]).read_bytes().splitlines()
+    assert [hashlib.sha256(line).hexdigest() for line in raw] == leaves
+    assert frontier.leaf_hashes(DATE)[1:] == leaves
+
+def test_unchanged_seed_is_not_rehashed(monkeypatch):
+    _seed()
+    frontier.append_sweep(DATE, _sweep(0))
+    real = frontier._seed_leaf
+    def boom(date_str):
+        raise AssertionError("seed re-hashed")
+    monkeypatch.setattr(frontier, "_seed_leaf", boom)
+    frontier.append_sweep(DATE, _sweep(1))
+    root, _ = frontier.seal_root(DATE, sha256_json(SEAL))
+    monkeypatch.setattr(frontier, "_seed_leaf", real)
+    assert root == _full_root()
+
+def test_new_day_uses_default_method_sealed_day_keeps_its_own(method):
+    _seed()
+    frontier.append_sweep(DATE, _sweep(0))
+    assert frontier.state_method(frontier.load(DATE)) == method
+    # a day already published under the other method is rebuilt with that method
+    other = MERKLE_BIN if method == MERKLE_HEX else MERKLE_HEX
+    seed, sweeps, _ = load_day(DATE)
+    write_json(today_files(DATE)["ledger"], build_ledger_obj(DATE, seed, sweeps, SEAL, other))
+    storage.p(f"{DATE}.frontier.json").unlink()
+    root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert frontier.state_method(state) == other
+    assert root == _full_root()
+
+def test_methods_disagree_on_interior_nodes():
+    leaves = [sha256_json(_sweep(i)) for i in range(3)]
+    assert merkle_root(leaves, MERKLE_HEX) != merkle_root(leaves, MERKLE_BIN)
+    assert merkle_root(leaves[:1], MERKLE_HEX) == merkle_root(leaves[:1], MERKLE_BIN)
+
+def _tsweep(ts, note):
+    return {"type": "sweep", "date": DATE, "chamber": "LAB", "note": note, "meta": {}, "ts": ts}
+
+def test_single_shard_stays_incremental(monkeypatch):
+    monkeypatch.setenv("ECHO_SHARDING", "node")
+    monkeypatch.setenv("NODE_ID", "alpha")
+    _seed()
+    frontier.append_sweep(DATE, _tsweep("T1", "a"))
+    real = frontier.rebuild
+    def boom(*a, **k):
+        raise AssertionError("rebuilt")
+    monkeypatch.setattr(frontier, "rebuild", boom)
+    frontier.append_sweeps(DATE, [_tsweep("T3", "c"), _tsweep("T2", "b")])
+    root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+    monkeypatch.setattr(frontier, "rebuild", real)
+    assert storage.shard_files(DATE) == [f"{DATE}.echo.alpha.jsonl"]
+    assert [s["note"] for s in load_day(DATE)[1]] == ["a", "b", "c"]
+    assert root == _full_root()
+
+def test_shard_merge_is_independent_of_write_order(monkeypatch, tmp_path):
+    monkeypatch.setenv("ECHO_SHARDING", "node")
+    writes = [("alpha", "T1", "a1"), ("beta", "T1", "b1"), ("beta", "T0", "b0"), ("alpha", "T2", "a2")]
+    roots = []
+    for i, order in enumerate((writes, writes[::-1])):
+        monkeypatch.setattr(storage, "DATA_DIR", tmp_path / f"node{i}")
+        _seed()
+        for node, ts, note in order:
+            monkeypatch.setenv("NODE_ID", node)
+            frontier.append_sweep(DATE, _tsweep(ts, note))
+        root, state = frontier.seal_root(DATE, sha256_json(SEAL))
+        assert state["sweeps"] == 4
+        assert [s["note"] for s in load_day(DATE)[1]] == ["b0", "a1", "b1", "a2"]
+        assert root == _full_root()
+        roots.append(root)
+    assert roots[0] == roots[1]
+
+def test_sharded_day_root_and_links_match_the_frontier(monkeypatch, data_dir, method):
+    monkeypatch.setenv("ECHO_SHARDING", "node")
+    for node, ts, note in [("alpha", "T2", "a"), ("beta", "T1", "b")]:
+        monkeypatch.setenv("NODE_ID", node)
+        if node == "alpha":
+            _seed()
+        frontier.append_sweep(DATE, _tsweep(ts, note))
+    write_json(today_files(DATE)["seal"], SEAL)
+    root, _ = frontier.seal_root(DATE, sha256_json(SEAL))
+    assert hash_helpers.build_day_root(DATE, data_dir, method=method)["root"] == root
+    links = storage.ledger_obj(DATE, root, {}, method)["links"]
+    assert links["echo"] is None
+    assert links["echo_shards"] == [f"{DATE}.echo.alpha.jsonl", f"{DATE}.echo.beta.jsonl"]
@@ -0,0 +1,43 @@
+# tests/unit/test_hashing.py
+import json
+import pytest
+from backend.core import hash_helpers
+from backend.core.hashing import (
+    MERKLE_BIN, MERKLE_HEX, DayDigest, digest_day, hash_jsonl, merkle_root, sha256_json,
+)
+
+SEED = {"type": "seed", "intent": "t"}
+SEAL = {"type": "seal", "wins": "w"}
+SWEEPS = [{"type": "sweep", "note": f"n{i}"} for i in range(5)]
+
+@pytest.mark.parametrize("method", [MERKLE_HEX, MERKLE_BIN])
+def test_digest_day_streams_sweeps_once(method):
+    consumed = []
+    def gen():
+        for s in SWEEPS:
+            consumed.append(s)
+            yield s
+    d = digest_day(SEED, gen(), SEAL, method)
+    assert consumed == SWEEPS
+    assert d.leaves == [sha256_json(x) for x in [SEED, *SWEEPS, SEAL]]
+    assert d.root == merkle_root(d.leaves, method)
+    assert DayDigest.from_leaves(d.leaves, method) == d
+
+def test_hash_jsonl_skips_blank_and_corrupt_lines():
+    lines = ['{"b": 1, "a": 2}\n', "\n", "not json\n", b'{"a":2,"b":1}']
+    assert list(hash_jsonl(lines)) == [sha256_json({"a": 2, "b": 1})] * 2
+
+def test_build_day_root_matches_engine(tmp_path):
+    (tmp_path / "D.seed.json").write_text(json.dumps(SEED))
+    (tmp_path / "D.seal.json").write_text(json.dumps(SEAL))
+    (tmp_path / "D.echo.json").write_text(json.dumps(SWEEPS[:2]))
+    (tmp_path / "D.echo.jsonl").write_text("".join(json.dumps(s) + "\n" for s in SWEEPS[2:]))
+    for method in (MERKLE_HEX, MERKLE_BIN):
+        obj = hash_helpers.build_day_root("D", tmp_path, method=method)
+        assert obj["root"] == digest_day(SEED, SWEEPS, SEAL, method).root
+        assert obj["method"] == method
+
+def test_helper_names_wrap_the_engine():
+    obj = {"b": 1, "a": "é"}
+    assert hash_helpers.sha256_json(obj) == sha256_json(obj)
+    assert hash_helpers.canonical_json(obj) == '{"a":"é","b":1}'
@@ -14,7 +14,7 @@ def setup_day(date="2025-09-18"):
         {"type": "sweep", "date": date, "chamber": "LAB", "note": "first", "meta": {}, "ts":"T"},
         {"type": "sweep", "date": date, "chamber": "LAB", "note": "second", "meta": {}, "ts":"T"},
     ]
-    write_json(files["echo"], sweeps)
+    write_json(files["echo_legacy"], sweeps)
     # seal
     seal = {"type":"seal","date":date,"wins":"ok","blocks":"none","tomorrow_intent":"polish","meta":{},"ts":"T"}
     write_json(files["seal"], seal)
@@ -34,7 +34,7 @@ def test_verify_fails_on_tamper():
     # tamper echo
     tampered = list(sweeps)
     tampered.append({"type":"sweep","date":"2025-09-19","chamber":"LAB","note":"tamper","meta":{},"ts":"T"})
-    write_json(files["echo"], tampered)
+    write_json(files["echo_legacy"], tampered)
     recomputed = build_ledger_obj("2025-09-19", seed, tampered, seal)
     assert ledger["day_root"] != recomputed["day_root"]
 
@@ -0,0 +1,84 @@
+# tests/unit/test_jsonl.py
+import json
+import os
+from backend.core import jsonl
+
+def _write(path, lines, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write("".join(lines))
+
+def _rec(i):
+    return json.dumps({"i": i}) + "\n"
+
+def test_len_random_access_and_tail(tmp_path):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(i) for i in range(10)])
+    with jsonl.JsonlFile(path) as f:
+        assert len(f) == 10
+        assert f[0] == {"i": 0} and f[7] == {"i": 7} and f[-1] == {"i": 9}
+        assert f.tail(3) == [{"i": 7}, {"i": 8}, {"i": 9}]
+        assert f.slice(4, 6) == [{"i": 4}, {"i": 5}]
+        assert list(f) == [{"i": i} for i in range(10)]
+    assert jsonl.index_path(path).exists()
+
+def test_corrupt_and_blank_lines_are_skipped_and_counted(tmp_path):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(0), "{not json\n", "\n", "   \n", _rec(1), b"\xff\xfe\n".decode("latin-1")])
+    with jsonl.JsonlFile(path) as f:
+        assert list(f) == [{"i": 0}, {"i": 1}]
+        assert f.corrupt == 2
+    assert jsonl.corrupt(path) == 2
+
+def test_index_is_extended_with_appended_lines_only(tmp_path, monkeypatch):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(i) for i in range(5)])
+    assert jsonl.count(path) == 5
+    scanned = []
+    real = jsonl._scan
+    monkeypatch.setattr(jsonl, "_scan", lambda mm, start, end: scanned.append((start, end)) or real(mm, start, end))
+    size = path.stat().st_size
+    _write(path, [_rec(5), _rec(6)], mode="a")
+    assert jsonl.count(path) == 7
+    assert scanned == [(size, path.stat().st_size)]
+    assert jsonl.count(path) == 7
+    assert len(scanned) == 1  # up to date: nothing rescanned
+    assert jsonl.tail(path, 1) == [{"i": 6}]
+
+def test_unterminated_last_line_is_served_but_not_indexed(tmp_path):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(0), '{"i": 1}'])
+    with jsonl.JsonlFile(path) as f:
+        assert f.count == 1 and len(f) == 2
+        assert f[1] == {"i": 1} and f.tail(1) == [{"i": 1}]
+    _write(path, ["\n", _rec(2)], mode="a")
+    assert jsonl.read_all(path) == [{"i": 0}, {"i": 1}, {"i": 2}]
+
+def test_replaced_or_truncated_file_rebuilds_index(tmp_path):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(i) for i in range(5)])
+    assert jsonl.count(path) == 5
+    tmp = tmp_path / "b.jsonl"
+    _write(tmp, [_rec(9)] * 5)  # same size, different inode
+    os.replace(tmp, path)
+    assert jsonl.read_all(path) == [{"i": 9}] * 5
+    _write(path, [_rec(1)])
+    assert jsonl.read_all(path) == [{"i": 1}]
+
+def test_reindex_ignores_a_tampered_index(tmp_path):
+    path = tmp_path / "a.jsonl"
+    _write(path, [_rec(i) for i in range(4)])
+    assert jsonl.count(path) == 4
+    idx = jsonl.index_path(path)
+    data = bytearray(idx.read_bytes())
+    data[jsonl._HEADER.size + 8:jsonl._HEADER.size + 16] = data[jsonl._HEADER.size:jsonl._HEADER.size + 8]
+    idx.write_bytes(bytes(data))
+    assert jsonl.read_all(path)[1] == {"i": 0}
+    assert jsonl.reindex(path) == 0
+    assert jsonl.read_all(path) == [{"i": i} for i in range(4)]
+
+def test_missing_and_empty_files(tmp_path):
+    assert jsonl.count(tmp_path / "none.jsonl") == 0
+    assert jsonl.read_all(tmp_path / "none.jsonl") == []
+    empty = tmp_path / "empty.jsonl"
+    empty.touch()
+    assert jsonl.read_all(empty) == [] and jsonl.tail(empty, 5) == []
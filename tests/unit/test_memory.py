@@ -0,0 +1,70 @@
+# tests/unit/test_memory.py
+import threading
+import pytest
+from backend.core import memory
+from backend.core.memory import EventRing
+
+def _fill(ring, types):
+    for i, t in enumerate(types):
+        ring.append(t, f"c{i}", f"T{i:03d}")
+
+def test_ring_keeps_newest_and_counts_incrementally():
+    ring = EventRing(capacity=4)
+    _fill(ring, ["reflection", "note", "reflection", "reply", "note", "note"])
+    assert len(ring) == 4
+    assert [e.content for e in ring] == ["c2", "c3", "c4", "c5"]
+    assert ring.counts == {"reflection": 1, "reply": 1, "note": 2}
+    assert ring.oldest_ts == "T002" and ring.newest_ts == "T005"
+
+def test_counts_match_a_full_rescan_under_wraparound():
+    ring = EventRing(capacity=7)
+    types = ["reflection", "reply", "note", "system"]
+    for i in range(100):
+        ring.append(types[(i * 5) % 4], str(i), str(i))
+        expected = {}
+        for e in ring:
+            expected[e.type] = expected.get(e.type, 0) + 1
+        assert ring.counts == expected
+
+@pytest.mark.parametrize("n,expected", [(0, []), (2, ["c4", "c5"]), (10, ["c2", "c3", "c4", "c5"])])
+def test_recent_is_oldest_first(n, expected):
+    ring = EventRing(capacity=4)
+    _fill(ring, ["note"] * 6)
+    assert [e.content for e in ring.recent(n)] == expected
+
+def test_empty_and_cleared_ring():
+    ring = EventRing(capacity=3)
+    assert ring.oldest_ts is None and ring.newest_ts is None and ring.recent(5) == []
+    _fill(ring, ["note"] * 5)
+    ring.clear()
+    assert len(ring) == 0 and ring.counts == {} and list(ring) == []
+    _fill(ring, ["reply"])
+    assert [e.to_dict() for e in ring] == [{"type": "reply", "content": "c0", "ts": "T000"}]
+
+def test_bucket_window_is_max_events_per_app():
+    memory.MEMORIES.pop("t", None)
+    b = memory.get_bucket("t")
+    _fill(b.events, ["note"] * (memory.MAX_EVENTS_PER_APP + 5))
+    assert len(b.events) == memory.MAX_EVENTS_PER_APP
+    assert memory.get_bucket("t") is b
+
+def test_snapshot_is_consistent_under_concurrent_appends():
+    ring = EventRing(capacity=50)
+    types = ["reflection", "reply", "note", "system"]
+    stop = threading.Event()
+    def writer():
+        i = 0
+        while not stop.is_set():
+            ring.append(types[i % 4], "c", f"T{i:08d}")
+            i += 1
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        for _ in range(2000):
+            snap = ring.snapshot()
+            assert sum(snap["counts"].values()) == snap["total"]
+            if snap["total"] == ring.capacity:
+                assert int(snap["newest_ts"][1:]) - int(snap["oldest_ts"][1:]) == ring.capacity - 1
+    finally:
+        stop.set()
+        t.join()
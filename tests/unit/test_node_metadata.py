@@ -13,6 +13,7 @@ os.environ["VERSION"] = "0.1.0"
 
 from app.main import app
 from app.storage import get_node_metadata
+from app.hashing import default_method
 
 client = TestClient(app)
 TEST_DATE = "2025-09-24"
@@ -73,11 +74,11 @@ def test_sweep_includes_node_metadata():
     assert response.status_code == 200
     
     # Check the generated file
-    echo_file = TEST_DATA_DIR / f"{TEST_DATE}.echo.json"
+    echo_file = TEST_DATA_DIR / f"{TEST_DATE}.echo.jsonl"
     assert echo_file.exists()
     
     with open(echo_file, 'r') as f:
-        echo_data = json.load(f)
+        echo_data = [json.loads(line) for line in f if line.strip()]
     
     # Find the sweep record we just created
     sweep_record = None
@@ -157,7 +158,8 @@ def test_day_root_creation():
     assert "inputs" in root_data
     assert "root" in root_data
     assert "method" in root_data
-    assert root_data["method"] == "pairwise-merkle-sha256(hex-concat)"
+    # new days are hashed with the default method (v2 unless MERKLE_METHOD says otherwise)
+    assert root_data["method"] == default_method()
 
 def test_hash_stability():
     """Test that identical inputs produce identical hashes."""
@@ -0,0 +1,166 @@
+# tests/unit/test_replication.py
+import base64
+import pytest
+from backend.core import storage, frontier, checkpoints, replication, group_commit
+from backend.core.hashing import sha256_json
+from backend.core.storage import today_files, write_json, ledger_obj
+
+class LocalPeer:
+    """A second node's data dir, served in-process (same calls the HTTP endpoints make)."""
+
+    def __init__(self, data_dir, monkeypatch):
+        self.data_dir = data_dir
+        self.mp = monkeypatch
+        self.requests = 0
+
+    def _as_peer(self, fn, *args):
+        self.requests += 1
+        ours = storage.DATA_DIR
+        self.mp.setattr(storage, "DATA_DIR", self.data_dir)
+        try:
+            return fn(*args)
+        finally:
+            self.mp.setattr(storage, "DATA_DIR", ours)
+
+    def roots(self, period=None):
+        return self._as_peer(replication.roots, period)
+
+    def day(self, date_str):
+        body = self._as_peer(replication.export_day, date_str)
+        return {rel: base64.b64decode(b64) for rel, b64 in body["files"].items()}, body["manifest"]
+
+    def seal(self, date, n=2, note="n"):
+        return self._as_peer(_seal, date, n, note)
+
+def _seal(date, n=2, note="n"):
+    write_json(today_files(date)["seed"], {"type": "seed", "date": date})
+    frontier.append_sweeps(date, [{"type": "sweep", "date": date, "note": f"{note}{i}"} for i in range(n)])
+    seal = {"type": "seal", "date": date}
+    write_json(today_files(date)["seal"], seal)
+    root, state = frontier.seal_root(date, sha256_json(seal))
+    write_json(today_files(date)["ledger"], ledger_obj(date, root, {"seeds": 1, "sweeps": state["sweeps"], "seals": 1}, frontier.state_method(state)))
+    checkpoints.record(date, root)
+    return root
+
+@pytest.fixture
+def nodes(tmp_path, monkeypatch):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path / "a")
+    return LocalPeer(tmp_path / "b", monkeypatch)
+
+def test_only_diverged_days_move(nodes):
+    history = [f"2025-{m:02d}-{d:02d}" for m in range(1, 13) for d in (1, 15)]
+    for d in history:
+        _seal(d)
+        nodes.seal(d)
+    assert nodes.roots() == replication.roots()
+    new_day = nodes.seal("2025-07-20", n=5)
+    nodes.requests = 0
+    report = replication.reconcile(nodes)
+    assert report["pulled"] == ["2025-07-20"] and not report["conflicts"]
+    # year root, month roots of 2025, day roots of July, then one day
+    assert nodes.requests == 4
+    assert replication.roots() == nodes.roots()
+    assert storage.read_json(today_files("2025-07-20")["ledger"])["day_root"] == new_day
+    assert frontier.seal_root("2025-07-20", sha256_json(storage.read_json(today_files("2025-07-20")["seal"])))[0] == new_day
+
+def test_differently_sealed_day_is_a_conflict_unless_forced(nodes):
+    _seal("2025-10-01", note="ours")
+    theirs = nodes.seal("2025-10-01", note="theirs")
+    report = replication.reconcile(nodes)
+    assert report["conflicts"] == [{"date": "2025-10-01", "reason": "sealed with a different day_root"}]
+    report = replication.reconcile(nodes, force=True)
+    assert report["pulled"] == ["2025-10-01"]
+    assert replication.roots("2025-10") == {"2025-10-01": theirs}
+
+def test_tampered_day_is_rejected(nodes):
+    nodes.seal("2025-10-01")
+    real_day = nodes.day
+    def tampered(date_str):
+        files, manifest = real_day(date_str)
+        rel = today_files(date_str)["echo"]
+        files[rel] = files[rel].replace(b"n0", b"nX")
+        return files, manifest
+    nodes.day = tampered
+    report = replication.reconcile(nodes)
+    assert report["rejected"][0]["date"] == "2025-10-01"
+    assert not storage.p(today_files("2025-10-01")["ledger"]).exists()
+
+def test_unexpected_paths_are_refused():
+    with pytest.raises(ValueError):
+        replication.verify_day("2025-10-01", {"../../etc/passwd": b""})
+
+def test_day_keys_that_are_not_dates_are_ignored(nodes, tmp_path):
+    nodes.seal("2025-10-01")
+    files, manifest = nodes.day("2025-10-01")
+    evil = "../../evil"
+    renamed = {rel.replace("2025-10-01", evil): data for rel, data in files.items()}
+    nodes.roots = lambda period=None: {None: {"2025": "x"}, "2025": {"2025-10": "y"}}.get(period, {evil: "z", "2025-1x-01": "z"})
+    nodes.day = lambda date_str: (renamed, {rel.replace("2025-10-01", evil): h for rel, h in manifest.items()})
+    assert replication.diverged(nodes) == {}
+    assert replication.reconcile(nodes, force=True) == {"pulled": [], "conflicts": [], "rejected": []}
+    for bad in (evil, "2025-02-30"):
+        with pytest.raises(ValueError, match="not a date"):
+            replication.install_day(bad, renamed)
+    assert not list(tmp_path.parent.glob("*evil*")) and not list(tmp_path.glob("*evil*"))
+
+def test_gic_file_is_checked_against_the_manifest(nodes):
+    nodes.seal("2025-10-01")
+    gic = b'{"type":"gic_tx","date":"2025-10-01","user":"u1","amount":10}\n'
+    (nodes.data_dir / "2025-10-01").mkdir()
+    (nodes.data_dir / "2025-10-01" / "2025-10-01.gic.jsonl").write_bytes(gic)
+    real_day = nodes.day
+    def tampered(date_str):
+        files, manifest = real_day(date_str)
+        files["2025-10-01/2025-10-01.gic.jsonl"] = gic.replace(b"10", b"99")
+        return files, manifest
+    nodes.day = tampered
+    report = replication.reconcile(nodes)
+    assert "manifest" in report["rejected"][0]["reason"]
+    nodes.day = real_day
+    assert replication.reconcile(nodes)["pulled"] == ["2025-10-01"]
+    assert storage.p("2025-10-01/2025-10-01.gic.jsonl").read_bytes() == gic
+
+def test_foreign_gic_records_are_refused(nodes):
+    nodes.seal("2025-10-01")
+    files, _ = nodes.day("2025-10-01")
+    files["2025-10-01/2025-10-01.gic.jsonl"] = b'{"type":"gic_tx","date":"2025-10-02","amount":10}\n'
+    with pytest.raises(ValueError, match="not a gic_tx record"):
+        replication.verify_day("2025-10-01", files)
+
+def test_rejected_forced_install_leaves_local_files(nodes):
+    _seal("2025-10-01", note="ours")
+    nodes.seal("2025-10-01", note="theirs")
+    ours = {rel: storage.p(rel).read_bytes() for rel in storage.day_files("2025-10-01")}
+    real_day = nodes.day
+    def tampered(date_str):
+        files, manifest = real_day(date_str)
+        files[today_files(date_str)["seal"]] += b" "
+        return files, manifest
+    nodes.day = tampered
+    report = replication.reconcile(nodes, force=True)
+    assert report["rejected"] and not report["pulled"]
+    assert {rel: storage.p(rel).read_bytes() for rel in storage.day_files("2025-10-01")} == ours
+
+def test_forced_install_drops_local_files_the_peer_lacks(nodes, monkeypatch):
+    _seal("2025-10-01", note="ours")
+    monkeypatch.setenv("ECHO_SHARDING", "node")
+    frontier.append_sweep("2025-10-01", {"type": "sweep", "note": "late"})  # a local shard the peer never had
+    monkeypatch.delenv("ECHO_SHARDING")
+    assert storage.shard_files("2025-10-01")
+    theirs = nodes.seal("2025-10-01", note="theirs")
+    assert replication.reconcile(nodes, force=True)["pulled"] == ["2025-10-01"]
+    assert not storage.shard_files("2025-10-01")
+    assert replication.roots("2025-10") == {"2025-10-01": theirs}
+
+def test_gic_appends_after_a_forced_install_reach_the_new_file(nodes):
+    _seal("2025-10-01", note="ours")
+    gic = "2025-10-01/2025-10-01.gic.jsonl"
+    gc = group_commit.writer()
+    gc.append(storage.p(gic), b'{"type":"gic_tx","date":"2025-10-01","amount":1}\n').result()
+    nodes.seal("2025-10-01", note="theirs")
+    assert replication.reconcile(nodes, force=True)["pulled"] == ["2025-10-01"]
+    assert not storage.p(gic).exists()  # the peer had none
+    gc.append(storage.p(gic), b'{"type":"gic_tx","date":"2025-10-01","amount":2}\n').result()
+    assert storage.p(gic).read_bytes() == b'{"type":"gic_tx","date":"2025-10-01","amount":2}\n'
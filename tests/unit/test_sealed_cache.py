@@ -0,0 +1,51 @@
+# tests/unit/test_sealed_cache.py
+import pytest
+from backend.core import sealed_cache
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    sealed_cache.clear()
+    yield
+    sealed_cache.clear()
+
+V = {"day_root": "ab" * 32, "version": "3.1.25", "frozen": True}
+
+def test_etag_is_strong_and_changes_with_version():
+    tag = sealed_cache.etag_for("ledger", "2025-10-01", V)
+    assert tag.startswith('"') and tag.endswith('"')
+    assert tag != sealed_cache.etag_for("ledger", "2025-10-01", {**V, "version": "4.1.25"})
+    assert tag != sealed_cache.etag_for("verify", "2025-10-01", V)
+
+@pytest.mark.parametrize("header,hit", [
+    (None, False), ('"nope"', False), ("*", True), ("{tag}", True), ('"x", W/{tag}', True),
+])
+def test_if_none_match(header, hit):
+    tag = sealed_cache.etag_for("ledger", "2025-10-01", V)
+    assert sealed_cache.matches(header and header.format(tag=tag), tag) is hit
+
+def test_stale_etag_misses_and_invalidate_drops_day():
+    sealed_cache.put("ledger", "2025-10-01", '"a"', b"{}")
+    sealed_cache.put("verify", "2025-10-02", '"b"', b"[]")
+    assert sealed_cache.get("ledger", "2025-10-01", '"a"') == b"{}"
+    assert sealed_cache.get("ledger", "2025-10-01", '"other"') is None
+    sealed_cache.invalidate("2025-10-01")
+    assert sealed_cache.get("ledger", "2025-10-01", '"a"') is None
+    assert sealed_cache.get("verify", "2025-10-02", '"b"') == b"[]"
+
+def test_lru_is_bounded(monkeypatch):
+    monkeypatch.setattr(sealed_cache, "MAX_ENTRIES", 2)
+    for d in ("2025-10-01", "2025-10-02", "2025-10-03"):
+        sealed_cache.put("ledger", d, '"t"', b"{}")
+    assert sealed_cache.get("ledger", "2025-10-01", '"t"') is None
+    assert sealed_cache.get("ledger", "2025-10-03", '"t"') == b"{}"
+
+def test_bytes_are_bounded_and_big_bodies_are_not_kept(monkeypatch):
+    monkeypatch.setattr(sealed_cache, "MAX_BYTES", 10)
+    monkeypatch.setattr(sealed_cache, "MAX_BODY", 6)
+    sealed_cache.put("export", "2025-10-01", '"t"', b"x" * 6)
+    sealed_cache.put("export", "2025-10-02", '"t"', b"x" * 6)
+    assert sealed_cache.get("export", "2025-10-01", '"t"') is None  # evicted to stay under 10 bytes
+    assert sealed_cache.get("export", "2025-10-02", '"t"') == b"x" * 6
+    sealed_cache.put("export", "2025-10-02", '"u"', b"x" * 7)  # too big: dropped, not kept
+    assert sealed_cache.get("export", "2025-10-02", '"u"') is None
+    assert sealed_cache._size == 0
@@ -0,0 +1,83 @@
+# tests/unit/test_storage.py
+from backend.core import storage
+from backend.core.storage import today_files, write_json, write_json_group, read_json, append_record, load_day, build_ledger_obj
+from backend.core.hash_helpers import build_day_root
+import pytest
+
+DATE = "2025-10-01"
+
+def _day(n_legacy=0, n_log=0):
+    files = today_files(DATE)
+    seed = {"type": "seed", "date": DATE, "time": "09:00", "intent": "t", "meta": {}, "ts": "T"}
+    seal = {"type": "seal", "date": DATE, "wins": "w", "blocks": "b", "tomorrow_intent": "i", "meta": {}, "ts": "T"}
+    write_json(files["seed"], seed)
+    write_json(files["seal"], seal)
+    legacy = [{"type": "sweep", "date": DATE, "note": f"old {i}", "meta": {}, "ts": "T"} for i in range(n_legacy)]
+    if legacy:
+        write_json(files["echo_legacy"], legacy)
+    log = [{"type": "sweep", "date": DATE, "note": f"new {i}", "meta": {}, "ts": "T"} for i in range(n_log)]
+    for rec in log:
+        append_record(files["echo"], rec)
+    return seed, legacy + log, seal
+
+def test_sweep_log_streams_in_order():
+    seed, sweeps, seal = _day(n_legacy=2, n_log=3)
+    _, loaded, _ = load_day(DATE)
+    assert loaded == sweeps
+
+def test_log_skips_corrupt_lines(data_dir):
+    _day(n_log=2)
+    with open(data_dir / f"{DATE}.echo.jsonl", "a", encoding="utf-8") as f:
+        f.write("{not json\n\n")
+    _, loaded, _ = load_day(DATE)
+    assert len(loaded) == 2
+
+@pytest.mark.parametrize("n_legacy,n_log", [(0, 0), (3, 0), (0, 5), (2, 4)])
+def test_day_root_matches_ledger(data_dir, n_legacy, n_log):
+    seed, sweeps, seal = _day(n_legacy, n_log)
+    ledger = build_ledger_obj(DATE, seed, sweeps, seal)
+    assert build_day_root(DATE, data_dir)["root"] == ledger["day_root"]
+
+def test_write_json_group_leaves_no_temp_files(tmp_path):
+    write_json_group([("a.json", {"x": 1}), ("b.json", [1, 2])])
+    assert read_json("a.json") == {"x": 1} and read_json("b.json") == [1, 2]
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_write_json_group_writes_nothing_if_staging_fails(tmp_path):
+    with pytest.raises(TypeError):
+        write_json_group([("a.json", {"x": 1}), ("b.json", {"bad": object()})])
+    assert not (tmp_path / "a.json").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+def _walk(chamber=None, limit=2, scan_max=10000):
+    out, offset = [], 0
+    while offset is not None:
+        total, items, offset = storage.sweep_page(DATE, offset, limit, chamber, scan_max)
+        out.extend(items)
+    return total, out
+
+@pytest.mark.parametrize("n_legacy,n_log", [(0, 0), (0, 5), (3, 4)])
+def test_sweep_pages_cover_the_day_in_ledger_order(n_legacy, n_log):
+    _, sweeps, _ = _day(n_legacy, n_log)
+    total, items = _walk()
+    assert total == len(sweeps)
+    assert items == list(enumerate(sweeps))
+
+def test_sweep_page_reads_only_its_offsets(monkeypatch):
+    _day(n_log=50)
+    monkeypatch.setattr(storage.jsonl.JsonlFile, "__iter__", None)  # no full scans
+    total, items, nxt = storage.sweep_page(DATE, 40, 5)
+    assert total == 50 and nxt == 45
+    assert [i for i, _ in items] == [40, 41, 42, 43, 44]
+    assert items[0][1]["note"] == "new 40"
+    assert storage.sweep_page(DATE, 45, 10)[2] is None
+
+def test_sweep_page_chamber_filter_and_scan_cap():
+    files = today_files(DATE)
+    for i in range(20):
+        append_record(files["echo"], {"type": "sweep", "chamber": "LAB" if i % 5 == 0 else "X", "note": str(i), "ts": "T"})
+    total, items = _walk(chamber="LAB")
+    assert total == 20 and [i for i, _ in items] == [0, 5, 10, 15]
+    _, items, nxt = storage.sweep_page(DATE, 1, 10, "LAB", scan_max=3)
+    assert items == [] and nxt == 4
+    assert _walk(chamber="LAB", limit=1, scan_max=3)[1] == _walk(chamber="LAB")[1]